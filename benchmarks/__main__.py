@@ -0,0 +1,108 @@
+"""Time each stage of the build on synthetic corpora and report JSON.
+
+Run from the repository root:
+
+    python3 -m benchmarks [--pages N] [--blocks N] [--mix NAME ...] [--output FILE]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import MIXES, make_pages, write_site
+from blocktypes import BlockType, iter_blocks
+from markdownhtml import BLOCK_MEMO, markdown_to_html_node
+from utils import text_to_textnodes
+import main as site
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rates(seconds: float, megabytes: float, pages: int) -> dict:
+    return {
+        "seconds": round(seconds, 5),
+        "mb_per_s": round(megabytes / seconds, 3) if seconds else None,
+        "pages_per_s": round(pages / seconds, 1) if seconds else None,
+    }
+
+
+def time_build(pages: int, blocks: int, mix: str, repeat: int) -> float:
+    cwd = os.getcwd()
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as root:
+        write_site(root, pages, blocks, mix)
+        os.chdir(root)
+        try:
+            for _ in range(repeat):
+                # every repeat is a cold build: no parse cache, no memoized blocks
+                BLOCK_MEMO.clear()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    site.main(["/", "--clean", "--no-cache"])
+                best = min(best, time.perf_counter() - start)
+        finally:
+            os.chdir(cwd)
+    return best
+
+
+def bench_mix(mix: str, pages: int, blocks: int, repeat: int) -> dict:
+    docs = make_pages(pages, blocks, mix)
+    megabytes = sum(len(doc.encode()) for doc in docs) / 1e6
+    inline = [re.sub(r"\s+", " ", block.text).strip()
+              for doc in docs for block in iter_blocks(doc)
+              if block.block_type == BlockType.PARAGRAPH]
+    trees = [markdown_to_html_node(doc) for doc in docs]
+
+    stages = {
+        # block scan and type detection, as the build runs them
+        "iter_blocks": best_of(lambda: [list(iter_blocks(d)) for d in docs], repeat),
+        "text_to_textnodes": best_of(lambda: [text_to_textnodes(t) for t in inline], repeat),
+        "markdown_to_html_node": best_of(
+            lambda: [markdown_to_html_node(d) for d in docs], repeat),
+        "to_html": best_of(lambda: [tree.to_html() for tree in trees], repeat),
+    }
+    report = {name: rates(seconds, megabytes, pages) for name, seconds in stages.items()}
+    report["main_build"] = rates(time_build(pages, blocks, mix, repeat), megabytes, pages)
+    return {"pages": pages, "megabytes": round(megabytes, 3), "stages": report}
+
+
+def run(pages: int = 200, blocks: int = 40, mixes: list[str] | None = None,
+        repeat: int = 3) -> dict:
+    mixes = mixes or list(MIXES)
+    return {
+        "python": sys.version.split()[0],
+        "blocks_per_page": blocks,
+        "repeat": repeat,
+        "mixes": {mix: bench_mix(mix, pages, blocks, repeat) for mix in mixes},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=40)
+    parser.add_argument("--mix", action="append", choices=list(MIXES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    report = json.dumps(run(args.pages, args.blocks, args.mix, args.repeat), indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Reproducible synthetic markdown corpora for benchmarking the build.
+
+Every generator takes a seeded random.Random, so the same arguments always
+produce the same bytes.
+"""
+import os
+import random
+
+WORDS = [
+    "middle", "earth", "ring", "shire", "elves", "mountain", "river", "song",
+    "wizard", "forest", "tower", "road", "king", "star", "stone", "light",
+]
+
+# relative weight of each block kind per mix
+MIXES = {
+    "paragraph": {"paragraph": 8, "heading": 1, "list": 1, "code": 0, "quote": 1},
+    "list": {"paragraph": 2, "heading": 1, "list": 8, "code": 0, "quote": 0},
+    "code": {"paragraph": 2, "heading": 1, "list": 0, "code": 8, "quote": 0},
+    "links": {"paragraph": 8, "heading": 1, "list": 2, "code": 0, "quote": 0},
+    "mixed": {"paragraph": 4, "heading": 1, "list": 2, "code": 2, "quote": 1},
+}
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+
+def inline_text(rng: random.Random, words: int, link_rate: float = 0.03) -> str:
+    """Return a run of words with bold, italic, code, link and image markup."""
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.05:
+            word = f"**{word}**"
+        elif roll < 0.10:
+            word = f"_{word}_"
+        elif roll < 0.13:
+            word = f"`{word}`"
+        elif roll < 0.13 + link_rate:
+            word = f"[{word}](https://example.com/{word})"
+        elif roll < 0.14 + link_rate:
+            word = f"![{word}](/images/{word}.png)"
+        parts.append(word)
+    return " ".join(parts)
+
+
+def make_paragraph(rng: random.Random, words: int = 120, link_rate: float = 0.03) -> str:
+    return inline_text(rng, words, link_rate)
+
+
+def make_block(rng: random.Random, kind: str, link_rate: float) -> str:
+    if kind == "heading":
+        return "#" * rng.randint(2, 4) + " " + inline_text(rng, rng.randint(2, 6), 0)
+    if kind == "list":
+        items = rng.randint(3, 10)
+        if rng.random() < 0.5:
+            return "\n".join(f"- {inline_text(rng, rng.randint(4, 16), link_rate)}"
+                             for _ in range(items))
+        return "\n".join(f"{i}. {inline_text(rng, rng.randint(4, 16), link_rate)}"
+                         for i in range(1, items + 1))
+    if kind == "code":
+        lines = [f"    {rng.choice(WORDS)}_{i} = {rng.randint(0, 999)}  # **not bold**"
+                 for i in range(rng.randint(3, 20))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    if kind == "quote":
+        return "\n".join(f"> {inline_text(rng, rng.randint(6, 14), 0)}"
+                         for _ in range(rng.randint(1, 4)))
+    text = inline_text(rng, rng.randint(40, 160), link_rate)
+    # wrap paragraphs across lines like hand-written markdown
+    words = text.split(" ")
+    return "\n".join(" ".join(words[i:i + 12]) for i in range(0, len(words), 12))
+
+
+def make_page(rng: random.Random, title: str, blocks: int = 40, mix: str = "mixed") -> str:
+    """Return one markdown page with a title and blocks drawn from a mix."""
+    weights = MIXES[mix]
+    kinds = [kind for kind in weights if weights[kind]]
+    link_rate = 0.25 if mix == "links" else 0.03
+    body = [f"# {title}"]
+    for kind in rng.choices(kinds, [weights[kind] for kind in kinds], k=blocks):
+        body.append(make_block(rng, kind, link_rate))
+    return "\n\n".join(body) + "\n"
+
+
+def make_pages(pages: int, blocks: int = 40, mix: str = "mixed", seed: int = 0) -> list[str]:
+    rng = random.Random(f"{seed}-{mix}")
+    return [make_page(rng, f"Page {i}", blocks, mix) for i in range(pages)]
+
+
+def write_site(root: str, pages: int, blocks: int = 40, mix: str = "mixed",
+               seed: int = 0, per_dir: int = 50) -> list[str]:
+    """Write a buildable site (content/, static/, template.html) under root.
+
+    Args:
+        root: Directory to create the site in.
+        pages: Number of markdown pages.
+        blocks: Blocks per page.
+        mix: Key of MIXES selecting the block distribution.
+        seed: Random seed.
+        per_dir: Pages per content subdirectory.
+
+    Returns:
+        list[str]: Paths of the markdown files written.
+    """
+    paths = []
+    for i, markdown in enumerate(make_pages(pages, blocks, mix, seed)):
+        directory = os.path.join(root, "content", f"section{i // per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"page{i}.md")
+        with open(path, "w") as f:
+            f.write(markdown)
+        paths.append(path)
+    static = os.path.join(root, "static", "images")
+    os.makedirs(static, exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), "w") as f:
+        f.write("body { margin: 0 auto; max-width: 40em; }\n")
+    for word in WORDS:
+        with open(os.path.join(static, f"{word}.png"), "wb") as f:
+            f.write(random.Random(word).randbytes(2048))
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+    return paths
@@ -0,0 +1,66 @@
+"""Benchmark text_to_textnodes against the original five-pass pipeline.
+
+Run from the repository root:
+
+    python3 -m benchmarks.inline [--paragraphs N] [--repeat N]
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.corpus import make_paragraph
+from textnode import TextNode, TextType
+from utils import (split_nodes_delimiter, split_nodes_image, split_nodes_link,
+                   text_to_textnodes)
+
+
+def five_pass_text_to_textnodes(text: str) -> list[TextNode]:
+    node_list = [TextNode(text, TextType.TEXT)]
+    node_list = split_nodes_delimiter(node_list, "**", TextType.TEXT)
+    node_list = split_nodes_delimiter(node_list, "_", TextType.TEXT)
+    node_list = split_nodes_delimiter(node_list, "`", TextType.TEXT)
+    node_list = split_nodes_image(node_list)
+    node_list = split_nodes_link(node_list)
+    return node_list
+
+
+def time_it(func, paragraphs: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            func(paragraph)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(paragraphs: int = 2000, repeat: int = 5, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    corpus = [make_paragraph(rng) for _ in range(paragraphs)]
+    for paragraph in corpus:
+        assert text_to_textnodes(paragraph) == five_pass_text_to_textnodes(paragraph)
+    size_mb = sum(len(p.encode()) for p in corpus) / 1e6
+    five_pass = time_it(five_pass_text_to_textnodes, corpus, repeat)
+    single_pass = time_it(text_to_textnodes, corpus, repeat)
+    return {
+        "paragraphs": paragraphs,
+        "megabytes": round(size_mb, 3),
+        "five_pass_seconds": round(five_pass, 4),
+        "single_pass_seconds": round(single_pass, 4),
+        "five_pass_mb_per_s": round(size_mb / five_pass, 2),
+        "single_pass_mb_per_s": round(size_mb / single_pass, 2),
+        "speedup": round(five_pass / single_pass, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.paragraphs, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Stress the image and link splitters with link-dense paragraphs.
+
+Each paragraph holds thousands of links and images, the worst case for the
+old splitters, which re-searched the text for every match they extracted.
+The old implementations are kept here as the reference the current ones
+must agree with.
+
+Run from the repository root:
+
+    python3 -m benchmarks.links [--paragraphs N] [--links N] [--repeat N]
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from benchmarks.corpus import WORDS
+from textnode import TextNode, TextType
+from utils import split_nodes_image, split_nodes_link, text_to_textnodes
+
+
+def find_split_nodes(old_nodes: list[TextNode], pattern: str, prefix: str,
+                     text_type: TextType) -> list[TextNode]:
+    new_nodes = []
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT:
+            new_nodes.append(node)
+            continue
+        parts = re.findall(pattern, node.text)
+        if not parts:
+            new_nodes.append(node)
+            continue
+        last_index = 0
+        for text, url in parts:
+            markup = f"{prefix}[{text}]({url})"
+            start_index = node.text.find(markup, last_index)
+            if start_index > last_index:
+                new_nodes.append(TextNode(node.text[last_index:start_index], TextType.TEXT))
+            new_nodes.append(TextNode(text, text_type, url))
+            last_index = start_index + len(markup)
+        if last_index < len(node.text):
+            new_nodes.append(TextNode(node.text[last_index:], TextType.TEXT))
+    return new_nodes
+
+
+def find_split_images_and_links(text: str) -> list[TextNode]:
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = find_split_nodes(nodes, r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", "!", TextType.IMAGE)
+    return find_split_nodes(nodes, r"\[([^\[\]]*)\]\(([^\(\)]*)\)", "", TextType.LINK)
+
+
+def span_split_images_and_links(text: str) -> list[TextNode]:
+    return split_nodes_link(split_nodes_image([TextNode(text, TextType.TEXT)]))
+
+
+def make_link_paragraph(rng: random.Random, links: int) -> str:
+    parts = []
+    for i in range(links):
+        word = rng.choice(WORDS)
+        if i % 5 == 0:
+            parts.append(f"![{word}](/images/{word}-{i}.png)")
+        else:
+            # repeated targets make the old text.find() rescans hit early copies
+            parts.append(f"[{word}](/{rng.choice(WORDS)})")
+        parts.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 3))))
+    return " ".join(parts)
+
+
+def time_it(func, paragraphs: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            func(paragraph)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(paragraphs: int = 20, links: int = 5000, repeat: int = 3, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    corpus = [make_link_paragraph(rng, links) for _ in range(paragraphs)]
+    for paragraph in corpus:
+        expected = find_split_images_and_links(paragraph)
+        assert span_split_images_and_links(paragraph) == expected
+        assert text_to_textnodes(paragraph) == expected
+    size_mb = sum(len(p.encode()) for p in corpus) / 1e6
+    results = {
+        "paragraphs": paragraphs,
+        "links_per_paragraph": links,
+        "megabytes": round(size_mb, 3),
+    }
+    for name, func in (
+        ("find_split", find_split_images_and_links),
+        ("span_split", span_split_images_and_links),
+        ("text_to_textnodes", text_to_textnodes),
+    ):
+        seconds = time_it(func, corpus, repeat)
+        results[f"{name}_seconds"] = round(seconds, 4)
+        results[f"{name}_mb_per_s"] = round(size_mb / seconds, 2)
+    results["speedup"] = round(
+        results["find_split_seconds"] / results["span_split_seconds"], 2
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--links", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.paragraphs, args.links, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Measure peak traced memory while parsing and rendering a large document.
+
+Run from the repository root:
+
+    python3 -m benchmarks.memory [--blocks N]
+"""
+import argparse
+import json
+import random
+import tracemalloc
+
+from benchmarks.corpus import make_page
+from htmlnode import LeafNode
+from markdownhtml import markdown_to_html_node
+from textnode import TextNode, TextType
+from utils import text_to_textnodes
+
+
+def measure(func) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def instance_size(obj) -> int:
+    # slot-less instances also carry a per-instance __dict__
+    size = obj.__sizeof__()
+    if hasattr(obj, "__dict__"):
+        size += obj.__dict__.__sizeof__()
+    return size
+
+
+def run(blocks: int = 20000, seed: int = 0) -> dict:
+    markdown = make_page(random.Random(seed), "Large document", blocks, "paragraph")
+    paragraphs = [block for block in markdown.split("\n\n")[1:] if block[0] not in "#->"]
+    tree = markdown_to_html_node(markdown)
+    return {
+        "megabytes": round(len(markdown.encode()) / 1e6, 3),
+        "text_node_bytes": instance_size(TextNode("x", TextType.TEXT)),
+        "leaf_node_bytes": instance_size(LeafNode("b", "x")),
+        "peak_text_to_textnodes_mb": round(
+            measure(lambda: [text_to_textnodes(p.replace("\n", " ")) for p in paragraphs]) / 1e6, 3),
+        "peak_markdown_to_html_node_mb": round(
+            measure(lambda: markdown_to_html_node(markdown)) / 1e6, 3),
+        "peak_to_html_mb": round(measure(tree.to_html) / 1e6, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.blocks), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure search indexing time and peak memory as the page count grows.
+
+Pages are rendered once up front; only indexing is measured. With spilling,
+peak memory should stay flat as pages are added, while the in-memory index
+grows with the site. Timings include tracemalloc's overhead, so compare
+them with each other rather than with full builds.
+
+Run from the repository root:
+
+    python3 -m benchmarks.search [--pages N ...] [--max-postings N]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import make_page
+from markdownhtml import iter_block_html
+from search import DEFAULT_MAX_POSTINGS, SearchIndexWriter
+
+
+def index_site(fragments: list[list[str]], pages: int, max_postings: int) -> dict:
+    with tempfile.TemporaryDirectory() as dest:
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            writer = SearchIndexWriter(dest, max_postings)
+            for i in range(pages):
+                # cycle the rendered sample so the corpus can exceed it
+                writer.add_page(f"/{i}/", f"Page {i}", fragments[i % len(fragments)])
+            counts = writer.finish()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "pages": pages,
+        "seconds": round(seconds, 3),
+        "pages_per_s": round(pages / seconds, 1),
+        "peak_mb": round(peak / 1e6, 3),
+        **counts,
+    }
+
+
+def run(page_counts: list[int], max_postings: int, blocks: int = 10,
+        sample: int = 500, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    fragments = [
+        [html for html, _ in iter_block_html(make_page(rng, f"Page {i}", blocks))]
+        for i in range(sample)
+    ]
+    results = []
+    for pages in page_counts:
+        results.append({"mode": "spill", **index_site(fragments, pages, max_postings)})
+        results.append({"mode": "memory", **index_site(fragments, pages, 10**12)})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--max-postings", type=int, default=DEFAULT_MAX_POSTINGS // 10)
+    parser.add_argument("--blocks", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.pages, args.max_postings, args.blocks), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare the serial and async builds on a simulated slow filesystem.
+
+Every file open made by the page and static-file code sleeps for --latency
+milliseconds first, the way opens and writes stall on a network mount.
+
+Run from the repository root:
+
+    python3 -m benchmarks.slowfs [--pages N] [--latency MS] [--io-limit N]
+"""
+import argparse
+import asyncio
+import builtins
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from benchmarks.corpus import write_site
+import asyncbuild
+import files
+import main as site
+import render
+from markdownhtml import BLOCK_MEMO
+
+
+def slow_open(latency: float):
+    def open_with_latency(*args, **kwargs):
+        time.sleep(latency)
+        return builtins.open(*args, **kwargs)
+    return open_with_latency
+
+
+def slow_copy(latency: float):
+    def copy_with_latency(src_path, dest_path):
+        time.sleep(latency)
+        return shutil.copy2(src_path, dest_path)
+    return copy_with_latency
+
+
+def read_tree(root: str) -> dict[str, bytes]:
+    tree = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                tree[os.path.relpath(path, root)] = f.read()
+    return tree
+
+
+def serial_build(root: str, latency: float) -> dict[str, bytes]:
+    dest = os.path.join(root, "serial")
+    files.sync_directory(os.path.join(root, "static"), dest, copy_file=slow_copy(latency))
+    pages = site.discover_pages(os.path.join(root, "content"), dest)
+    site.generate_pages(pages, os.path.join(root, "template.html"), "/")
+    return read_tree(dest)
+
+
+def async_build(root: str, latency: float, io_limit: int, jobs: int) -> dict[str, bytes]:
+    dest = os.path.join(root, f"async{jobs}")
+    with mock.patch("asyncbuild.copy_file", slow_copy(latency)):
+        asyncio.run(asyncbuild.sync_directory_async(
+            os.path.join(root, "static"), dest, io_limit=io_limit
+        ))
+    pages = site.discover_pages(os.path.join(root, "content"), dest)
+    site.generate_pages(pages, os.path.join(root, "template.html"), "/", jobs=jobs,
+                        io_limit=io_limit)
+    return read_tree(dest)
+
+
+def run(pages: int = 200, blocks: int = 20, latency_ms: float = 5.0,
+        io_limit: int = asyncbuild.DEFAULT_IO_LIMIT, jobs: int = 2) -> dict:
+    latency = latency_ms / 1000
+    results = {"pages": pages, "latency_ms": latency_ms, "io_limit": io_limit}
+    with tempfile.TemporaryDirectory() as root:
+        write_site(root, pages, blocks)
+        builds = {
+            "serial": lambda: serial_build(root, latency),
+            "async": lambda: async_build(root, latency, io_limit, 1),
+            f"async_jobs{jobs}": lambda: async_build(root, latency, io_limit, jobs),
+        }
+        trees = {}
+        # the template is cached per process after its first load, so every
+        # build pays latency for sources and outputs only
+        with mock.patch.object(render, "open", slow_open(latency), create=True), \
+                mock.patch.object(asyncbuild, "open", slow_open(latency), create=True), \
+                mock.patch.object(files, "open", slow_open(latency), create=True), \
+                contextlib.redirect_stdout(io.StringIO()):
+            for name, build in builds.items():
+                BLOCK_MEMO.clear()
+                start = time.perf_counter()
+                trees[name] = build()
+                results[f"{name}_seconds"] = round(time.perf_counter() - start, 4)
+    serial = trees.pop("serial")
+    assert all(tree == serial for tree in trees.values()), "async output differs"
+    results["speedup"] = round(results["serial_seconds"] / results["async_seconds"], 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=5.0, metavar="MS")
+    parser.add_argument("--io-limit", type=int, default=asyncbuild.DEFAULT_IO_LIMIT)
+    parser.add_argument("--jobs", type=int, default=2)
+    args = parser.parse_args()
+    print(json.dumps(
+        run(args.pages, args.blocks, args.latency, args.io_limit, args.jobs), indent=2
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from cache import ParseCache
+from fingerprint import AssetManifest
+from files import atomic_open, replace_with_copy, sync_directory
+from images import IMAGE_SIZES, measuring
+from profiling import PageProfile
+from render import LARGE_SOURCE_BYTES, generate_page, render_page
+
+# concurrent file operations in flight at once
+DEFAULT_IO_LIMIT = 16
+
+
+def read_source(path: str) -> str:
+    """Read a markdown source; run on a thread by the async build."""
+    with open(path, "r") as f:
+        return f.read()
+
+
+def write_output(path: str, html: str) -> None:
+    """Write a generated page, creating its directory; run on a thread."""
+    with atomic_open(path) as f:
+        f.write(html)
+
+
+def copy_file(src_path: str, dest_path: str) -> None:
+    """Copy a static file with its metadata; run on a thread."""
+    replace_with_copy(src_path, dest_path)
+
+
+async def generate_pages_async(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    basepath: str,
+    jobs: int = 1,
+    io_limit: int = DEFAULT_IO_LIMIT,
+    profile: bool = False,
+    cache: ParseCache | None = None,
+    minify: bool = False,
+    assets: AssetManifest | None = None,
+) -> list[PageProfile]:
+    """Generate pages with reads, renders and writes overlapping.
+
+    Reads and writes run on a pool of io_limit threads, while rendering runs
+    on a worker pool: one background thread, or jobs worker processes. While
+    one page waits on the filesystem another is rendered, which keeps the
+    CPU busy on high-latency (e.g. network) filesystems. At most 2 * io_limit
+    pages are in flight, which bounds the memory held by read sources and
+    rendered HTML. Output is identical to generate_pages.
+
+    Args:
+        pages: (source path, output path) pairs to render.
+        template_path: HTML template shared by every page.
+        basepath: URL prefix the site is served under.
+        jobs: Number of rendering worker processes; 1 renders on a thread.
+        io_limit: Maximum number of reads and writes in flight.
+        profile: Collect a PageProfile for every page.
+        cache: Parse cache shared by every page (optional).
+        minify: Minify every page while rendering it.
+        assets: Fingerprinted asset names to point URLs at (optional).
+
+    Returns:
+        list[PageProfile]: Page profiles in page order, empty unless profiling.
+
+    Raises:
+        RuntimeError: If a page fails, naming its source file.
+    """
+    if not pages:
+        return []
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"template_path {template_path} does not exist")
+    in_flight = asyncio.Semaphore(2 * io_limit)
+    # one trace lane per page that can be in flight; see _generate_page_async
+    lanes = list(range(2 * io_limit, 0, -1))
+    render_cache = cache
+    if jobs > 1:
+        executor: Executor = ProcessPoolExecutor(max_workers=min(jobs, len(pages)))
+        # workers store without evicting; the cache is trimmed once, below
+        render_cache = cache.worker_copy() if cache else None
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+    with executor, ThreadPoolExecutor(max_workers=io_limit) as io_executor:
+        tasks = [
+            asyncio.ensure_future(_generate_page_async(
+                from_path, template_path, dest_path, basepath, in_flight, lanes, executor,
+                io_executor, profile, render_cache, minify, assets,
+            ))
+            for from_path, dest_path in pages
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    if cache and render_cache is not cache:
+        cache.trim()
+    return [result for result in results if result is not None]
+
+
+async def _generate_page_async(
+    from_path: str,
+    template_path: str,
+    dest_path: str,
+    basepath: str,
+    in_flight: asyncio.Semaphore,
+    lanes: list[int],
+    executor: Executor,
+    io_executor: Executor,
+    profile: bool,
+    cache: ParseCache | None,
+    minify: bool,
+    assets: AssetManifest | None,
+) -> PageProfile | None:
+    loop = asyncio.get_running_loop()
+    page_profile = None
+    try:
+        async with in_flight:
+            lane = lanes.pop()
+            try:
+                if profile:
+                    # pages overlap on the event loop thread; give each one in
+                    # flight its own lane so its spans do not interleave
+                    page_profile = PageProfile(from_path, dest_path)
+                    page_profile.tid = lane
+                size = await loop.run_in_executor(io_executor, os.path.getsize, from_path)
+                if size >= LARGE_SOURCE_BYTES:
+                    # too big to hold as one string: stream it on the pool instead
+                    _, measured = await loop.run_in_executor(
+                        executor, measuring, generate_page, from_path, template_path,
+                        dest_path, basepath, None, cache, minify, assets,
+                    )
+                    IMAGE_SIZES.merge(measured)
+                    return page_profile
+                print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+                content = await loop.run_in_executor(io_executor, read_source, from_path)
+                if page_profile:
+                    page_profile.bytes_in = len(content.encode())
+                    page_profile.mark("read")
+                # a worker process measures images into its own IMAGE_SIZES
+                (html, saved), measured = await loop.run_in_executor(
+                    executor, measuring, render_page, content, template_path, basepath,
+                    cache, minify, assets,
+                )
+                IMAGE_SIZES.merge(measured)
+                if minify:
+                    print(f"Minified {dest_path}: saved {saved} of {len(html) + saved} bytes")
+                if page_profile:
+                    page_profile.bytes_out = len(html.encode())
+                    page_profile.bytes_saved = saved
+                    page_profile.mark("render")
+                await loop.run_in_executor(io_executor, write_output, dest_path, html)
+                if page_profile:
+                    page_profile.mark("write")
+                return page_profile
+            finally:
+                lanes.append(lane)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"failed to generate page from {from_path}: {e}") from e
+
+
+async def sync_directory_async(
+    src_dir: str,
+    dest_dir: str,
+    keep: set[str] | None = None,
+    checksum: bool = False,
+    io_limit: int = DEFAULT_IO_LIMIT,
+    rename: Callable[[str], str] | None = None,
+) -> tuple[list[str], list[str]]:
+    """Like files.sync_directory, but copy the changed files concurrently.
+
+    Returns:
+        tuple[list[str], list[str]]: Destination paths copied and removed.
+    """
+    pending = []
+    copied, removed = await asyncio.to_thread(
+        sync_directory, src_dir, dest_dir, keep, checksum,
+        lambda src_path, dest_path: pending.append((src_path, dest_path)), rename,
+    )
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=io_limit) as io_executor:
+        await asyncio.gather(*(
+            loop.run_in_executor(io_executor, copy_file, src_path, dest_path)
+            for src_path, dest_path in pending
+        ))
+    return copied, removed
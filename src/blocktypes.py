@@ -1,4 +1,6 @@
+from collections.abc import Callable, Iterable, Iterator
 from enum import Enum
+from typing import NamedTuple
 import re
 
 class BlockType(Enum):
@@ -39,9 +41,139 @@ def markdown_to_blocks(markdown: str) -> list[str]:
             del block
     return stripped_markdown
    
+class Block(NamedTuple):
+    """A markdown block yielded by iter_blocks.
+
+    Attributes:
+        text: The block's text with surrounding whitespace stripped.
+        block_type: The detected BlockType, or a custom block type.
+        start_line: 1-based line number of the block's first line.
+        end_line: 1-based line number of the block's last line.
+    """
+    text: str
+    block_type: BlockType | str
+    start_line: int
+    end_line: int
+
+
+def iter_lines(markdown: str) -> Iterator[str]:
+    """Yield the lines of markdown without their newlines, one at a time."""
+    start = 0
+    while True:
+        end = markdown.find("\n", start)
+        if end == -1:
+            yield markdown[start:]
+            return
+        yield markdown[start:end]
+        start = end + 1
+
+
+def iter_blocks(source: str | Iterable[str]) -> Iterator[Block]:
+    """Scan markdown line by line and yield each block as soon as it ends.
+
+    Blocks are separated by empty lines, as in markdown_to_blocks, except
+    that a fenced code block keeps any empty lines inside it. A block opens
+    a fence only if its first line starts with ``` and does not close it
+    again (```x``` is inline code); a fence still open at the end of the
+    source is split on empty lines after all. Only the lines of the current
+    block are held in memory, so source may be a file object or any other
+    iterable of lines.
+
+    Args:
+        source: Markdown text, or an iterable of lines (trailing newlines
+            are ignored).
+
+    Yields:
+        Block: Each non-empty block with its type and line span.
+    """
+    lines = iter_lines(source) if isinstance(source, str) else source
+    block_lines: list[str] = []
+    start_line = 0
+    in_fence = False
+    line_number = 0
+    for line_number, line in enumerate(lines, start=1):
+        if line.endswith("\n"):
+            line = line[:-1]
+        if line == "" and not in_fence:
+            if block_lines:
+                block = _make_block(block_lines, start_line)
+                if block is not None:
+                    yield block
+                block_lines = []
+            continue
+        if not block_lines:
+            start_line = line_number
+            stripped = line.lstrip()
+            in_fence = stripped.startswith("```") and "```" not in stripped[3:]
+        elif in_fence and line.strip().startswith("```"):
+            in_fence = False
+        block_lines.append(line)
+    if in_fence:
+        # never closed, so not a code block: its empty lines separate blocks
+        yield from _split_on_empty_lines(block_lines, start_line)
+    elif block_lines:
+        block = _make_block(block_lines, start_line)
+        if block is not None:
+            yield block
+
+
+def _split_on_empty_lines(lines: list[str], start_line: int) -> Iterator[Block]:
+    group: list[str] = []
+    group_start = start_line
+    for line_number, line in enumerate(lines, start=start_line):
+        if line == "":
+            if group:
+                block = _make_block(group, group_start)
+                if block is not None:
+                    yield block
+                group = []
+            continue
+        if not group:
+            group_start = line_number
+        group.append(line)
+    if group:
+        block = _make_block(group, group_start)
+        if block is not None:
+            yield block
+
+
+def _make_block(lines: list[str], start_line: int) -> Block | None:
+    # same result as "\n".join(lines).strip(), keeping the split lines around
+    first = 0
+    last = len(lines) - 1
+    while first <= last and not lines[first].strip():
+        first += 1
+    while last >= first and not lines[last].strip():
+        last -= 1
+    if first > last:
+        return None
+    lines = lines[first:last + 1]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    text = "\n".join(lines)
+    return Block(text, _block_type(text, lines), start_line + first, start_line + last)
+
+
 def block_to_block_type(block):
-    lines = block.split("\n")
+    return _block_type(block, block.split("\n"))
+
+
+# custom block types (see markdownhtml.register_block_type), tried in order
+# before the built-in ones
+BLOCK_DETECTORS: list[tuple[str, Callable[[str, list[str]], bool]]] = []
+
+
+def register_block_detector(block_type: str,
+                            detector: Callable[[str, list[str]], bool]) -> None:
+    """Detect block_type wherever detector(text, lines) returns True."""
+    BLOCK_DETECTORS[:] = [entry for entry in BLOCK_DETECTORS if entry[0] != block_type]
+    BLOCK_DETECTORS.append((block_type, detector))
+
 
+def _block_type(block: str, lines: list[str]) -> BlockType | str:
+    for block_type, detects in BLOCK_DETECTORS:
+        if detects(block, lines):
+            return block_type
     if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
         return BlockType.HEADING
     if len(lines) > 1 and lines[0].strip().startswith("```") and lines[-1].strip().startswith("```"):
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import shutil
+from files import atomic_open
+
+CACHE_DIR = ".ssgen-cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# eviction trims the cache to this fraction of its cap, so the puts that
+# follow have room before the next eviction walks the cache again
+LOW_WATER = 0.8
+
+
+class ParseCache:
+    """On-disk cache of rendered article bodies keyed by markdown content.
+
+    Each entry holds the HTML produced by markdown_to_html_node(...).to_html()
+    for one source, before any basepath rewriting, so it stays valid when only
+    the template or basepath changes. Keys combine the source's content hash
+    with the parser version, so parser changes never serve stale HTML.
+
+    Entries are plain files; reading one bumps its mtime, and when the cache
+    grows past max_bytes the least recently used entries are evicted down to
+    LOW_WATER of it. Worker processes store through worker_copy(), which
+    never evicts; the parent calls trim() once they are done.
+
+    Attributes:
+        cache_dir (str): Directory holding the entries.
+        max_bytes (int): Size cap for the whole cache.
+        version (str): Parser version mixed into every key.
+        hits (int): Lookups served from the cache.
+        misses (int): Lookups that found nothing.
+    """
+
+    def __init__(self, version: str, cache_dir: str = CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.version = version
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None
+        self._evicts = True
+
+    def key(self, markdown: str, context: str = "") -> str:
+        """Return the cache key for a markdown source.
+
+        Args:
+            markdown: The source text.
+            context: Anything else the rendered HTML depends on, such as
+                the sizes of the images it embeds.
+        """
+        digest = hashlib.sha256(self.version.encode())
+        digest.update(b"\0")
+        digest.update(markdown.encode())
+        if context:
+            digest.update(b"\0")
+            digest.update(context.encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key[2:] + ".html")
+
+    def get(self, key: str) -> str | None:
+        """Return the cached body for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                body = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return body
+
+    def put(self, key: str, body: str) -> None:
+        """Store body under key, evicting old entries if over the size cap."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        replaced = 0
+        if self._evicts and self._size is not None:
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        # written aside and renamed into place, so concurrent workers never
+        # see a partially written entry
+        with atomic_open(path, encoding="utf-8", newline="") as f:
+            f.write(body)
+        if not self._evicts:
+            return
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += os.path.getsize(path) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def worker_copy(self) -> "ParseCache":
+        """Return a copy of this cache for pool workers that never evicts.
+
+        Tracking the size takes a walk of the whole cache, which every task
+        shipped to a worker would repeat.
+        """
+        copy = ParseCache(self.version, self.cache_dir, self.max_bytes)
+        copy._evicts = False
+        return copy
+
+    def trim(self) -> int:
+        """Evict if workers have grown the cache past its cap.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        self._size = self.size()
+        if self._size > self.max_bytes:
+            return self.evict()
+        return 0
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """Return (mtime, size, path) for every entry."""
+        found = []
+        for root, dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                # other caches (e.g. image sizes) share the directory
+                if not name.endswith(".html"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, stat.st_size, path))
+        return found
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> int:
+        """Remove least recently used entries until under LOW_WATER of the cap.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        target = self.max_bytes * LOW_WATER
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+        self._size = 0
@@ -0,0 +1,115 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from files import COMPRESSED_SUFFIX, atomic_open, is_stale_sibling
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt",
+    ".map", ".webmanifest", ".ico",
+}
+# below this size the gzip header and a round trip to check for the sibling
+# cost more than they save
+MIN_SIZE = 256
+# keep a compressed copy only if it is at most this fraction of the original
+MAX_RATIO = 0.9
+
+
+def is_compressible(path: str) -> bool:
+    # hidden files are build metadata (manifest, dependency graph), not content
+    name = os.path.basename(path)
+    if name.startswith("."):
+        return False
+    return os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def precompress_file(path: str, level: int = 9) -> str:
+    """Write path.gz next to path unless it is up to date or not worth it.
+
+    The sibling gets the source's mtime, which is how later runs tell that
+    it is up to date. A sibling that no longer saves enough is removed.
+
+    Args:
+        path: File to compress.
+        level: zlib compression level.
+
+    Returns:
+        str: "compressed", "up to date" or "skipped".
+    """
+    gz_path = path + COMPRESSED_SUFFIX
+    stat = os.stat(path)
+    try:
+        if os.stat(gz_path).st_mtime_ns == stat.st_mtime_ns:
+            return "up to date"
+    except FileNotFoundError:
+        pass
+    if stat.st_size >= MIN_SIZE:
+        with open(path, "rb") as f:
+            data = f.read()
+        # a fixed header mtime keeps the output byte-for-byte reproducible
+        compressed = gzip.compress(data, compresslevel=level, mtime=0)
+        if len(compressed) <= len(data) * MAX_RATIO:
+            with atomic_open(gz_path, "wb") as f:
+                f.write(compressed)
+            os.utime(gz_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            return "compressed"
+    if os.path.exists(gz_path):
+        os.remove(gz_path)
+    return "skipped"
+
+
+def precompress_directory(root: str, jobs: int | None = None,
+                          level: int = 9) -> dict[str, int]:
+    """Write .gz siblings for every compressible file under root, in parallel.
+
+    Compression runs on a thread pool; zlib releases the GIL while it works.
+    Siblings whose source file is gone are removed.
+
+    Args:
+        root: Directory to walk, e.g. the build output.
+        jobs: Worker threads (default: one per CPU).
+        level: zlib compression level.
+
+    Returns:
+        dict[str, int]: Number of files per outcome of precompress_file,
+            plus "removed" for orphaned siblings.
+    """
+    paths = []
+    orphans = []
+    for dirpath, dirs, files in os.walk(root):
+        names = set(files)
+        for name in files:
+            path = os.path.join(dirpath, name)
+            if name.endswith(COMPRESSED_SUFFIX):
+                source = name[:-len(COMPRESSED_SUFFIX)]
+                if is_compressible(source) and source not in names:
+                    orphans.append(path)
+            elif is_compressible(name):
+                paths.append(path)
+    counts = {"compressed": 0, "up to date": 0, "skipped": 0, "removed": len(orphans)}
+    for path in orphans:
+        os.remove(path)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        for outcome in executor.map(lambda path: precompress_file(path, level), paths):
+            counts[outcome] += 1
+    return counts
+
+
+def remove_stale_siblings(root: str) -> list[str]:
+    """Delete .gz siblings under root that no longer match their file.
+
+    Run by builds that do not precompress, so a server that prefers
+    precompressed files never serves a page or asset from an earlier build.
+
+    Returns:
+        list[str]: Siblings removed.
+    """
+    removed = []
+    for dirpath, dirs, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            if (name.endswith(COMPRESSED_SUFFIX)
+                    and is_compressible(name[:-len(COMPRESSED_SUFFIX)])
+                    and is_stale_sibling(path)):
+                os.remove(path)
+                removed.append(path)
+    return removed
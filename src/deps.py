@@ -0,0 +1,184 @@
+import json
+import os
+import re
+from collections.abc import Iterable
+from files import atomic_open
+from utils import extract_markdown_images
+
+DEPS_NAME = ".ssgen-deps.json"
+
+# markdown links that are not images
+_PAGE_LINK_RE = re.compile(r"(?<!!)\[[^\[\]]*\]\(([^\(\)]*)\)")
+
+
+def file_signature(path: str) -> str | None:
+    """Return a cheap change signature (size and mtime) for a file, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _local_path(url: str) -> str | None:
+    # only root-relative URLs point into this site
+    if not url.startswith("/") or url.startswith("//"):
+        return None
+    return url.split("#", 1)[0].split("?", 1)[0].strip("/")
+
+
+def referenced_assets(markdown: str, static_dir: str) -> list[str]:
+    """Return the static files a page embeds or links to.
+
+    Every ![alt](/path) image counts, present or not; a [text](/path) link
+    counts if it points at a file in static_dir rather than at a page. With
+    fingerprinting, the page holds the hashed names of these files.
+    """
+    assets = []
+    for _, url in extract_markdown_images(markdown):
+        path = _local_path(url)
+        if path:
+            assets.append(os.path.normpath(os.path.join(static_dir, path)))
+    for url in _PAGE_LINK_RE.findall(markdown):
+        path = _local_path(url)
+        if path:
+            path = os.path.normpath(os.path.join(static_dir, path))
+            if os.path.isfile(path):
+                assets.append(path)
+    return sorted(set(assets))
+
+
+def linked_pages(markdown: str, content_dir: str) -> list[str]:
+    """Return the markdown sources a page links to with [text](/path) links.
+
+    A link to /blog/post resolves to content/blog/post/index.md if that exists,
+    then content/blog/post.md; a link to a missing page is recorded under both
+    candidates so that creating either later is noticed.
+    """
+    pages = set()
+    for url in _PAGE_LINK_RE.findall(markdown):
+        path = _local_path(url)
+        if path is None:
+            continue
+        if path.endswith(".html"):
+            path = path[:-len(".html")]
+            if os.path.basename(path) == "index":
+                path = os.path.dirname(path)
+        base = os.path.join(content_dir, path) if path else content_dir
+        index = os.path.normpath(os.path.join(base, "index.md"))
+        flat = os.path.normpath(base + ".md")
+        if os.path.exists(index):
+            pages.add(index)
+        elif os.path.exists(flat):
+            pages.add(flat)
+        else:
+            pages.update((index, flat))
+    return sorted(pages)
+
+
+class DependencyGraph:
+    """Persisted record of what every generated page depends on.
+
+    For each markdown source the graph stores the template it was rendered
+    with, the signature of every static asset it references, and whether each
+    page it links to existed. Comparing those snapshots with the current
+    tree tells which pages a template, asset or page addition/removal affects.
+
+    Attributes:
+        path (str): Location of the graph file.
+        pages (dict[str, dict]): Dependency records keyed by source path.
+    """
+
+    def __init__(self, path: str, pages: dict[str, dict] | None = None) -> None:
+        self.path = path
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, dest_dir: str) -> "DependencyGraph":
+        """Load the graph stored in dest_dir, or an empty one."""
+        path = os.path.join(dest_dir, DEPS_NAME)
+        try:
+            with open(path, "r") as f:
+                pages = json.load(f)
+        except (OSError, ValueError):
+            pages = {}
+        if not isinstance(pages, dict):
+            pages = {}
+        return cls(path, pages)
+
+    def record(self, from_path: str, markdown: str | Iterable[str], template_path: str,
+               content_dir: str, static_dir: str) -> None:
+        """Snapshot the dependencies of a page that was just generated.
+
+        Args:
+            from_path: Markdown source path.
+            markdown: The source text, or its lines (e.g. of a memory-mapped
+                source too large to hold as one string).
+            template_path: Template the page was rendered with.
+            content_dir: Root of the markdown sources.
+            static_dir: Root of the static assets.
+        """
+        assets = set()
+        links = set()
+        for chunk in [markdown] if isinstance(markdown, str) else markdown:
+            assets.update(referenced_assets(chunk, static_dir))
+            links.update(linked_pages(chunk, content_dir))
+        self.pages[from_path] = {
+            "template": template_path,
+            "assets": {path: file_signature(path) for path in sorted(assets)},
+            "links": {path: os.path.exists(path) for path in sorted(links)},
+        }
+
+    def stale_reasons(self, from_path: str, template_path: str) -> list[str]:
+        """Explain which recorded dependencies of a page have changed.
+
+        A page with no record yet has nothing to compare against; the build
+        manifest decides whether it is new.
+
+        Returns:
+            list[str]: Human-readable reasons; empty if nothing changed.
+        """
+        entry = self.pages.get(from_path)
+        if entry is None:
+            return []
+        reasons = []
+        if entry.get("template") != template_path:
+            reasons.append(f"template is now {template_path}")
+        for path, signature in entry.get("assets", {}).items():
+            current = file_signature(path)
+            if current != signature:
+                state = "removed" if current is None else "added" if signature is None else "changed"
+                reasons.append(f"asset {path} {state}")
+        for path, existed in entry.get("links", {}).items():
+            exists = os.path.exists(path)
+            if exists != existed:
+                reasons.append(f"linked page {path} {'added' if exists else 'removed'}")
+        return reasons
+
+    def dependents(self, path: str) -> set[str]:
+        """Return the pages a change to a template, asset or page affects.
+
+        Pages linking to a page depend only on whether it exists, as in
+        stale_reasons, so editing a page does not rebuild its linkers.
+        """
+        path = os.path.normpath(path)
+        exists = os.path.exists(path)
+        found = set()
+        for from_path, entry in self.pages.items():
+            links = entry.get("links", {})
+            if (os.path.normpath(entry.get("template", "")) == path or
+                    path in entry.get("assets", {}) or
+                    (path in links and links[path] != exists)):
+                found.add(from_path)
+        return found
+
+    def prune(self, sources: set[str]) -> None:
+        """Forget pages whose sources no longer exist."""
+        for from_path in list(self.pages):
+            if from_path not in sources:
+                del self.pages[from_path]
+
+    def save(self) -> None:
+        """Write the graph to disk."""
+        with atomic_open(self.path) as f:
+            json.dump(self.pages, f, indent=2, sort_keys=True)
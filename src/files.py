@@ -1,12 +1,185 @@
+import hashlib
 import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import IO
 
 TARGET_DIR = "docs"
-SOURCE_DIR = "static"
+# precompressed siblings (see compress.py) survive pruning with their file,
+# as long as they carry its mtime
+COMPRESSED_SUFFIX = ".gz"
 
+# mkstemp creates files 0600; atomic_open gives outputs the usual permissions.
+# Read once: changing the umask is process-wide and not thread-safe.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
-def copy_static_files():
-    remove_target_dir_contents()
-    copy_file_or_directory(SOURCE_DIR, TARGET_DIR)
+
+def hash_file(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents.
+
+    Args:
+        path: Path to the file to hash.
+
+    Returns:
+        str: Hex digest of the file's bytes.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sync_directory(
+    src_dir: str,
+    dest_dir: str,
+    keep: set[str] | None = None,
+    checksum: bool = False,
+    copy_file: Callable[[str, str], object] | None = None,
+    rename: Callable[[str], str] | None = None,
+) -> tuple[list[str], list[str]]:
+    """Make dest_dir mirror src_dir without rewriting unchanged files.
+
+    A file is copied only if it is missing from dest_dir or differs in size
+    or modification time (or, with checksum, in content). Files in dest_dir
+    that no longer exist in src_dir are removed unless listed in keep, which
+    holds outputs produced by other build steps such as generated pages. A
+    file's precompressed ".gz" sibling is kept along with it while it is up
+    to date (see is_stale_sibling).
+
+    Args:
+        src_dir: Directory to mirror.
+        dest_dir: Directory to update in place.
+        keep: Paths under dest_dir that must not be pruned (optional).
+        checksum: Compare file contents by hash instead of trusting mtime.
+        copy_file: Called as copy_file(src, dest) for every file that needs
+            copying; it may defer the copy, e.g. to run copies concurrently.
+            Defaults to replace_with_copy.
+        rename: Maps a file's path relative to src_dir to its path relative
+            to dest_dir, e.g. to fingerprint it (optional).
+
+    Returns:
+        tuple[list[str], list[str]]: Destination paths copied and removed.
+    """
+    keep = {os.path.normpath(path) for path in keep} if keep else set()
+    copy_file = copy_file or replace_with_copy
+    copied = []
+    removed = []
+    expected = set()
+    if not os.path.exists(dest_dir):
+        os.makedirs(dest_dir)
+    for root, dirs, files in os.walk(src_dir):
+        rel_root = os.path.relpath(root, src_dir)
+        dest_root = os.path.normpath(os.path.join(dest_dir, rel_root))
+        expected.add(dest_root)
+        if os.path.isfile(dest_root):
+            os.remove(dest_root)
+        if not os.path.exists(dest_root):
+            os.makedirs(dest_root)
+        for name in files:
+            src_path = os.path.join(root, name)
+            if rename:
+                dest_path = os.path.normpath(
+                    os.path.join(dest_dir, rename(os.path.normpath(os.path.join(rel_root, name))))
+                )
+            else:
+                dest_path = os.path.join(dest_root, name)
+            expected.add(dest_path)
+            if os.path.isdir(dest_path):
+                shutil.rmtree(dest_path)
+            if not _needs_copy(src_path, dest_path, checksum):
+                continue
+            copy_file(src_path, dest_path)
+            copied.append(dest_path)
+    for root, dirs, files in os.walk(dest_dir, topdown=False):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if path in expected or path in keep:
+                continue
+            if path.endswith(COMPRESSED_SUFFIX):
+                original = path[:-len(COMPRESSED_SUFFIX)]
+                if (original in expected or original in keep) and not is_stale_sibling(path):
+                    continue
+            os.remove(path)
+            removed.append(path)
+        for name in dirs:
+            path = os.path.normpath(os.path.join(root, name))
+            if path not in expected and not os.listdir(path):
+                os.rmdir(path)
+    return copied, removed
+
+
+def is_stale_sibling(gz_path: str) -> bool:
+    """Return whether a precompressed sibling no longer matches its file.
+
+    compress.precompress_file gives a sibling its file's mtime; any other
+    mtime, or a missing file, means the sibling holds outdated contents.
+    """
+    try:
+        original = os.stat(gz_path[:-len(COMPRESSED_SUFFIX)])
+    except FileNotFoundError:
+        return True
+    return os.stat(gz_path).st_mtime_ns != original.st_mtime_ns
+
+
+def _needs_copy(src_path: str, dest_path: str, checksum: bool) -> bool:
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src_path)
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return False
+    if not checksum or hash_file(src_path) != hash_file(dest_path):
+        return True
+    # same bytes, different mtime: align the mtime so the next sync is cheap
+    os.utime(dest_path, ns=(dest_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return False
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w", **kwargs) -> Iterator[IO]:
+    """Open a temporary file that replaces path when the block succeeds.
+
+    The file at path is never written in place: readers see either the old
+    or the new contents, a failed write leaves the old file untouched, and a
+    file hard-linked into an earlier build generation keeps its contents.
+
+    Args:
+        path: File to create or replace.
+        mode: "w" or "wb".
+        **kwargs: Passed on to open (e.g. encoding, newline).
+    """
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.exists(dirname):
+        os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname or ".", prefix=".tmp-")
+    try:
+        with open(fd, mode, **kwargs) as f:
+            yield f
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def replace_with_copy(src_path: str, dest_path: str) -> None:
+    """Copy a file with its metadata, replacing dest_path atomically."""
+    dirname = os.path.dirname(dest_path)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname or ".", prefix=".tmp-")
+    os.close(fd)
+    try:
+        shutil.copy2(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def remove_target_dir_contents():
@@ -17,18 +190,3 @@ def remove_target_dir_contents():
             os.remove(os.path.join(root, name))
         for name in dirs:
             os.rmdir(os.path.join(root, name))
-
-
-def copy_file_or_directory(src_path: str, dest_path: str) -> None:
-    # recutsevely copy files and directories from src_path to dest_path
-    if os.path.isdir(src_path):
-        if not os.path.exists(dest_path):
-            os.makedirs(dest_path)
-        for item in os.listdir(src_path):
-            copy_file_or_directory(
-                os.path.join(src_path, item), os.path.join(dest_path, item)
-            )
-    else:
-        with open(src_path, "rb") as src_file:
-            with open(dest_path, "wb") as dest_file:
-                dest_file.write(src_file.read())
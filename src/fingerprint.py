@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import re
+from files import atomic_open
+from manifest import hash_file
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+# hex digits of the content hash kept in a fingerprinted name
+HASH_LENGTH = 10
+
+# a root-relative href or src value, up to any query string or fragment
+_ASSET_URL_RE = re.compile(r'((?:href|src)=")(/[^"?#]*)')
+
+
+def fingerprinted_name(rel_path: str, digest: str) -> str:
+    """Insert a content hash before the extension: a/b.png -> a/b.<hash>.png."""
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+
+class AssetManifest:
+    """Maps static assets to content-hashed names and rewrites references.
+
+    A fingerprinted name depends only on the file's contents, so an unchanged
+    asset keeps its name across builds and can be served with a long-lived
+    cache header, while a changed one gets a new name that no client has
+    cached.
+
+    Attributes:
+        assets (dict[str, str]): Fingerprinted path keyed by the asset's
+            path, both relative to the static directory, with "/" separators.
+        digest (str): Hash of the whole mapping; changes whenever any
+            fingerprint does.
+    """
+
+    def __init__(self, assets: dict[str, str]) -> None:
+        self.assets = assets
+        self._urls = {f"/{path}": f"/{name}" for path, name in assets.items()}
+        self.digest = hashlib.sha256(
+            json.dumps(assets, sort_keys=True).encode()
+        ).hexdigest()
+
+    @classmethod
+    def scan(cls, static_dir: str, dest_dir: str | None = None,
+             checksum: bool = False) -> "AssetManifest":
+        """Fingerprint every file under static_dir.
+
+        With dest_dir, the asset manifest of the previous build is reused: a
+        file whose earlier fingerprinted copy still has the same size and
+        modification time keeps its fingerprint without being hashed again,
+        the same check files.sync_directory uses to skip copies.
+
+        Args:
+            static_dir: Directory of static assets.
+            dest_dir: Output directory of the previous build (optional).
+            checksum: Hash every file, ignoring the previous build.
+
+        Returns:
+            AssetManifest: The current fingerprints.
+        """
+        previous = {} if checksum or dest_dir is None else cls.load(dest_dir).assets
+        assets = {}
+        for root, dirs, files in os.walk(static_dir):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, static_dir).replace(os.sep, "/")
+                fingerprinted = previous.get(rel_path)
+                if fingerprinted is None or not _same_file(
+                        path, os.path.join(dest_dir, fingerprinted)):
+                    fingerprinted = fingerprinted_name(rel_path, hash_file(path))
+                assets[rel_path] = fingerprinted
+        return cls(assets)
+
+    @classmethod
+    def load(cls, dest_dir: str) -> "AssetManifest":
+        """Load the asset manifest written to dest_dir; empty if there is none."""
+        try:
+            with open(os.path.join(dest_dir, ASSET_MANIFEST_NAME), "r") as f:
+                assets = json.load(f)
+        except (OSError, ValueError):
+            assets = {}
+        if not isinstance(assets, dict):
+            assets = {}
+        return cls(assets)
+
+    def save(self, dest_dir: str) -> str:
+        """Write the mapping to dest_dir for servers and deploy tooling.
+
+        Returns:
+            str: Path of the written manifest.
+        """
+        path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+        with atomic_open(path) as f:
+            json.dump(self.assets, f, indent=2, sort_keys=True)
+        return path
+
+    def dest_name(self, rel_path: str) -> str:
+        """Return the name an asset is copied to, given its path in static/."""
+        return self.assets.get(rel_path.replace(os.sep, "/"), rel_path)
+
+    def referenced_digest(self, html: str) -> str:
+        """Hash the fingerprints of just the assets html references.
+
+        Unlike digest, this only changes when one of those assets does, so
+        it can key the output of a template without tying it to every file
+        in the static directory.
+        """
+        referenced = {
+            url[1:]: self._urls[url]
+            for url in (match.group(2) for match in _ASSET_URL_RE.finditer(html))
+            if url in self._urls
+        }
+        return hashlib.sha256(json.dumps(referenced, sort_keys=True).encode()).hexdigest()
+
+    def rewrite(self, html: str) -> str:
+        """Point root-relative href and src values at fingerprinted names.
+
+        URLs that are not assets, such as links to pages, are left as they
+        are, as are query strings and fragments.
+        """
+        if not self._urls:
+            return html
+        urls = self._urls
+        return _ASSET_URL_RE.sub(
+            lambda match: match.group(1) + urls.get(match.group(2), match.group(2)), html
+        )
+
+
+def _same_file(src_path: str, dest_path: str) -> bool:
+    try:
+        src_stat = os.stat(src_path)
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    return (src_stat.st_size == dest_stat.st_size
+            and src_stat.st_mtime_ns == dest_stat.st_mtime_ns)
@@ -1,3 +1,7 @@
+from collections.abc import Iterator
+from typing import TextIO
+
+
 class HTMLNode:
     """Base class for HTML nodes in the document tree.
     
@@ -7,6 +11,9 @@ class HTMLNode:
         children (list[HTMLNode] | None): Child nodes for parent elements.
         props (dict[str, str | None] | None): HTML attributes as a dictionary.
     """
+
+    # nodes are created per inline run, so skip the per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
     
     def __init__(self, tag: str | None = None, value: str | None = None, 
                  children: list['HTMLNode'] | None = None, 
@@ -34,6 +41,30 @@ class HTMLNode:
             NotImplementedError: This method must be implemented by subclasses.
         """
         raise NotImplementedError("Subclasses should implement this method")
+
+    def iter_html(self) -> Iterator[str]:
+        """Yield the node's HTML as a sequence of string chunks.
+
+        Joining the chunks gives the same result as to_html(), but no
+        intermediate string for the whole subtree is ever built.
+
+        Yields:
+            str: Consecutive pieces of the HTML representation.
+
+        Raises:
+            NotImplementedError: This method must be implemented by subclasses.
+        """
+        raise NotImplementedError("Subclasses should implement this method")
+
+    def write_html(self, fp: TextIO) -> None:
+        """Stream the node's HTML into a text file or buffer.
+
+        Args:
+            fp: Any object with a write(str) method.
+        """
+        write = fp.write
+        for chunk in self.iter_html():
+            write(chunk)
     
     def props_to_html(self) -> str:
         """Convert the node's properties to an HTML attribute string.
@@ -44,10 +75,7 @@ class HTMLNode:
         """
         if self.props is None:
             return ""
-        props_str = ""
-        for prop in self.props:
-            props_str += f' {prop}="{self.props[prop]}"'
-        return props_str
+        return "".join([f' {prop}="{value}"' for prop, value in self.props.items()])
     
     def __repr__(self) -> str:
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
@@ -64,6 +92,8 @@ class LeafNode(HTMLNode):
         value (str): The text content of the leaf.
         props (dict[str, str | None] | None): HTML attributes (optional).
     """
+
+    __slots__ = ()
     
     def __init__(self, tag: str | None, value: str, props: dict[str, str | None] | None = None) -> None:
         """Initialize a LeafNode.
@@ -90,6 +120,14 @@ class LeafNode(HTMLNode):
         if self.tag is None:
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+    def iter_html(self) -> Iterator[str]:
+        """Yield the leaf's HTML; a leaf is always a single chunk.
+
+        Raises:
+            ValueError: If value is None.
+        """
+        yield self.to_html()
     
     def __repr__(self) -> str:
         return f"LeafNode(tag={self.tag}, value={self.value}, props={self.props})"
@@ -105,6 +143,8 @@ class ParentNode(HTMLNode):
         children (list[HTMLNode]): List of child nodes.
         props (dict[str, str | None] | None): HTML attributes (optional).
     """
+
+    __slots__ = ()
     
     def __init__(self, tag: str, children: list[HTMLNode], 
                  props: dict[str, str | None] | None = None) -> None:
@@ -123,6 +163,14 @@ class ParentNode(HTMLNode):
         Returns:
             str: HTML representation in the form <tag>children</tag>.
             
+        Raises:
+            ValueError: If tag or children is None.
+        """
+        return "".join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
+        """Yield the opening tag, each child's chunks, then the closing tag.
+
         Raises:
             ValueError: If tag or children is None.
         """
@@ -130,10 +178,10 @@ class ParentNode(HTMLNode):
             raise ValueError("ParentNode must have a tag to convert to HTML")
         if self.children is None:
             raise ValueError("ParentNode must have children to convert to HTML")
-        child_tags = ""
+        yield f"<{self.tag}{self.props_to_html()}>"
         for child in self.children:
-            child_tags += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{child_tags}</{self.tag}>"
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
     
     def __repr__(self) -> str:
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
\ No newline at end of file
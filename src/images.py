@@ -0,0 +1,204 @@
+import json
+import os
+import struct
+from collections.abc import Callable
+from typing import Any
+from cache import CACHE_DIR
+from files import atomic_open
+from manifest import hash_file
+
+# JPEG start-of-frame markers carry the dimensions; C4, C8 and CC share the
+# range but are other segments
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# JPEG markers that stand alone, without a length field
+_JPEG_STANDALONE_MARKERS = set(range(0xD0, 0xDA)) | {0x01}
+
+
+def read_image_size(path: str) -> tuple[int, int] | None:
+    """Read an image's width and height from its header.
+
+    Understands PNG, JPEG, GIF and WebP. Only the header is read, not the
+    pixel data.
+
+    Args:
+        path: Image file to inspect.
+
+    Returns:
+        tuple[int, int] | None: (width, height), or None if the format is
+            not recognized or the header is truncated.
+    """
+    with open(path, "rb") as f:
+        head = f.read(32)
+        try:
+            if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+                return struct.unpack(">II", head[16:24])
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", head[6:10])
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                return _webp_size(head)
+            if head[:2] == b"\xff\xd8":
+                f.seek(2)
+                return _jpeg_size(f)
+        except struct.error:
+            return None
+    return None
+
+
+def _webp_size(head: bytes) -> tuple[int, int] | None:
+    chunk = head[12:16]
+    if chunk == b"VP8 ":
+        # lossy: 14-bit dimensions after the frame tag and start code
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        # lossless: two 14-bit fields, minus one, after the signature byte
+        bits = struct.unpack("<I", head[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        # extended: two 24-bit fields, minus one, after the flags
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def _jpeg_size(f) -> tuple[int, int] | None:
+    # walk the segments up to the first start-of-frame, skipping e.g. EXIF
+    # data by its length instead of reading it
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code in _JPEG_STANDALONE_MARKERS or code == 0x00:
+            continue
+        if code == 0xD9:
+            return None
+        length = struct.unpack(">H", f.read(2))[0]
+        if code in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+class ImageSizes:
+    """Dimensions of the site's images, cached by file hash.
+
+    A size is read from an image's header once and stored under the hash of
+    the file, in a cache that persists across builds, so every page and
+    every later build that embeds the same image reuses it. Each path's
+    hash is remembered with its size and modification time, so an unchanged
+    image is not hashed again either.
+
+    Worker processes measure into their own copy; take_measured() and
+    merge() carry what they read back to the parent, which saves it.
+
+    Attributes:
+        static_dir (str): Directory that root-relative image URLs point into.
+        path (str): Location of the persistent cache.
+    """
+
+    def __init__(self, static_dir: str = "static",
+                 path: str = os.path.join(CACHE_DIR, "image-sizes.json")) -> None:
+        self.static_dir = static_dir
+        self.path = path
+        self._sizes: dict[str, list[int] | None] | None = None
+        self._files: dict[str, list[str]] = {}
+        self._measured: dict[str, dict] = {"sizes": {}, "files": {}}
+        self._dirty = False
+
+    def size(self, url: str) -> tuple[int, int] | None:
+        """Return the dimensions of the local image url points to.
+
+        Args:
+            url: Image URL as written in markdown.
+
+        Returns:
+            tuple[int, int] | None: (width, height), or None for remote
+                URLs and for missing or unrecognized images.
+        """
+        if not url.startswith("/") or url.startswith("//"):
+            return None
+        local = url.split("#", 1)[0].split("?", 1)[0].strip("/")
+        path = os.path.normpath(os.path.join(self.static_dir, local))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if self._sizes is None:
+            self._load()
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        known = self._files.get(path)
+        if known is not None and known[0] == signature:
+            digest = known[1]
+        else:
+            digest = hash_file(path)
+            self._files[path] = self._measured["files"][path] = [signature, digest]
+            self._dirty = True
+        if digest not in self._sizes:
+            try:
+                self._sizes[digest] = read_image_size(path)
+            except OSError:
+                return None
+            self._measured["sizes"][digest] = self._sizes[digest]
+            self._dirty = True
+        size = self._sizes[digest]
+        return (size[0], size[1]) if size else None
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self._sizes = dict(data["sizes"])
+            self._files = dict(data["files"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._sizes = {}
+            self._files = {}
+
+    def take_measured(self) -> dict[str, dict]:
+        """Return the sizes and hashes read since the last call, and forget them."""
+        measured = self._measured
+        self._measured = {"sizes": {}, "files": {}}
+        return measured
+
+    def merge(self, measured: dict[str, dict]) -> None:
+        """Add sizes and hashes another process read (see take_measured)."""
+        if not measured["sizes"] and not measured["files"]:
+            return
+        if self._sizes is None:
+            self._load()
+        self._sizes.update(measured["sizes"])
+        self._files.update(measured["files"])
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist sizes read since the last save, if there are any."""
+        if not self._dirty:
+            return
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with atomic_open(self.path) as f:
+            json.dump({"sizes": self._sizes, "files": self._files}, f, sort_keys=True)
+        self._dirty = False
+
+
+# shared by every render in this process, like BLOCK_MEMO
+IMAGE_SIZES = ImageSizes()
+
+
+def measuring(fn: Callable[..., Any], *args: Any) -> tuple[Any, dict[str, dict]]:
+    """Call fn and return its result with the image sizes it read.
+
+    Submitted to a worker process in place of fn, so the parent can merge
+    the sizes into its own IMAGE_SIZES before saving it.
+    """
+    result = fn(*args)
+    return result, IMAGE_SIZES.take_measured()
@@ -1,59 +1,572 @@
+import argparse
+import asyncio
+import hashlib
+import mmap
 import os
-import sys
-from files import copy_static_files
-from markdownhtml import extract_title, markdown_to_html_node
+from concurrent.futures import ProcessPoolExecutor
+from asyncbuild import DEFAULT_IO_LIMIT, generate_pages_async, sync_directory_async
+from cache import DEFAULT_MAX_BYTES, ParseCache
+from compress import precompress_directory, remove_stale_siblings
+from deps import DependencyGraph
+from fingerprint import ASSET_MANIFEST_NAME, AssetManifest
+from files import remove_target_dir_contents, sync_directory
+from images import IMAGE_SIZES, measuring
+from manifest import BuildManifest, hash_file
+from markdownhtml import BLOCK_MEMO, PARSER_VERSION, extract_title, iter_block_html
+from profiling import BuildProfiler, NullProfiler, PageProfile
+from render import LARGE_SOURCE_BYTES, generate_page, iter_mapped_lines, render_article
+from search import (
+    DEFAULT_MAX_POSTINGS, SEARCH_DIR, PostingsCache, SearchIndexWriter, term_positions,
+)
+from staging import DEFAULT_KEEP_GENERATIONS, StagedOutput
+from templates import load_template
 
 
-def main():
-    basepath = sys.argv[1] if sys.argv and len(sys.argv) > 0 else "/"
+def _at_least_one(value: str) -> int:
+    # --keep-generations 0 would prune the build commit() just rotated out,
+    # leaving nothing to report or roll back to
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the static site into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="URL prefix the site is served under (default: /)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="render pages on N worker processes (0 = one per CPU)")
+    parser.add_argument("--clean", action="store_true",
+                        help="wipe docs/ and rebuild everything from scratch")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static files by content hash, not just size and mtime")
+    parser.add_argument("--profile", metavar="REPORT.json",
+                        help="record per-stage and per-page timings to a JSON report")
+    parser.add_argument("--trace", metavar="TRACE.json",
+                        help="write a Chrome/Perfetto trace of build stages and page phases")
+    parser.add_argument("--slowest", type=int, default=10, metavar="N",
+                        help="with --profile, print the N slowest pages (default: 10)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not read or write the on-disk parse cache")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="empty the parse cache before building")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        metavar="MB", help="parse cache size cap in MiB (default: 256)")
+    parser.add_argument("--explain", action="store_true",
+                        help="print why each regenerated page was rebuilt")
+    parser.add_argument("--async", dest="async_io", action="store_true",
+                        help="overlap file reads and writes with rendering "
+                             "(helps on slow or network filesystems)")
+    parser.add_argument("--io-limit", type=int, default=DEFAULT_IO_LIMIT, metavar="N",
+                        help=f"with --async, file operations in flight at once "
+                             f"(default: {DEFAULT_IO_LIMIT})")
+    parser.add_argument("--in-place", action="store_true",
+                        help="write straight into docs/ instead of building a staged "
+                             "copy and swapping it in")
+    parser.add_argument("--keep-generations", type=_at_least_one, default=DEFAULT_KEEP_GENERATIONS,
+                        metavar="N", help="previous builds to keep for --rollback "
+                                          f"(default: {DEFAULT_KEEP_GENERATIONS})")
+    parser.add_argument("--minify", action="store_true",
+                        help="minify pages as they are rendered and report bytes saved")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="copy static files to content-hashed names, point pages "
+                             "at them and write " + ASSET_MANIFEST_NAME)
+    parser.add_argument("--search", action="store_true",
+                        help=f"write a sharded full-text search index to docs/{SEARCH_DIR}/")
+    parser.add_argument("--gzip", action="store_true",
+                        help="write precompressed .gz siblings of compressible outputs")
+    parser.add_argument("--rollback", action="store_true",
+                        help="swap the previous build back into docs/ and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.rollback:
+        generation = StagedOutput("docs", args.keep_generations).rollback()
+        print(f"Rolled docs back to {generation}")
+        return
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    io_limit = args.io_limit if args.async_io else 0
+    profiler = BuildProfiler() if args.profile or args.trace else NullProfiler()
     print(f"Using basepath: {basepath}")
-    copy_static_files()
-    generate_page_recursive("content", "template.html", "docs", basepath)
+    cache = ParseCache(PARSER_VERSION, max_bytes=args.cache_size * 1024 * 1024)
+    if args.clear_cache:
+        cache.clear()
+    if args.no_cache:
+        cache = None
+    if args.in_place:
+        if args.clean:
+            # the sync in _build copies static files back, keeping their mtimes
+            with profiler.stage("clean_output"):
+                remove_target_dir_contents()
+        _build("docs", args, jobs, io_limit, profiler, cache)
+    else:
+        # build next to docs/ and swap it in whole, so docs/ never holds a
+        # half-written site, even if the build fails
+        staged = StagedOutput("docs", args.keep_generations)
+        with profiler.stage("stage_output"):
+            dest_dir = staged.prepare(clean=args.clean)
+        try:
+            _build(dest_dir, args, jobs, io_limit, profiler, cache)
+        except BaseException:
+            staged.discard()
+            raise
+        with profiler.stage("swap_output"):
+            previous = staged.commit()
+        if previous:
+            print(f"Swapped in new build; previous build kept at {previous}")
+    if jobs == 1:
+        print(
+            f"Block memo: {BLOCK_MEMO.hits} hits, {BLOCK_MEMO.misses} misses, "
+            f"{BLOCK_MEMO.evictions} evictions"
+        )
+    if args.profile:
+        profiler.write(args.profile)
+        profiler.print_slowest(args.slowest)
+        print(f"Wrote build profile to {args.profile}")
+    if args.trace:
+        profiler.write_trace(args.trace)
+        print(f"Wrote build trace to {args.trace}")
 
 
-def generate_page(
-    from_path: str, template_path: str, dest_path: str, basepath: str
+def _build(
+    dest_dir: str,
+    args: argparse.Namespace,
+    jobs: int,
+    io_limit: int,
+    profiler: BuildProfiler | NullProfiler,
+    cache: ParseCache | None,
 ) -> None:
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    if not os.path.exists(from_path):
-        raise FileNotFoundError(f"from_path {from_path} does not exist")
+    with profiler.stage("load_manifest"):
+        manifest = BuildManifest.load(dest_dir)
+        graph = DependencyGraph.load(dest_dir)
+    with profiler.stage("discover_pages"):
+        pages = discover_pages("content", dest_dir)
+    keep = {dest_path for _, dest_path in pages} | {manifest.path, graph.path}
+    if args.search:
+        keep |= _files_under(os.path.join(dest_dir, SEARCH_DIR))
+    assets = None
+    rename = None
+    if args.fingerprint:
+        with profiler.stage("fingerprint_assets"):
+            assets = AssetManifest.scan("static", dest_dir, args.checksum)
+        keep.add(os.path.join(dest_dir, ASSET_MANIFEST_NAME))
+        rename = assets.dest_name
+    with profiler.stage("copy_static_files"):
+        if io_limit:
+            copied, removed = asyncio.run(sync_directory_async(
+                "static", dest_dir, keep, args.checksum, io_limit, rename
+            ))
+        else:
+            copied, removed = sync_directory(
+                "static", dest_dir, keep, args.checksum, rename=rename
+            )
+        if assets:
+            assets.save(dest_dir)
+    print(f"Synced static files: {len(copied)} copied, {len(removed)} removed")
+    generate_page_recursive(
+        "content", "template.html", dest_dir, args.basepath, manifest, jobs=jobs,
+        profiler=profiler, cache=cache, graph=graph, explain=args.explain,
+        io_limit=io_limit, minify=args.minify, assets=assets, pages=pages,
+    )
+    if args.search:
+        with profiler.stage("search_index"):
+            counts = index_pages(pages, dest_dir, args.basepath, cache, manifest=manifest)
+        print(
+            f"Indexed {counts['pages']} page(s): {counts['terms']} terms in "
+            f"{counts['shards']} shard(s)"
+        )
+    with profiler.stage("save_manifest"):
+        manifest.save()
+        graph.save()
+        IMAGE_SIZES.save()
+    if args.gzip:
+        with profiler.stage("precompress"):
+            counts = precompress_directory(dest_dir)
+        print(
+            f"Precompressed {counts['compressed']} file(s), {counts['up to date']} up to "
+            f"date, {counts['skipped']} not worth compressing"
+        )
+    else:
+        # siblings from an earlier --gzip build would shadow regenerated files
+        with profiler.stage("precompress"):
+            stale = remove_stale_siblings(dest_dir)
+        if stale:
+            print(f"Removed {len(stale)} outdated precompressed file(s)")
+
+
+def _files_under(root: str) -> set[str]:
+    return {
+        os.path.join(dirpath, name)
+        for dirpath, _, names in os.walk(root) for name in names
+    }
+
+
+def index_pages(
+    pages: list[tuple[str, str]],
+    dest_dir: str,
+    basepath: str,
+    cache: ParseCache | None = None,
+    max_postings: int = DEFAULT_MAX_POSTINGS,
+    manifest: BuildManifest | None = None,
+) -> dict[str, int]:
+    """Write the full-text search index of every page (see search.py).
+
+    Every page is indexed, not just the ones this build regenerated, from
+    the same article HTML the page was rendered from. With a parse cache,
+    each page's terms are also kept in a PostingsCache next to it, keyed by
+    the source hash the manifest recorded, so a page unchanged since an
+    earlier build is neither read nor rendered again.
+
+    Args:
+        pages: (source path, output path) pairs to index.
+        dest_dir: Build output directory; the index goes under SEARCH_DIR.
+        basepath: URL prefix the site is served under.
+        cache: Parse cache (optional).
+        max_postings: Postings held in memory before spilling to disk.
+        manifest: Build manifest holding the pages' source hashes (optional).
+
+    Returns:
+        dict[str, int]: Counts from SearchIndexWriter.finish.
+    """
+    postings = (
+        PostingsCache(PARSER_VERSION, os.path.join(cache.cache_dir, SEARCH_DIR))
+        if cache else None
+    )
+    writer = SearchIndexWriter(dest_dir, max_postings)
+    try:
+        for from_path, dest_path in pages:
+            url = basepath + os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+            url = url.removesuffix("index.html")
+            source_hash = None
+            if postings:
+                entry = manifest.entries.get(from_path, {}) if manifest else {}
+                source_hash = entry.get("source_hash") or hash_file(from_path)
+                cached = postings.get(source_hash)
+                if cached is not None:
+                    writer.add_positions(url, *cached)
+                    continue
+            title, positions = _page_terms(from_path, cache)
+            writer.add_positions(url, title, positions)
+            if postings:
+                postings.put(source_hash, title, positions)
+    except BaseException:
+        writer.discard()
+        raise
+    if postings:
+        postings.prune()
+    return writer.finish()
+
+
+def _page_terms(
+    from_path: str, cache: ParseCache | None
+) -> tuple[str, dict[str, list[int]]]:
+    if os.path.getsize(from_path) >= LARGE_SOURCE_BYTES:
+        with open(from_path, "rb") as from_file, mmap.mmap(
+            from_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            title = _title_or_empty(iter_mapped_lines(mapped))
+            return title, term_positions(
+                fragment for fragment, _ in iter_block_html(iter_mapped_lines(mapped))
+            )
     with open(from_path, "r") as from_file:
         content = from_file.read()
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"template_path {template_path} does not exist")
-    with open(template_path, "r") as template_file:
-        template = template_file.read()
-    html_nodes = markdown_to_html_node(content)
-    page_title = extract_title(content)
-    final_html = template.replace("{{ Title }}", page_title if page_title else "")
-    final_html = final_html.replace("{{ Content }}", html_nodes.to_html())
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
-    dirname = os.path.dirname(dest_path)
-    if dirname and not os.path.exists(dirname):
-        os.makedirs(dirname)
-    with open(dest_path, "w") as dest_file:
-        dest_file.write(final_html)
+    return _title_or_empty(content), term_positions(render_article(content, None, cache))
 
 
-def generate_page_recursive(
-    from_path: str, template_path: str, dest_path: str, basepath: str
-) -> None:
+def _title_or_empty(markdown) -> str:
+    try:
+        return extract_title(markdown)
+    except ValueError:
+        return ""
+
+
+def build_options(minify: bool = False, assets: AssetManifest | None = None,
+                  template_path: str = "template.html") -> dict:
+    """Return the build options recorded in the manifest for every page.
+
+    Pages recorded with other options (or by an older parser) are rebuilt.
+    With fingerprinting, only the assets the template references are part
+    of the options; an asset a page itself references is a dependency of
+    that page alone (see deps.referenced_assets).
+
+    Args:
+        minify: Whether pages are minified.
+        assets: Fingerprinted asset names pages point at (optional).
+        template_path: HTML template shared by every page.
+
+    Returns:
+        dict: JSON-serializable options.
+    """
+    options = {"parser": PARSER_VERSION}
+    if minify:
+        options["minify"] = True
+    if assets:
+        template = load_template(template_path)
+        options["assets"] = assets.referenced_digest("".join(template.segments))
+    return options
+
+
+def discover_pages(from_path: str, dest_path: str) -> list[tuple[str, str]]:
+    """Walk a content directory and pair each markdown source with its output.
+
+    Args:
+        from_path: Content directory to walk.
+        dest_path: Output directory mirroring from_path.
+
+    Returns:
+        list[tuple[str, str]]: (source path, output path) pairs in walk order.
+    """
+    pages = []
     if os.path.isdir(from_path):
         for item in os.listdir(from_path):
             if item.endswith(".md"):
                 item_from_path = os.path.join(from_path, item)
                 item_dest_path = os.path.join(dest_path, item.replace(".md", ".html"))
-                generate_page(item_from_path, template_path, item_dest_path, basepath)
+                pages.append((item_from_path, item_dest_path))
             else:
                 if os.path.isdir(os.path.join(from_path, item)):
                     item_dest_path = os.path.join(dest_path, item)
-                    generate_page_recursive(
-                        os.path.join(from_path, item),
-                        template_path,
-                        item_dest_path,
-                        basepath,
+                    pages.extend(
+                        discover_pages(os.path.join(from_path, item), item_dest_path)
                     )
+    return pages
+
+
+def _generate_page_job(
+    from_path: str,
+    template_path: str,
+    dest_path: str,
+    basepath: str,
+    profile: bool = False,
+    cache: ParseCache | None = None,
+    minify: bool = False,
+    assets: AssetManifest | None = None,
+) -> PageProfile | None:
+    # errors raised in a worker lose their traceback context when they cross
+    # the process boundary, so name the failing source in the message itself
+    try:
+        page_profile = PageProfile(from_path, dest_path) if profile else None
+        generate_page(
+            from_path, template_path, dest_path, basepath, page_profile, cache, minify,
+            assets,
+        )
+        return page_profile
+    except Exception as e:
+        raise RuntimeError(f"failed to generate page from {from_path}: {e}") from e
+
+
+def generate_pages(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    basepath: str,
+    jobs: int = 1,
+    profile: bool = False,
+    cache: ParseCache | None = None,
+    io_limit: int = 0,
+    minify: bool = False,
+    assets: AssetManifest | None = None,
+) -> list[PageProfile]:
+    """Generate a batch of independent pages, optionally on a process pool.
+
+    Args:
+        pages: (source path, output path) pairs to render.
+        template_path: HTML template shared by every page.
+        basepath: URL prefix the site is served under.
+        jobs: Number of worker processes; 1 renders serially in-process.
+        profile: Collect a PageProfile for every page.
+        cache: Parse cache shared by every page (optional).
+        io_limit: If set, build asynchronously with at most this many file
+            operations in flight (see asyncbuild.generate_pages_async).
+        minify: Minify every page while rendering it.
+        assets: Fingerprinted asset names to point URLs at (optional).
+
+    Returns:
+        list[PageProfile]: Page profiles in page order, empty unless profiling.
+
+    Raises:
+        RuntimeError: If a page fails, naming its source file.
+    """
+    if io_limit:
+        return asyncio.run(generate_pages_async(
+            pages, template_path, basepath, jobs, io_limit, profile, cache, minify, assets
+        ))
+    if jobs <= 1 or len(pages) <= 1:
+        results = [
+            _generate_page_job(
+                item_from_path, template_path, item_dest_path, basepath, profile, cache,
+                minify, assets,
+            )
+            for item_from_path, item_dest_path in pages
+        ]
+        return [result for result in results if result is not None]
+    # workers store without evicting; the cache is trimmed once, below
+    worker_cache = cache.worker_copy() if cache else None
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pages))) as executor:
+        futures = [
+            executor.submit(
+                measuring,
+                _generate_page_job,
+                item_from_path,
+                template_path,
+                item_dest_path,
+                basepath,
+                profile,
+                worker_cache,
+                minify,
+                assets,
+            )
+            for item_from_path, item_dest_path in pages
+        ]
+        try:
+            results = []
+            for future in futures:
+                result, measured = future.result()
+                # workers measure images into their own IMAGE_SIZES
+                IMAGE_SIZES.merge(measured)
+                results.append(result)
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    if cache:
+        cache.trim()
+    return [result for result in results if result is not None]
+
+
+def generate_page_recursive(
+    from_path: str,
+    template_path: str,
+    dest_path: str,
+    basepath: str,
+    manifest: BuildManifest | None = None,
+    jobs: int = 1,
+    profiler: BuildProfiler | NullProfiler | None = None,
+    cache: ParseCache | None = None,
+    graph: DependencyGraph | None = None,
+    explain: bool = False,
+    static_dir: str = "static",
+    io_limit: int = 0,
+    minify: bool = False,
+    assets: AssetManifest | None = None,
+    pages: list[tuple[str, str]] | None = None,
+) -> None:
+    """Generate every page under from_path that needs it.
+
+    With a manifest, a page is regenerated only if its source, template or
+    basepath changed or its output is missing; with a dependency graph as
+    well, also if a static asset it embeds changed or a page it links to
+    appeared or disappeared.
+
+    Args:
+        from_path: Content directory to walk.
+        template_path: HTML template shared by every page.
+        dest_path: Output directory mirroring from_path.
+        basepath: URL prefix the site is served under.
+        manifest: Build manifest; None regenerates every page.
+        jobs: Number of worker processes.
+        profiler: Collects stage timings (optional).
+        cache: Parse cache shared by every page (optional).
+        graph: Dependency graph, updated for every page (optional).
+        explain: Print why each regenerated page was rebuilt.
+        static_dir: Root of the static assets pages may embed.
+        io_limit: If set, generate pages asynchronously (see generate_pages).
+        minify: Minify pages while rendering them.
+        assets: Fingerprinted asset names to point URLs at (optional).
+        pages: The pages under from_path, if already discovered (see
+            discover_pages).
+    """
+    profiler = profiler or NullProfiler()
+    profile = isinstance(profiler, BuildProfiler)
+    if pages is None:
+        with profiler.stage("discover_pages"):
+            pages = discover_pages(from_path, dest_path)
+    if manifest is None:
+        with profiler.stage("generate_pages"):
+            profiler.add_pages(
+                generate_pages(
+                    pages, template_path, basepath, jobs, profile, cache, io_limit, minify,
+                    assets,
+                )
+            )
+        return
+    with profiler.stage("check_manifest"):
+        template_hash = hash_file(template_path)
+        options = build_options(minify, assets, template_path)
+        source_hashes = {}
+        stale_pages = []
+        for item_from_path, item_dest_path in pages:
+            source = None
+            if graph is None or os.path.getsize(item_from_path) >= LARGE_SOURCE_BYTES:
+                source_hash = hash_file(item_from_path)
+            else:
+                # read once: the dependencies are recorded from the same bytes
+                with open(item_from_path, "rb") as from_file:
+                    source = from_file.read()
+                source_hash = hashlib.sha256(source).hexdigest()
+            reasons = manifest.stale_reasons(
+                item_from_path, item_dest_path, source_hash, template_hash, basepath,
+                options,
+            )
+            if graph is not None:
+                reasons += graph.stale_reasons(item_from_path, template_path)
+            if not reasons:
+                print(f"Skipping unchanged page {item_from_path}")
+                if graph is not None and item_from_path not in graph.pages:
+                    _record_dependencies(graph, item_from_path, source, template_path,
+                                         from_path, static_dir)
+                continue
+            if explain:
+                print(f"Rebuilding {item_from_path}: {'; '.join(reasons)}")
+            source_hashes[item_from_path] = source_hash
+            stale_pages.append((item_from_path, item_dest_path))
+            if graph is not None:
+                # generating the page changes none of what is recorded
+                _record_dependencies(graph, item_from_path, source, template_path,
+                                     from_path, static_dir)
+    with profiler.stage("generate_pages"):
+        profiler.add_pages(
+            generate_pages(
+                stale_pages, template_path, basepath, jobs, profile, cache, io_limit,
+                minify, assets,
+            )
+        )
+    for item_from_path, item_dest_path in stale_pages:
+        manifest.record(
+            item_from_path,
+            item_dest_path,
+            source_hashes[item_from_path],
+            template_hash,
+            basepath,
+            options,
+        )
+    sources = {item_from_path for item_from_path, _ in pages}
+    for removed in manifest.prune(sources):
+        print(f"Removed stale page {removed}")
+    if graph is not None:
+        graph.prune(sources)
+
+
+def _record_dependencies(
+    graph: DependencyGraph,
+    from_path: str,
+    source: bytes | None,
+    template_path: str,
+    content_dir: str,
+    static_dir: str,
+) -> None:
+    if source is not None:
+        graph.record(from_path, source.decode(), template_path, content_dir, static_dir)
+        return
+    # a large source is scanned line by line from the mapping, never held whole
+    with open(from_path, "rb") as from_file, mmap.mmap(
+        from_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        graph.record(from_path, iter_mapped_lines(mapped), template_path, content_dir,
+                     static_dir)
 
 
 if __name__ == "__main__":
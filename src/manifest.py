@@ -0,0 +1,152 @@
+import json
+import os
+from files import atomic_open, hash_file
+
+MANIFEST_NAME = ".ssgen-manifest.json"
+
+
+class BuildManifest:
+    """Record of the inputs each generated page was built from.
+
+    The manifest lives in the output directory and maps every markdown source
+    to the hashes of its source and template, the basepath, and the output
+    path it produced. A page whose recorded inputs all match the current ones
+    (and whose output still exists) does not need to be regenerated.
+
+    Output paths are stored relative to the manifest's directory, so the
+    manifest stays valid when the output directory is built under another
+    name (a staging directory) and then renamed into place.
+
+    Attributes:
+        path (str): Location of the manifest file.
+        entries (dict[str, dict[str, str]]): Recorded inputs keyed by source path.
+    """
+
+    def __init__(self, path: str, entries: dict[str, dict[str, str]] | None = None) -> None:
+        """Initialize a BuildManifest.
+
+        Args:
+            path: Location of the manifest file.
+            entries: Previously recorded entries (optional).
+        """
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.base = os.path.dirname(path)
+
+    @classmethod
+    def load(cls, dest_dir: str) -> "BuildManifest":
+        """Load the manifest stored in dest_dir.
+
+        A missing or unreadable manifest yields an empty one, which simply
+        causes every page to be rebuilt.
+
+        Args:
+            dest_dir: The build output directory.
+
+        Returns:
+            BuildManifest: The loaded manifest.
+        """
+        path = os.path.join(dest_dir, MANIFEST_NAME)
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        if not isinstance(entries, dict):
+            entries = {}
+        return cls(path, entries)
+
+    def is_fresh(self, from_path: str, dest_path: str, source_hash: str,
+                 template_hash: str, basepath: str,
+                 options: dict | None = None) -> bool:
+        """Check whether a page's recorded inputs match the current ones.
+
+        Args:
+            from_path: Markdown source path.
+            dest_path: HTML output path.
+            source_hash: Current hash of the source.
+            template_hash: Current hash of the template.
+            basepath: Current basepath.
+            options: Build options that change the output, e.g. minify.
+
+        Returns:
+            bool: True if the page can be skipped.
+        """
+        return not self.stale_reasons(from_path, dest_path, source_hash,
+                                      template_hash, basepath, options)
+
+    def stale_reasons(self, from_path: str, dest_path: str, source_hash: str,
+                      template_hash: str, basepath: str,
+                      options: dict | None = None) -> list[str]:
+        """Explain why a page's recorded inputs no longer match.
+
+        Takes the same arguments as is_fresh.
+
+        Returns:
+            list[str]: Human-readable reasons; empty if the page is fresh.
+        """
+        entry = self.entries.get(from_path)
+        if entry is None:
+            return ["new page"]
+        reasons = []
+        if entry.get("source_hash") != source_hash:
+            reasons.append("source changed")
+        if entry.get("template_hash") != template_hash:
+            reasons.append("template changed")
+        if entry.get("basepath") != basepath:
+            reasons.append("basepath changed")
+        if entry.get("options", {}) != (options or {}):
+            reasons.append("build options changed")
+        if entry.get("output") != self._relative(dest_path):
+            reasons.append("output path changed")
+        elif not os.path.exists(dest_path):
+            reasons.append("output missing")
+        return reasons
+
+    def record(self, from_path: str, dest_path: str, source_hash: str,
+               template_hash: str, basepath: str,
+               options: dict | None = None) -> None:
+        """Record the inputs a page was just generated from."""
+        entry = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "basepath": basepath,
+            "output": self._relative(dest_path),
+        }
+        if options:
+            entry["options"] = options
+        self.entries[from_path] = entry
+
+    def _relative(self, dest_path: str) -> str:
+        return os.path.relpath(dest_path, self.base or os.curdir)
+
+    def prune(self, sources: set[str]) -> list[str]:
+        """Forget pages whose sources no longer exist and delete their outputs.
+
+        Args:
+            sources: Source paths seen in the current build.
+
+        Returns:
+            list[str]: Output paths that were removed.
+        """
+        removed = []
+        live_outputs = {self.entries[s].get("output") for s in sources if s in self.entries}
+        for from_path in list(self.entries):
+            if from_path in sources:
+                continue
+            output = self.entries.pop(from_path).get("output")
+            if not output or output in live_outputs:
+                continue
+            output = os.path.join(self.base, output)
+            if os.path.exists(output):
+                os.remove(output)
+                removed.append(output)
+        return removed
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+        with atomic_open(self.path) as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
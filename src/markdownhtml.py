@@ -1,113 +1,272 @@
-from blocktypes import BlockType, markdown_to_blocks, block_to_block_type
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from blocktypes import BlockType, iter_blocks, iter_lines, register_block_detector
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from profiling import count_nodes
+from registry import RendererRegistry
 from utils import text_node_to_html_node, text_to_textnodes
 import re
 
+# bump whenever a change alters the HTML produced for the same markdown, so
+# cached renders from older parsers are never reused
+PARSER_VERSION = "3"
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
+
+def markdown_to_html_node(markdown: str | Iterable[str]) -> ParentNode:
     """Convert markdown text to an HTML node tree.
 
     Parses markdown blocks and converts them to appropriate HTML elements,
-    including paragraphs, headings, code blocks, quotes, and lists.
+    including paragraphs, headings, code blocks, quotes, and lists. Blocks
+    are scanned lazily with iter_blocks.
 
     Args:
-        markdown: Raw markdown text to convert.
+        markdown: Raw markdown text to convert, or an iterable of lines.
 
     Returns:
         ParentNode: A div node containing the converted HTML structure.
     """
+    return ParentNode("div", children=list(iter_block_nodes(markdown)), props=None)
+
+
+def iter_block_nodes(markdown: str | Iterable[str]) -> Iterator[HTMLNode]:
+    """Yield the HTML node of each markdown block as soon as it is parsed.
+
+    Unlike markdown_to_html_node, no tree for the whole document is kept,
+    so a very large source can be rendered one block at a time.
+
+    Args:
+        markdown: Raw markdown text, or an iterable of lines.
+
+    Yields:
+        HTMLNode: One node per block, in document order.
+    """
+    for block, block_type, _, _ in iter_blocks(markdown):
+        yield block_to_html_node(block, block_type)
+
+
+class BlockMemo:
+    """Bounded LRU memo of rendered block HTML keyed by block type and text.
+
+    Rendering a block depends only on its text and type, so identical blocks
+    (an unchanged paragraph in a page being edited, or boilerplate shared by
+    many pages) reuse the fragment rendered the first time. The memo lives
+    for the whole process, which covers repeated builds in watch mode.
+
+    Attributes:
+        max_entries (int): Most fragments kept.
+        max_bytes (int): Most characters of block text plus HTML kept.
+        hits (int): Blocks served from the memo.
+        misses (int): Blocks that had to be parsed and rendered.
+        evictions (int): Entries dropped to stay within the bounds.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[BlockType | str, str], tuple[str, int]] = OrderedDict()
+        self._bytes = 0
+
+    def render(self, block: str, block_type: BlockType | str) -> tuple[str, int]:
+        """Return the block's HTML and the number of nodes it renders to.
+
+        Args:
+            block: Block text as produced by iter_blocks.
+            block_type: The block's detected BlockType.
+
+        Returns:
+            tuple[str, int]: The HTML fragment and its node count.
+        """
+        key = (block_type, block)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        node = block_to_html_node(block, block_type)
+        entry = (node.to_html(), count_nodes(node))
+        self._entries[key] = entry
+        self._bytes += len(block) + len(entry[0])
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._bytes > self.max_bytes):
+            (_, old_block), (old_html, _) = self._entries.popitem(last=False)
+            self._bytes -= len(old_block) + len(old_html)
+            self.evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# shared by every page rendered in this process
+BLOCK_MEMO = BlockMemo()
+
+
+def iter_block_html(markdown: str | Iterable[str],
+                    memo: BlockMemo | None = None) -> Iterator[tuple[str, int]]:
+    """Yield each block's rendered HTML, reusing memoized fragments.
+
+    Joining the fragments inside <div>...</div> gives the same HTML as
+    markdown_to_html_node(markdown).to_html().
+
+    Args:
+        markdown: Raw markdown text, or an iterable of lines.
+        memo: Memo to use (defaults to the process-wide BLOCK_MEMO).
+
+    Yields:
+        tuple[str, int]: Each block's HTML fragment and its node count.
+    """
+    memo = memo if memo is not None else BLOCK_MEMO
+    for block, block_type, _, _ in iter_blocks(markdown):
+        yield memo.render(block, block_type)
+
+
+def block_to_html_node(block: str, block_type: BlockType | str) -> HTMLNode:
+    """Convert a single markdown block to its HTML node.
+
+    Dispatches to the renderer BLOCK_RENDERERS holds for block_type.
+
+    Args:
+        block: Block text as produced by iter_blocks.
+        block_type: The block's detected BlockType, or a custom block type
+            added with register_block_type.
+
+    Returns:
+        HTMLNode: The node for the block.
+
+    Raises:
+        ValueError: If no renderer is registered for block_type.
+    """
+    return BLOCK_RENDERERS.render(block_type, block)
+
+
+def register_block_type(block_type: str, detector: Callable[[str, list[str]], bool],
+                        renderer: Callable[[str], HTMLNode]) -> None:
+    """Add a block type of your own, e.g. admonitions or tables.
+
+    Custom detectors are tried in registration order before the built-in
+    ones, so a custom type may claim blocks that would otherwise be, say,
+    quotes. Registering an existing type again replaces it.
+
+    Rendered blocks are memoized and article HTML is cached on disk, so
+    register types before building, and clear the parse cache
+    (--clear-cache) after changing what a renderer produces. Worker
+    processes must register the same types, e.g. at import time.
+
+    Args:
+        block_type: Name of the new type.
+        detector: Called as detector(text, lines) for every block; returns
+            True if the block is of this type.
+        renderer: Called with the block's text; returns its HTML node.
+    """
+    register_block_detector(block_type, detector)
+    BLOCK_RENDERERS.register(block_type, renderer)
+    BLOCK_MEMO.clear()
+
+
+# renderer for each block type, called with the block's text
+BLOCK_RENDERERS = RendererRegistry("block type")
+
+
+@BLOCK_RENDERERS.register(BlockType.PARAGRAPH)
+def _render_paragraph(block: str) -> HTMLNode:
+    stripped_paragraph: str = re.sub(r"\s+", " ", block).strip()
+    text_nodes = text_to_textnodes(stripped_paragraph)
+    paragraph_nodes: list[HTMLNode] = []
+    for node in text_nodes:
+        paragraph_nodes.append(text_node_to_html_node(node))
+    return ParentNode("p", children=paragraph_nodes, props=None)
+
+
+@BLOCK_RENDERERS.register(BlockType.HEADING)
+def _render_heading(block: str) -> HTMLNode:
+    left_stripped_heading: str = block.lstrip()
+    heading_count: int = 0
+    for ch in left_stripped_heading:
+        if ch == "#":
+            heading_count += 1
+        else:
+            break
+    stripped_heading: str = left_stripped_heading[heading_count:].lstrip()
+    text_nodes = text_to_textnodes(stripped_heading)
+    heading_nodes: list[HTMLNode] = []
+    for node in text_nodes:
+        leaf_heading = text_node_to_html_node(node)
+        heading_nodes.append(leaf_heading)
+    return ParentNode(f"h{heading_count}", children=heading_nodes, props=None)
+
+
+@BLOCK_RENDERERS.register(BlockType.CODE)
+def _render_code(block: str) -> HTMLNode:
+    lines: list[str] = block.split("\n")
+    inner_lines: list[str] = [line.lstrip() for line in lines[1:-1]]
+    raw_code: str = "\n".join(inner_lines) + "\n"
+    return ParentNode(
+        "pre",
+        children=[
+            ParentNode(
+                "code",
+                children=[LeafNode(None, raw_code, None)],
+                props=None,
+            )
+        ],
+        props=None,
+    )
+
+
+@BLOCK_RENDERERS.register(BlockType.QUOTE)
+def _render_quote(block: str) -> HTMLNode:
+    left_stripped_quote: str = block.lstrip()
+    # remove leading ">" and any whitespace after it
+    split_quote: list[str] = left_stripped_quote.split("\n")
+    clean_lines: list[str] = []
+    for line in split_quote:
+        line = line.lstrip()
+        if line.startswith(">"):
+            line = line.replace("> ", "", 1)
+        clean_lines.append(line)
+    joined_quote: str = " ".join(clean_lines).strip()
+    text_nodes = text_to_textnodes(joined_quote)
+    leaf_nodes: list[HTMLNode] = [
+        text_node_to_html_node(node) for node in text_nodes
+    ]
+    return ParentNode("blockquote", children=leaf_nodes, props=None)
+
+
+@BLOCK_RENDERERS.register(BlockType.UNORDERED_LIST)
+def _render_unordered_list(block: str) -> HTMLNode:
+    split_list: list[str] = block.split("\n")
+    list_items: list[HTMLNode] = []
+    for item in split_list:
+        stripped_item: str = item.replace("- ", "", 1).lstrip().strip()
+        text_nodes = text_to_textnodes(stripped_item)
+        item_nodes: list[HTMLNode] = []
+        for node in text_nodes:
+            item_nodes.append(text_node_to_html_node(node))
+        list_items.append(ParentNode("li", children=item_nodes, props=None))
+    return ParentNode("ul", children=list_items, props=None)
+
 
-    blocks: list[str] = markdown_to_blocks(markdown)
-    child_nodes: list[HTMLNode] = []
-    for block in blocks:
-        if block.strip() == "":
-            continue
-        block_type: BlockType = block_to_block_type(block)
-        match block_type:
-            case BlockType.PARAGRAPH:
-                stripped_paragraph: str = re.sub(r"\s+", " ", block).strip()
-                text_nodes = text_to_textnodes(stripped_paragraph)
-                paragraph_nodes: list[HTMLNode] = []
-                for node in text_nodes:
-                    paragraph_nodes.append(text_node_to_html_node(node))
-                child_nodes.append(
-                    ParentNode("p", children=paragraph_nodes, props=None)
-                )
-            case BlockType.HEADING:
-                left_stripped_heading: str = block.lstrip()
-                heading_count: int = 0
-                for ch in left_stripped_heading:
-                    if ch == "#":
-                        heading_count += 1
-                    else:
-                        break
-                stripped_heading: str = left_stripped_heading[heading_count:].lstrip()
-                text_nodes = text_to_textnodes(stripped_heading)
-                heading_nodes: list[HTMLNode] = []
-                for node in text_nodes:
-                    leaf_heading = text_node_to_html_node(node)
-                    heading_nodes.append(leaf_heading)
-                child_nodes.append(
-                    ParentNode(f"h{heading_count}", children=heading_nodes, props=None)
-                )
-            case BlockType.CODE:
-                lines: list[str] = block.split("\n")
-                inner_lines: list[str] = [line.lstrip() for line in lines[1:-1]]
-                raw_code: str = "\n".join(inner_lines) + "\n"
-                child_nodes.append(
-                    ParentNode(
-                        "pre",
-                        children=[
-                            ParentNode(
-                                "code",
-                                children=[LeafNode(None, raw_code, None)],
-                                props=None,
-                            )
-                        ],
-                        props=None,
-                    )
-                )
-            case BlockType.QUOTE:
-                left_stripped_quote: str = block.lstrip()
-                # remove leading ">" and any whitespace after it
-                split_quote: list[str] = left_stripped_quote.split("\n")
-                clean_lines: list[str] = []
-                for line in split_quote:
-                    line = line.lstrip()
-                    if line.startswith(">"):
-                        line = line.replace("> ", "", 1)
-                    clean_lines.append(line)
-                joined_quote: str = " ".join(clean_lines).strip()
-                text_nodes = text_to_textnodes(joined_quote)
-                leaf_nodes: list[HTMLNode] = [
-                    text_node_to_html_node(node) for node in text_nodes
-                ]
-                child_nodes.append(
-                    ParentNode("blockquote", children=leaf_nodes, props=None)
-                )
-            case BlockType.UNORDERED_LIST:
-                split_list: list[str] = block.split("\n")
-                list_items: list[HTMLNode] = []
-                for item in split_list:
-                    stripped_item: str = item.replace("- ", "", 1).lstrip().strip()
-                    text_nodes = text_to_textnodes(stripped_item)
-                    item_nodes: list[HTMLNode] = []
-                    for node in text_nodes:
-                        item_nodes.append(text_node_to_html_node(node))
-                    list_items.append(ParentNode("li", children=item_nodes, props=None))
-                child_nodes.append(ParentNode("ul", children=list_items, props=None))
-            case BlockType.ORDERED_LIST:
-                split_list: list[str] = block.split("\n")
-                list_items: list[HTMLNode] = []
-                for item in split_list:
-                    stripped_item: str = item.split(". ", 1)[1]
-                    text_nodes = text_to_textnodes(stripped_item)
-                    item_nodes: list[HTMLNode] = []
-                    for node in text_nodes:
-                        item_nodes.append(text_node_to_html_node(node))
-                    list_items.append(ParentNode("li", children=item_nodes, props=None))
-                child_nodes.append(ParentNode("ol", children=list_items, props=None))
-    return ParentNode("div", children=child_nodes, props=None)
+@BLOCK_RENDERERS.register(BlockType.ORDERED_LIST)
+def _render_ordered_list(block: str) -> HTMLNode:
+    split_list: list[str] = block.split("\n")
+    list_items: list[HTMLNode] = []
+    for item in split_list:
+        stripped_item: str = item.split(". ", 1)[1]
+        text_nodes = text_to_textnodes(stripped_item)
+        item_nodes: list[HTMLNode] = []
+        for node in text_nodes:
+            item_nodes.append(text_node_to_html_node(node))
+        list_items.append(ParentNode("li", children=item_nodes, props=None))
+    return ParentNode("ol", children=list_items, props=None)
 
 
 def extract_title(markdown):
@@ -117,12 +276,13 @@ def extract_title(markdown):
     If no such line exists, raises a ValueError.
 
     Args:
-        markdown: Raw markdown text to extract the title from.
+        markdown: Raw markdown text to extract the title from, or an
+            iterable of lines.
 
     Returns:
         str | ValueError: The extracted title text, or ValueError if no title is found.
     """
-    lines = markdown.split("\n")
+    lines = iter_lines(markdown) if isinstance(markdown, str) else markdown
     for line in lines:
         if line.startswith("# "):
             return line[2:].strip()
@@ -0,0 +1,158 @@
+import re
+
+# whitespace around these tags never affects layout
+BLOCK_TAGS = {
+    "!doctype", "html", "head", "body", "title", "meta", "link", "script", "style",
+    "article", "section", "nav", "header", "footer", "main", "aside", "div", "p",
+    "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "blockquote", "pre",
+    "table", "thead", "tbody", "tfoot", "tr", "td", "th", "hr", "figure", "figcaption",
+}
+# content of these tags is passed through untouched
+RAW_TAGS = {"pre", "code", "textarea", "script", "style"}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+}
+
+# a "<" not followed by a tag name, "/" or "!" is plain text (e.g. "a < b")
+_TOKEN_RE = re.compile(
+    r"<!--.*?-->|<[A-Za-z/!][^>]*>|(?:[^<]+|<(?![A-Za-z/!]|\Z))+|<", re.DOTALL
+)
+_TAG_START_RE = re.compile(r"<(?:[A-Za-z/!]|\Z)")
+_TAG_RE = re.compile(r"<(/?)([^\s/>]+)(.*?)(/?)>\Z", re.DOTALL)
+_ATTRIBUTE_RE = re.compile(
+    r"""\s*([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?"""
+)
+_UNQUOTED_RE = re.compile(r"[^\s\"'=<>`]+\Z")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class HTMLMinifier:
+    """Minifies HTML as it is rendered, one chunk at a time.
+
+    Whitespace runs collapse to one space, and whitespace next to block-level
+    tags is dropped. Comments are removed, except conditional comments.
+    Attribute values lose their quotes where HTML allows it. Content inside
+    <pre>, <code>, <textarea>, <script> and <style> is left untouched.
+
+    Chunks may split the markup anywhere; a tag or trailing text cut off at
+    the end of a chunk is held back until the next one, so close() must be
+    called to flush it.
+
+    Attributes:
+        bytes_in (int): Characters fed in.
+        bytes_out (int): Characters returned.
+    """
+
+    def __init__(self) -> None:
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._pending = ""
+        self._raw: list[str] = []
+        self._block_before = True
+        self._space_before = False
+
+    @property
+    def saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def feed(self, chunk: str) -> str:
+        """Minify the next chunk; returns the output that is ready so far."""
+        self.bytes_in += len(chunk)
+        return self._run(self._pending + chunk, final=False)
+
+    def close(self) -> str:
+        """Flush whatever feed() held back."""
+        return self._run(self._pending, final=True)
+
+    def _run(self, html: str, final: bool) -> str:
+        self._pending = ""
+        out = []
+        tokens = _TOKEN_RE.findall(html)
+        for i, token in enumerate(tokens):
+            last = i == len(tokens) - 1
+            if _TAG_START_RE.match(token):
+                if not final and (token == "<" or (
+                        token.startswith("<!--") and not token.endswith("-->"))):
+                    # cut off mid-tag: wait for the rest
+                    self._pending = "".join(tokens[i:])
+                    break
+                out.append(self._tag(token))
+            elif self._raw:
+                out.append(token)
+                self._block_before = self._space_before = False
+            elif last and not final:
+                # the next tag decides whether trailing whitespace matters
+                self._pending = token
+            else:
+                next_tag = tokens[i + 1] if not last else None
+                out.append(self._text(token, next_tag))
+        result = "".join(out)
+        self.bytes_out += len(result)
+        return result
+
+    def _text(self, text: str, next_tag: str | None) -> str:
+        text = _SPACE_RE.sub(" ", text)
+        if self._block_before or self._space_before:
+            text = text.lstrip(" ")
+        if next_tag is None or _tag_name(next_tag) in BLOCK_TAGS:
+            text = text.rstrip(" ")
+        if text:
+            self._block_before = False
+            self._space_before = text.endswith(" ")
+        return text
+
+    def _tag(self, token: str) -> str:
+        if token.startswith("<!--"):
+            if token.startswith("<!--[if") or self._raw:
+                return token
+            return ""
+        match = _TAG_RE.match(token)
+        if match is None:
+            return token
+        closing, name, attributes, self_closing = match.groups()
+        lower = name.lower()
+        if self._raw:
+            if closing and lower == self._raw[-1]:
+                self._raw.pop()
+            elif not closing and lower in RAW_TAGS:
+                self._raw.append(lower)
+            else:
+                return token
+        elif lower in RAW_TAGS and not closing and not self_closing:
+            self._raw.append(lower)
+        self._block_before = lower in BLOCK_TAGS
+        # an inline tag may render content (e.g. an image), so a space after
+        # it is kept
+        self._space_before = False
+        if closing:
+            return f"</{name}>"
+        if lower.startswith("!"):
+            return token
+        parts = [f"<{name}"]
+        position = 0
+        for attribute in _ATTRIBUTE_RE.finditer(attributes):
+            if attribute.start() != position:
+                return token
+            position = attribute.end()
+            attr_name, double, single, bare = attribute.groups()
+            value = next((v for v in (double, single, bare) if v is not None), None)
+            if value is None:
+                parts.append(f" {attr_name}")
+            elif value and _UNQUOTED_RE.match(value):
+                parts.append(f" {attr_name}={value}")
+            elif '"' in value:
+                parts.append(f" {attr_name}='{value}'")
+            else:
+                parts.append(f' {attr_name}="{value}"')
+        if attributes[position:].strip():
+            return token
+        if self_closing and lower not in VOID_TAGS:
+            parts.append(" /")
+        parts.append(">")
+        return "".join(parts)
+
+
+def _tag_name(token: str) -> str:
+    match = _TAG_RE.match(token)
+    return match.group(2).lower() if match else ""
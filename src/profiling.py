@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from collections.abc import Iterator
+from htmlnode import HTMLNode
+
+
+class PageProfile:
+    """Per-page timings and sizes collected while generating one page.
+
+    Stages are timed back to back: mark(name) charges the time since the
+    previous mark to that stage. Every mark is also kept as a span on the
+    worker (process and thread) that ran it, for BuildProfiler.write_trace.
+
+    Attributes:
+        source (str): Markdown source path.
+        output (str): HTML output path.
+        stages (dict[str, float]): Wall time in seconds per stage.
+        bytes_in (int): Size of the markdown source.
+        bytes_out (int): Size of the generated HTML.
+        bytes_saved (int): Bytes minifying removed from the HTML.
+        nodes (int): Number of HTML nodes in the page tree.
+        block_hits (int): Blocks whose HTML came from the block memo.
+        block_misses (int): Blocks that had to be parsed and rendered.
+        spans (list[tuple[str, float, float]]): (stage, start, end) per mark,
+            in perf_counter seconds.
+        pid (int): Process the page was generated in.
+        tid (int): Thread (or async I/O slot) the page was generated on.
+    """
+
+    def __init__(self, source: str, output: str) -> None:
+        self.source = source
+        self.output = output
+        self.stages: dict[str, float] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.bytes_saved = 0
+        self.nodes = 0
+        self.block_hits = 0
+        self.block_misses = 0
+        self.spans: list[tuple[str, float, float]] = []
+        self.pid = os.getpid()
+        self.tid = threading.get_native_id()
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        """Charge the time since the previous mark to stage."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self.spans.append((stage, self._last, now))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "output": self.output,
+            "seconds": round(self.total, 6),
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_saved,
+            "nodes": self.nodes,
+            "block_hits": self.block_hits,
+            "block_misses": self.block_misses,
+        }
+
+
+class BuildProfiler:
+    """Collects build-level stage timings and the profiles of every page.
+
+    Attributes:
+        stages (dict[str, float]): Wall time in seconds per build stage.
+        spans (list[tuple[str, float, float]]): (stage, start, end) of every
+            stage entered, in perf_counter seconds.
+        pages (list[PageProfile]): Profiles of the pages generated.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+        self.spans: list[tuple[str, float, float]] = []
+        self.pages: list[PageProfile] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a build stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.stages[name] = self.stages.get(name, 0.0) + end - start
+            self.spans.append((name, start, end))
+
+    def add_pages(self, pages: list[PageProfile]) -> None:
+        self.pages.extend(pages)
+
+    def report(self) -> dict:
+        """Return the whole profile as a JSON-serializable dict."""
+        page_totals: dict[str, float] = {}
+        for page in self.pages:
+            for name, seconds in page.stages.items():
+                page_totals[name] = page_totals.get(name, 0.0) + seconds
+        return {
+            "seconds": round(time.perf_counter() - self._start, 6),
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "page_stages": {name: round(seconds, 6) for name, seconds in page_totals.items()},
+            "pages_generated": len(self.pages),
+            "bytes_in": sum(page.bytes_in for page in self.pages),
+            "bytes_out": sum(page.bytes_out for page in self.pages),
+            "bytes_saved": sum(page.bytes_saved for page in self.pages),
+            "nodes": sum(page.nodes for page in self.pages),
+            "block_hits": sum(page.block_hits for page in self.pages),
+            "block_misses": sum(page.block_misses for page in self.pages),
+            "pages": [page.to_dict() for page in self.slowest()],
+        }
+
+    def slowest(self, count: int | None = None) -> list[PageProfile]:
+        pages = sorted(self.pages, key=lambda page: page.total, reverse=True)
+        return pages if count is None else pages[:count]
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def trace_events(self) -> list[dict]:
+        """Return the build as Chrome trace events.
+
+        Build stages are complete ("X") events on a "build" track of this
+        process. Every page gets an event spanning its stages, with one
+        event per stage nested inside it, on the track of the process and
+        thread that generated it, so worker pools show up lane by lane.
+        Timestamps are microseconds since the profiler was created.
+        perf_counter is a system-wide monotonic clock on the supported
+        platforms, so spans from worker processes line up with the rest.
+        """
+        pid = os.getpid()
+
+        def complete(name, category, start, end, event_pid, tid, args=None):
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self._start) * 1e6, 3),
+                "dur": round((end - start) * 1e6, 3),
+                "pid": event_pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            return event
+
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+             "args": {"name": "ssgen build"}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": 0,
+             "args": {"name": "build"}},
+        ]
+        workers = {page.pid for page in self.pages} - {pid}
+        for worker in sorted(workers):
+            events.append({"name": "process_name", "ph": "M", "pid": worker, "tid": 0,
+                           "args": {"name": f"worker {worker}"}})
+        for name, start, end in self.spans:
+            events.append(complete(name, "build", start, end, pid, 0))
+        for page in self.pages:
+            if not page.spans:
+                continue
+            events.append(complete(
+                page.source, "page", page.spans[0][1], page.spans[-1][2], page.pid,
+                page.tid, {"output": page.output, "bytes_in": page.bytes_in,
+                           "bytes_out": page.bytes_out},
+            ))
+            for name, start, end in page.spans:
+                events.append(complete(name, "page", start, end, page.pid, page.tid))
+        return events
+
+    def write_trace(self, path: str) -> None:
+        """Write trace_events() as a JSON file for chrome://tracing or Perfetto."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+
+    def print_slowest(self, count: int) -> None:
+        pages = self.slowest(count)
+        if not pages:
+            return
+        print(f"Slowest {len(pages)} page(s):")
+        for page in pages:
+            stages = ", ".join(
+                f"{name} {seconds * 1000:.1f} ms" for name, seconds in page.stages.items()
+            )
+            print(f"  {page.total * 1000:8.1f} ms  {page.source} ({stages})")
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every call is a no-op."""
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        yield
+
+    def add_pages(self, pages: list[PageProfile]) -> None:
+        pass
+
+
+def count_nodes(node: HTMLNode) -> int:
+    """Return the number of nodes in the tree rooted at node."""
+    count = 1
+    stack = list(node.children or [])
+    while stack:
+        child = stack.pop()
+        count += 1
+        if child.children:
+            stack.extend(child.children)
+    return count
@@ -0,0 +1,60 @@
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class RendererRegistry:
+    """Maps node types to the callables that render them.
+
+    Dispatch is a single dictionary lookup, however many types are
+    registered. The built-in block and inline renderers are entries like
+    any other, so a renderer can be replaced or a new type added without
+    touching the code that dispatches.
+
+    Attributes:
+        kind (str): What the keys are, used in error messages.
+        renderers (dict[Hashable, Callable]): Renderer for each node type.
+    """
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+        self.renderers: dict[Hashable, Callable[..., Any]] = {}
+
+    def register(self, node_type: Hashable,
+                 renderer: Callable[..., Any] | None = None) -> Callable[..., Any]:
+        """Set the renderer for node_type, replacing any earlier one.
+
+        Works as a decorator when renderer is omitted:
+
+            @BLOCK_RENDERERS.register(BlockType.PARAGRAPH)
+            def render_paragraph(block): ...
+
+        Args:
+            node_type: The type to render, e.g. a BlockType.
+            renderer: Callable producing the HTML node.
+
+        Returns:
+            Callable: The renderer, or the decorator.
+        """
+        if renderer is None:
+            return lambda renderer: self.register(node_type, renderer)
+        self.renderers[node_type] = renderer
+        return renderer
+
+    def unregister(self, node_type: Hashable) -> None:
+        """Remove the renderer for node_type, if there is one."""
+        self.renderers.pop(node_type, None)
+
+    def render(self, node_type: Hashable, *args: Any) -> Any:
+        """Call the renderer registered for node_type with args.
+
+        Raises:
+            ValueError: If no renderer is registered for node_type.
+        """
+        try:
+            renderer = self.renderers[node_type]
+        except KeyError:
+            raise ValueError(f"invalid {self.kind}: {node_type}") from None
+        return renderer(*args)
+
+    def __contains__(self, node_type: Hashable) -> bool:
+        return node_type in self.renderers
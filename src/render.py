@@ -0,0 +1,223 @@
+import io
+import mmap
+import os
+from cache import ParseCache
+from fingerprint import AssetManifest
+from files import atomic_open
+from images import IMAGE_SIZES
+from markdownhtml import BLOCK_MEMO, extract_title, iter_block_html
+from minify import HTMLMinifier
+from profiling import PageProfile
+from templates import Template, load_template, rewrite_basepath
+from utils import extract_markdown_images
+
+# sources at least this large are memory-mapped and rendered block by block
+LARGE_SOURCE_BYTES = 16 * 1024 * 1024
+
+
+def generate_page(
+    from_path: str,
+    template_path: str,
+    dest_path: str,
+    basepath: str,
+    profile: PageProfile | None = None,
+    cache: ParseCache | None = None,
+    minify: bool = False,
+    assets: AssetManifest | None = None,
+) -> None:
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    if not os.path.exists(from_path):
+        raise FileNotFoundError(f"from_path {from_path} does not exist")
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"template_path {template_path} does not exist")
+    template = load_template(template_path)
+    minifier = HTMLMinifier() if minify else None
+    if os.path.getsize(from_path) >= LARGE_SOURCE_BYTES:
+        _generate_large_page(
+            from_path, template, dest_path, basepath, profile, minifier, assets
+        )
+        _report_minified(dest_path, minifier, profile)
+        return
+    with open(from_path, "r") as from_file:
+        content = from_file.read()
+    if profile:
+        profile.bytes_in = len(content.encode())
+        profile.mark("read")
+    page_title = extract_title(content)
+    fragments = render_article(content, profile, cache)
+    if profile:
+        profile.mark("parse")
+    dirname = os.path.dirname(dest_path)
+    if dirname:
+        # pages rendered in parallel may share the directory
+        os.makedirs(dirname, exist_ok=True)
+    values = _page_values(page_title, fragments, basepath, assets)
+    if profile:
+        # render into memory so rendering and writing can be timed apart
+        buffer = io.StringIO()
+        template.render(buffer, values, basepath, minifier, assets)
+        final_html = buffer.getvalue()
+        profile.bytes_out = len(final_html.encode())
+        profile.mark("render")
+        with atomic_open(dest_path) as dest_file:
+            dest_file.write(final_html)
+        profile.mark("write")
+    else:
+        with atomic_open(dest_path) as dest_file:
+            template.render(dest_file, values, basepath, minifier, assets)
+    _report_minified(dest_path, minifier, profile)
+
+
+def _report_minified(
+    dest_path: str, minifier: HTMLMinifier | None, profile: PageProfile | None
+) -> None:
+    if minifier is None:
+        return
+    if profile:
+        profile.bytes_saved = minifier.saved
+    print(f"Minified {dest_path}: saved {minifier.saved} of {minifier.bytes_in} bytes")
+
+
+def render_page(
+    content: str,
+    template_path: str,
+    basepath: str,
+    cache: ParseCache | None = None,
+    minify: bool = False,
+    assets: AssetManifest | None = None,
+) -> tuple[str, int]:
+    """Render a markdown source into a complete HTML page.
+
+    This is the pure part of generate_page, without any file I/O, so callers
+    can schedule reads and writes themselves.
+
+    Args:
+        content: Markdown source text.
+        template_path: HTML template to render into.
+        basepath: URL prefix the site is served under.
+        cache: Parse cache (optional).
+        minify: Minify the page while rendering it.
+        assets: Fingerprinted asset names to point URLs at (optional).
+
+    Returns:
+        tuple[str, int]: The page's HTML and the bytes minifying saved.
+    """
+    template = load_template(template_path)
+    fragments = render_article(content, None, cache)
+    minifier = HTMLMinifier() if minify else None
+    html = template.render_to_string(
+        _page_values(extract_title(content), fragments, basepath, assets),
+        basepath,
+        minifier,
+        assets,
+    )
+    return html, minifier.saved if minifier else 0
+
+
+def render_article(
+    content: str, profile: PageProfile | None, cache: ParseCache | None
+) -> list[str]:
+    """Render a page's markdown to its article HTML, as a list of fragments."""
+    cache_key = cache.key(content, _image_key(content)) if cache else None
+    body = cache.get(cache_key) if cache else None
+    if body is not None:
+        return [body]
+    # render block by block through the memo, so blocks unchanged since
+    # an earlier render (or shared with another page) are reused
+    memo_hits, memo_misses = BLOCK_MEMO.hits, BLOCK_MEMO.misses
+    fragments = ["<div>"]
+    nodes = 1
+    for fragment, fragment_nodes in iter_block_html(content):
+        fragments.append(fragment)
+        nodes += fragment_nodes
+    fragments.append("</div>")
+    if profile:
+        profile.nodes = nodes
+        profile.block_hits = BLOCK_MEMO.hits - memo_hits
+        profile.block_misses = BLOCK_MEMO.misses - memo_misses
+    if cache:
+        cache.put(cache_key, "".join(fragments))
+    return fragments
+
+
+def _image_key(content: str) -> str:
+    # embedded images render with their dimensions, so a resized image must
+    # not be served the HTML cached for the old size
+    return ";".join(
+        f"{url}={IMAGE_SIZES.size(url)}" for _, url in extract_markdown_images(content)
+    )
+
+
+def _page_values(
+    page_title: str | None,
+    fragments: list[str],
+    basepath: str,
+    assets: AssetManifest | None = None,
+) -> dict:
+    # the article's own root-relative links still need the basepath; attributes
+    # are emitted whole, so rewriting fragment by fragment is safe
+    def article_chunks():
+        for fragment in fragments:
+            yield rewrite_basepath(fragment, basepath, assets)
+
+    return {"Title": page_title if page_title else "", "Content": article_chunks}
+
+
+def _generate_large_page(
+    from_path: str,
+    template: Template,
+    dest_path: str,
+    basepath: str,
+    profile: PageProfile | None = None,
+    minifier: HTMLMinifier | None = None,
+    assets: AssetManifest | None = None,
+) -> None:
+    # memory-map the source and parse, render and write one block at a time,
+    # so peak memory follows the largest block rather than the whole file
+    with open(from_path, "rb") as from_file, mmap.mmap(
+        from_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        page_title = extract_title(iter_mapped_lines(mapped))
+        if profile:
+            profile.bytes_in = mapped.size()
+            profile.mark("read")
+
+        def article_chunks():
+            yield "<div>"
+            for fragment, nodes in iter_block_html(iter_mapped_lines(mapped)):
+                if profile:
+                    profile.nodes += nodes
+                yield rewrite_basepath(fragment, basepath, assets)
+            yield "</div>"
+
+        dirname = os.path.dirname(dest_path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with atomic_open(dest_path) as dest_file:
+            template.render(
+                dest_file,
+                {"Title": page_title if page_title else "", "Content": article_chunks},
+                basepath,
+                minifier,
+                assets,
+            )
+        if profile:
+            profile.nodes += 1
+            profile.bytes_out = os.path.getsize(dest_path)
+            profile.mark("render")
+
+
+def iter_mapped_lines(mapped: mmap.mmap):
+    """Yield the lines of a memory-mapped source without their line endings."""
+    # decode one line at a time, translating \r\n like text-mode reads do
+    start = 0
+    while True:
+        end = mapped.find(b"\n", start)
+        if end == -1:
+            yield mapped[start:].decode()
+            return
+        line = mapped[start:end]
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        yield line.decode()
+        start = end + 1
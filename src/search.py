@@ -0,0 +1,303 @@
+import hashlib
+import heapq
+import html
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator
+from cache import CACHE_DIR
+from files import COMPRESSED_SUFFIX, atomic_open
+
+SEARCH_DIR = "search"
+# index format version, read by the client before it fetches shards
+SEARCH_FORMAT = 2
+# terms are sharded by their first characters; the client derives the shard
+# to fetch from the query the same way
+SHARD_PREFIX_LENGTH = 2
+# postings (term occurrences) buffered in memory before a sorted run is
+# spilled to disk
+DEFAULT_MAX_POSTINGS = 1_000_000
+
+_TAG_RE = re.compile(r"<[^>]*>")
+_TERM_RE = re.compile(r"\w+")
+_ASCII_SHARD_RE = re.compile(r"[a-z0-9]+\Z")
+
+
+def iter_terms(fragments: Iterable[str]) -> Iterator[str]:
+    """Yield the lowercased words of rendered HTML, in document order."""
+    for fragment in fragments:
+        text = html.unescape(_TAG_RE.sub(" ", fragment))
+        for match in _TERM_RE.finditer(text.lower()):
+            yield match.group()
+
+
+def term_positions(fragments: Iterable[str]) -> dict[str, list[int]]:
+    """Map each term of rendered HTML to the positions it occurs at."""
+    positions: dict[str, list[int]] = {}
+    for position, term in enumerate(iter_terms(fragments)):
+        positions.setdefault(term, []).append(position)
+    return positions
+
+
+def shard_name(term: str) -> str:
+    """Return the shard a term is stored in.
+
+    ASCII prefixes are used as they are; any other prefix is hex-encoded
+    UTF-8 behind a "_", so shard names are always safe file names and an
+    encoded prefix never collides with a literal one ("_" is "_5f", not
+    the "5f" of "5ft").
+    """
+    prefix = term[:SHARD_PREFIX_LENGTH]
+    if _ASCII_SHARD_RE.match(prefix):
+        return prefix
+    return "_" + prefix.encode().hex()
+
+
+class SearchIndexWriter:
+    """Builds a prefix-sharded inverted index of the site's pages.
+
+    Each page's terms are buffered as postings (term, page, positions).
+    When more than max_postings are buffered, they are sorted and spilled to
+    a run file, so memory stays bounded however many pages the site has.
+    finish() merges the runs, routes the postings to a spool file per shard
+    and streams out one JSON file per shard. Each
+    shard maps a term to [page, [positions]] pairs in page order. pages.json
+    lists [url, title] per page id, and meta.json lists the shards.
+
+    Attributes:
+        dest_dir (str): Directory the index is written into.
+        max_postings (int): Postings buffered before spilling a run.
+        pages (int): Pages added so far.
+        runs (int): Runs spilled to disk so far.
+    """
+
+    def __init__(self, dest_dir: str, max_postings: int = DEFAULT_MAX_POSTINGS) -> None:
+        self.dest_dir = dest_dir
+        self.max_postings = max_postings
+        self.pages = 0
+        self.runs = 0
+        self._postings: dict[str, list[tuple[int, list[int]]]] = {}
+        self._buffered = 0
+        self._spill_dir = tempfile.mkdtemp(prefix="ssgen-search-")
+        self._run_paths: list[str] = []
+        self._pages_file = open(os.path.join(self._spill_dir, "pages.jsonl"), "w")
+
+    def add_page(self, url: str, title: str, fragments: Iterable[str]) -> int:
+        """Index one page.
+
+        Args:
+            url: The page's URL.
+            title: The page's title.
+            fragments: The page's rendered article HTML, in pieces.
+
+        Returns:
+            int: The page's id in the index.
+        """
+        return self.add_positions(url, title, term_positions(fragments))
+
+    def add_positions(self, url: str, title: str, positions: dict[str, list[int]]) -> int:
+        """Index one page from its terms' positions (see term_positions).
+
+        Returns:
+            int: The page's id in the index.
+        """
+        page = self.pages
+        self.pages += 1
+        self._pages_file.write(json.dumps([url, title], separators=(",", ":")) + "\n")
+        for term, positions_of_term in positions.items():
+            self._postings.setdefault(term, []).append((page, positions_of_term))
+            self._buffered += len(positions_of_term)
+        if self._buffered >= self.max_postings:
+            self._spill()
+        return page
+
+    def _spill(self) -> None:
+        path = os.path.join(self._spill_dir, f"run-{len(self._run_paths)}.jsonl")
+        with open(path, "w") as f:
+            for term in sorted(self._postings):
+                for page, positions in self._postings[term]:
+                    f.write(json.dumps([term, page, positions], separators=(",", ":")))
+                    f.write("\n")
+        self._run_paths.append(path)
+        self.runs += 1
+        self._postings = {}
+        self._buffered = 0
+
+    def _merged(self) -> Iterator[tuple[str, int, list[int]]]:
+        # a page is added whole, so its postings are never split across runs
+        # and (term, page) orders the merge completely
+        if self._postings:
+            self._spill()
+        files = [open(path, "r") for path in self._run_paths]
+        try:
+            yield from heapq.merge(*(map(json.loads, f) for f in files))
+        finally:
+            for f in files:
+                f.close()
+
+    def _sharded(self) -> Iterator[tuple[str, Iterator[tuple[str, int, list[int]]]]]:
+        # yields each shard once, in name order, with its postings in
+        # (term, page) order; shard order is not term order ("_c3a9" holds
+        # "é..." terms), so postings are grouped by name, not by position
+        if not self._run_paths:
+            by_shard: dict[str, list[str]] = {}
+            for term in self._postings:
+                by_shard.setdefault(shard_name(term), []).append(term)
+            for shard in sorted(by_shard):
+                yield shard, ((term, page, positions)
+                              for term in sorted(by_shard[shard])
+                              for page, positions in self._postings[term])
+            return
+        # spooled rather than held: a merged index can be far larger than
+        # the max_postings buffered at a time
+        spooled: dict[str, list[str]] = {}
+        buffered = 0
+        paths: dict[str, str] = {}
+        for term, page, positions in self._merged():
+            spooled.setdefault(shard_name(term), []).append(
+                json.dumps([term, page, positions], separators=(",", ":")) + "\n"
+            )
+            buffered += 1
+            if buffered >= self.max_postings:
+                self._spool(spooled, paths)
+                spooled = {}
+                buffered = 0
+        self._spool(spooled, paths)
+        for shard in sorted(paths):
+            with open(paths[shard], "r") as f:
+                yield shard, map(json.loads, f)
+
+    def _spool(self, spooled: dict[str, list[str]], paths: dict[str, str]) -> None:
+        for shard, lines in spooled.items():
+            path = paths.setdefault(
+                shard, os.path.join(self._spill_dir, f"shard-{shard}.jsonl")
+            )
+            with open(path, "a") as f:
+                f.writelines(lines)
+
+    def finish(self) -> dict[str, int]:
+        """Write the index, replacing any earlier one, and clean up.
+
+        Returns:
+            dict[str, int]: Number of pages, terms, shards and spilled runs.
+        """
+        index_dir = os.path.join(self.dest_dir, SEARCH_DIR)
+        os.makedirs(index_dir, exist_ok=True)
+        self._pages_file.close()
+        try:
+            with open(self._pages_file.name, "r") as pages_in, \
+                    atomic_open(os.path.join(index_dir, "pages.json")) as pages_out:
+                pages_out.write("[")
+                for i, line in enumerate(pages_in):
+                    pages_out.write(("," if i else "") + line.rstrip("\n"))
+                pages_out.write("]")
+            shards = []
+            terms = 0
+            for shard, postings in self._sharded():
+                terms += self._write_shard(os.path.join(index_dir, f"{shard}.json"), postings)
+                shards.append(shard)
+            meta = {
+                "format": SEARCH_FORMAT,
+                "prefix_length": SHARD_PREFIX_LENGTH,
+                "pages": self.pages,
+                "shards": shards,
+            }
+            with atomic_open(os.path.join(index_dir, "meta.json")) as f:
+                json.dump(meta, f, separators=(",", ":"))
+        finally:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+        live = {"pages.json", "meta.json"} | {f"{shard}.json" for shard in shards}
+        for name in os.listdir(index_dir):
+            base = name.removesuffix(COMPRESSED_SUFFIX)
+            if base not in live and not name.startswith("."):
+                os.remove(os.path.join(index_dir, name))
+        return {"pages": self.pages, "terms": terms, "shards": len(shards), "runs": self.runs}
+
+    @staticmethod
+    def _write_shard(path: str, postings: Iterator[tuple[str, int, list[int]]]) -> int:
+        # streamed term by term: a shard is never held in memory whole
+        terms = 0
+        with atomic_open(path) as f:
+            f.write("{")
+            for term, term_postings in itertools.groupby(postings, key=lambda p: p[0]):
+                f.write(("," if terms else "") + json.dumps(term) + ":[")
+                for i, (_, page, positions) in enumerate(term_postings):
+                    f.write(("," if i else "") + json.dumps([page, positions],
+                                                            separators=(",", ":")))
+                f.write("]")
+                terms += 1
+            f.write("}")
+        return terms
+
+    def discard(self) -> None:
+        """Drop the spilled runs without writing an index."""
+        self._pages_file.close()
+        shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+
+class PostingsCache:
+    """On-disk cache of each page's title and term positions.
+
+    Entries are keyed by the page source's hash (the one the build manifest
+    records) and the parser version, so a page the build skipped is indexed
+    again without being read or rendered. Entries no page used in a build
+    are dropped by prune(), so the cache holds one site's worth at most.
+
+    Attributes:
+        cache_dir (str): Directory holding the entries.
+        version (str): Parser version mixed into every key.
+        hits (int): Lookups served from the cache.
+        misses (int): Lookups that found nothing.
+    """
+
+    def __init__(self, version: str,
+                 cache_dir: str = os.path.join(CACHE_DIR, SEARCH_DIR)) -> None:
+        self.version = version
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._used: set[str] = set()
+
+    def _path(self, source_hash: str) -> str:
+        digest = hashlib.sha256(
+            f"{self.version}\0{SEARCH_FORMAT}\0{source_hash}".encode()
+        ).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest[2:] + ".json")
+
+    def get(self, source_hash: str) -> tuple[str, dict[str, list[int]]] | None:
+        """Return the (title, term positions) cached for a source, or None."""
+        path = self._path(source_hash)
+        self._used.add(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                title, positions = json.load(f)
+        except (OSError, ValueError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return title, positions
+
+    def put(self, source_hash: str, title: str, positions: dict[str, list[int]]) -> None:
+        """Store a source's title and term positions."""
+        path = self._path(source_hash)
+        self._used.add(path)
+        with atomic_open(path, encoding="utf-8") as f:
+            json.dump([title, positions], f, separators=(",", ":"))
+
+    def prune(self) -> int:
+        """Remove the entries not looked up or stored since this cache was made.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        removed = 0
+        for dirpath, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                if path not in self._used:
+                    os.remove(path)
+                    removed += 1
+        return removed
@@ -0,0 +1,212 @@
+import ctypes
+import ctypes.util
+import errno
+import filecmp
+import os
+import re
+import shutil
+
+GENERATIONS_DIR = ".ssgen-generations"
+DEFAULT_KEEP_GENERATIONS = 3
+
+# renameat2(2) swaps two paths in one step with this flag (Linux 3.15+)
+_RENAME_EXCHANGE = 2
+_AT_FDCWD = -100
+_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP}
+
+
+def link_tree(src_dir: str, dest_dir: str) -> None:
+    """Recreate src_dir at dest_dir with every file hard-linked, not copied.
+
+    Files that cannot be linked (e.g. the filesystem has no hard links) are
+    copied instead.
+    """
+    for root, dirs, files in os.walk(src_dir):
+        dest_root = os.path.join(dest_dir, os.path.relpath(root, src_dir))
+        os.makedirs(dest_root, exist_ok=True)
+        for name in files:
+            src_path = os.path.join(root, name)
+            dest_path = os.path.join(dest_root, name)
+            try:
+                os.link(src_path, dest_path)
+            except OSError:
+                shutil.copy2(src_path, dest_path)
+
+
+def same_tree(a: str, b: str) -> bool:
+    """Return whether two directory trees hold the same files and contents.
+
+    Files that are hard links to each other, as prepare() leaves every file
+    a build did not touch, are not read. A file that was rewritten is
+    compared byte for byte, so rewriting it with the same contents (as
+    every build does to its manifest) is not a change.
+    """
+    a_entries = _tree_entries(a)
+    if a_entries != _tree_entries(b):
+        return False
+    for rel_path, is_dir in a_entries:
+        if is_dir:
+            continue
+        a_path = os.path.join(a, rel_path)
+        b_path = os.path.join(b, rel_path)
+        if not os.path.samefile(a_path, b_path) and not filecmp.cmp(
+                a_path, b_path, shallow=False):
+            return False
+    return True
+
+
+def _tree_entries(root: str) -> set[tuple[str, bool]]:
+    entries = set()
+    for dirpath, dirs, files in os.walk(root):
+        rel_root = os.path.relpath(dirpath, root)
+        entries.update((os.path.join(rel_root, name), True) for name in dirs)
+        entries.update((os.path.join(rel_root, name), False) for name in files)
+    return entries
+
+
+def exchange_paths(a: str, b: str) -> bool:
+    """Atomically swap two existing paths where the platform supports it.
+
+    Returns:
+        bool: True if swapped, False if atomic exchange is unavailable.
+
+    Raises:
+        OSError: If the exchange is supported but fails.
+    """
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return False
+    renameat2 = getattr(ctypes.CDLL(libc_name, use_errno=True), "renameat2", None)
+    if renameat2 is None:
+        return False
+    if renameat2(_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in _UNSUPPORTED:
+        return False
+    raise OSError(error, os.strerror(error), a, None, b)
+
+
+class StagedOutput:
+    """Builds an output directory off to the side and swaps it in whole.
+
+    The staging directory and the kept generations live in GENERATIONS_DIR
+    next to the output directory, on the same filesystem so that renames
+    work. prepare() fills staging with hard links to the current output, so
+    an incremental build only writes what changed; every writer replaces
+    files rather than rewriting them, which leaves the linked copies in
+    older generations intact. commit() swaps staging into place and keeps
+    the previous output as a numbered generation that rollback() can
+    restore; a build that changed nothing is dropped instead, so no-op
+    rebuilds do not push real rollback targets out of the kept generations.
+
+    Attributes:
+        dest_dir (str): The live output directory.
+        keep (int): Number of previous generations to keep.
+        root (str): Directory holding staging and the generations.
+        staging (str): Directory the next build is written into.
+    """
+
+    def __init__(self, dest_dir: str, keep: int = DEFAULT_KEEP_GENERATIONS) -> None:
+        self.dest_dir = os.path.normpath(dest_dir)
+        self.keep = keep
+        self.root = os.path.join(os.path.dirname(self.dest_dir), GENERATIONS_DIR)
+        self.name = os.path.basename(self.dest_dir)
+        self.staging = os.path.join(self.root, f"{self.name}.staging")
+
+    def prepare(self, clean: bool = False) -> str:
+        """Create a fresh staging directory seeded from the live output.
+
+        Args:
+            clean: Start from an empty directory instead.
+
+        Returns:
+            str: The staging directory to build into.
+        """
+        self.discard()
+        os.makedirs(self.root, exist_ok=True)
+        if clean or not os.path.isdir(self.dest_dir):
+            os.makedirs(self.staging)
+        else:
+            link_tree(self.dest_dir, self.staging)
+        return self.staging
+
+    def discard(self) -> None:
+        """Delete the staging directory, e.g. after a failed build."""
+        if os.path.exists(self.staging):
+            shutil.rmtree(self.staging)
+
+    def generations(self) -> list[str]:
+        """Return the kept generations, oldest first."""
+        pattern = re.compile(re.escape(self.name) + r"\.(\d+)$")
+        found = []
+        if os.path.isdir(self.root):
+            for entry in os.listdir(self.root):
+                match = pattern.match(entry)
+                if match:
+                    found.append((int(match.group(1)), os.path.join(self.root, entry)))
+        return [path for _, path in sorted(found)]
+
+    def _next_generation(self) -> str:
+        generations = self.generations()
+        number = int(generations[-1].rsplit(".", 1)[1]) + 1 if generations else 1
+        return os.path.join(self.root, f"{self.name}.{number}")
+
+    def commit(self) -> str | None:
+        """Swap the staged build into place.
+
+        Returns:
+            str | None: Where the previous output was kept, if there was one
+                and the staged build differs from it.
+        """
+        if not os.path.isdir(self.dest_dir):
+            os.rename(self.staging, self.dest_dir)
+            return None
+        if same_tree(self.staging, self.dest_dir):
+            self.discard()
+            return None
+        generation = self._next_generation()
+        if exchange_paths(self.staging, self.dest_dir):
+            os.rename(self.staging, generation)
+        else:
+            # no atomic exchange here: two renames leave dest_dir missing for
+            # an instant, but never partially written
+            os.rename(self.dest_dir, generation)
+            os.rename(self.staging, self.dest_dir)
+        self.prune()
+        return generation
+
+    def rollback(self) -> str:
+        """Swap the newest kept generation back into place.
+
+        The output being replaced takes that generation's place, so a second
+        rollback undoes the first.
+
+        Returns:
+            str: The generation that was restored.
+
+        Raises:
+            FileNotFoundError: If no generation is kept.
+        """
+        generations = self.generations()
+        if not generations:
+            raise FileNotFoundError(f"no earlier generation of {self.dest_dir} to roll back to")
+        generation = generations[-1]
+        if not exchange_paths(generation, self.dest_dir):
+            swap = generation + ".swap"
+            os.rename(self.dest_dir, swap)
+            os.rename(generation, self.dest_dir)
+            os.rename(swap, generation)
+        return generation
+
+    def prune(self) -> list[str]:
+        """Delete all but the newest keep generations.
+
+        Returns:
+            list[str]: Generations removed.
+        """
+        generations = self.generations()
+        stale = generations[:max(len(generations) - self.keep, 0)]
+        for path in stale:
+            shutil.rmtree(path)
+        return stale
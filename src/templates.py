@@ -0,0 +1,146 @@
+import os
+import re
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import TextIO
+from fingerprint import AssetManifest
+from minify import HTMLMinifier
+
+SLOT_RE = re.compile(r"\{\{ (\w+) \}\}")
+
+
+class Template:
+    """An HTML page template parsed once into static segments and slots.
+
+    A template such as ``<title>{{ Title }}</title>`` is split into the static
+    segments around each ``{{ Name }}`` placeholder, so rendering a page is a
+    single pass that writes segments and slot values in order.
+
+    Attributes:
+        segments (list[str]): Static text; one more entry than slots.
+        slots (list[str]): Placeholder names in document order.
+    """
+
+    def __init__(self, source: str) -> None:
+        """Parse template source text.
+
+        Args:
+            source: Raw template text containing {{ Name }} placeholders.
+        """
+        parts = SLOT_RE.split(source)
+        self.segments = parts[0::2]
+        self.slots = parts[1::2]
+        self._bound: dict[tuple[str, str | None], list[str]] = {}
+
+    def bind(self, basepath: str, assets: AssetManifest | None = None) -> list[str]:
+        """Return the static segments with root-relative URLs under basepath.
+
+        Only the template's own markup is rewritten; the result is cached per
+        basepath and asset fingerprints, so each build pays for the rewrite
+        once.
+
+        Args:
+            basepath: URL prefix the site is served under.
+            assets: Fingerprinted asset names to point URLs at (optional).
+
+        Returns:
+            list[str]: Rewritten static segments.
+        """
+        key = (basepath, assets.digest if assets else None)
+        segments = self._bound.get(key)
+        if segments is None:
+            segments = [
+                rewrite_basepath(segment, basepath, assets) for segment in self.segments
+            ]
+            self._bound[key] = segments
+        return segments
+
+    def iter_render(self, values: dict[str, str | Callable[[], Iterable[str]]],
+                    basepath: str = "/",
+                    minifier: HTMLMinifier | None = None,
+                    assets: AssetManifest | None = None) -> Iterable[str]:
+        """Yield the rendered page as a sequence of chunks.
+
+        Args:
+            values: Slot values, either strings or callables returning chunks
+                (called once per occurrence of the slot). Slots without a
+                value are left as written.
+            basepath: URL prefix the site is served under.
+            minifier: Minify the page as it streams through (optional);
+                the minifier's counters then tell how many bytes were saved.
+            assets: Fingerprinted asset names the template's own URLs are
+                pointed at (optional). Slot values are not rewritten.
+
+        Yields:
+            str: Consecutive pieces of the page.
+        """
+        if minifier is None:
+            yield from self._iter_chunks(values, basepath, assets)
+            return
+        for chunk in self._iter_chunks(values, basepath, assets):
+            chunk = minifier.feed(chunk)
+            if chunk:
+                yield chunk
+        yield minifier.close()
+
+    def _iter_chunks(self, values: dict[str, str | Callable[[], Iterable[str]]],
+                     basepath: str, assets: AssetManifest | None) -> Iterable[str]:
+        segments = self.bind(basepath, assets)
+        yield segments[0]
+        for slot, segment in zip(self.slots, segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                yield f"{{{{ {slot} }}}}"
+            elif isinstance(value, str):
+                yield value
+            else:
+                yield from value()
+            yield segment
+
+    def render(self, fp: TextIO, values: dict[str, str | Callable[[], Iterable[str]]],
+               basepath: str = "/", minifier: HTMLMinifier | None = None,
+               assets: AssetManifest | None = None) -> None:
+        """Stream the rendered page into a text file or buffer."""
+        write = fp.write
+        for chunk in self.iter_render(values, basepath, minifier, assets):
+            write(chunk)
+
+    def render_to_string(self, values: dict[str, str | Callable[[], Iterable[str]]],
+                         basepath: str = "/", minifier: HTMLMinifier | None = None,
+                         assets: AssetManifest | None = None) -> str:
+        """Return the rendered page as one string."""
+        return "".join(self.iter_render(values, basepath, minifier, assets))
+
+
+def rewrite_basepath(html: str, basepath: str, assets: AssetManifest | None = None) -> str:
+    """Prefix root-relative href and src attribute values with basepath.
+
+    With assets, URLs of fingerprinted static files are first pointed at
+    their fingerprinted names.
+    """
+    if assets:
+        html = assets.rewrite(html)
+    html = html.replace('href="/', f'href="{basepath}')
+    return html.replace('src="/', f'src="{basepath}')
+
+
+def load_template(path: str) -> Template:
+    """Load and parse a template, reusing the parsed copy while it is unchanged.
+
+    Args:
+        path: Path to the template file.
+
+    Returns:
+        Template: The parsed template.
+
+    Raises:
+        FileNotFoundError: If the template does not exist.
+    """
+    stat = os.stat(path)
+    return _load_template(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_template(path: str, mtime_ns: int, size: int) -> Template:
+    with open(path, "r") as template_file:
+        return Template(template_file.read())
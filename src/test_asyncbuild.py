@@ -0,0 +1,77 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from asyncbuild import generate_pages_async, sync_directory_async
+from main import discover_pages, generate_pages
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css" /><article>{{ Content }}</article>'
+
+
+class TestGeneratePagesAsync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+        for i in range(6):
+            with open(os.path.join(self.content, "blog", f"{i}.md"), "w") as f:
+                f.write(f"# Post {i}\n\nSome **text** with a [link](/blog/{i}).\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_outputs(self, pages):
+        outputs = []
+        for _, dest_path in pages:
+            with open(dest_path) as f:
+                outputs.append(f.read())
+        return outputs
+
+    def test_output_matches_serial(self):
+        serial = discover_pages(self.content, os.path.join(self.tmp.name, "serial"))
+        generate_pages(serial, self.template, "/ssgen/")
+        for jobs in (1, 2):
+            pages = discover_pages(self.content, os.path.join(self.tmp.name, f"async{jobs}"))
+            asyncio.run(generate_pages_async(pages, self.template, "/ssgen/", jobs, io_limit=2))
+            self.assertEqual(self.read_outputs(serial), self.read_outputs(pages))
+
+    def test_profiles_every_page(self):
+        pages = discover_pages(self.content, os.path.join(self.tmp.name, "out"))
+        profiles = generate_pages(pages, self.template, "/", profile=True, io_limit=4)
+        self.assertEqual([profile.source for profile in profiles], [p for p, _ in pages])
+        self.assertEqual(set(profiles[0].stages), {"read", "render", "write"})
+
+    def test_error_names_failing_source(self):
+        bad = os.path.join(self.content, "bad.md")
+        with open(bad, "w") as f:
+            f.write("no title here\n")
+        pages = discover_pages(self.content, os.path.join(self.tmp.name, "out"))
+        with self.assertRaises(RuntimeError) as context:
+            asyncio.run(generate_pages_async(pages, self.template, "/"))
+        self.assertIn(bad, str(context.exception))
+
+
+class TestSyncDirectoryAsync(unittest.TestCase):
+    def test_copies_and_prunes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "static")
+            dest = os.path.join(tmp, "docs")
+            os.makedirs(os.path.join(src, "images"))
+            os.makedirs(dest)
+            for name in ("index.css", os.path.join("images", "a.png")):
+                with open(os.path.join(src, name), "w") as f:
+                    f.write(name)
+            with open(os.path.join(dest, "stale.css"), "w") as f:
+                f.write("old")
+            copied, removed = asyncio.run(sync_directory_async(src, dest, io_limit=2))
+            self.assertEqual(len(copied), 2)
+            self.assertEqual(removed, [os.path.join(dest, "stale.css")])
+            with open(os.path.join(dest, "images", "a.png")) as f:
+                self.assertEqual(f.read(), os.path.join("images", "a.png"))
+
+
+if __name__ == "__main__":
+    unittest.main()
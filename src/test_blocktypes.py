@@ -1,5 +1,6 @@
+import io
 import unittest
-from blocktypes import BlockType, markdown_to_blocks, block_to_block_type
+from blocktypes import Block, BlockType, iter_blocks, markdown_to_blocks, block_to_block_type
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -107,3 +108,66 @@ def hello():
         block = "This is just a regular paragraph of text"
         block_type = block_to_block_type(block)
         self.assertEqual(block_type, BlockType.PARAGRAPH)
+
+
+class TestIterBlocks(unittest.TestCase):
+    def test_blocks_types_and_lines(self):
+        md = "# Title\n\nSome text\nmore text\n\n\n- a\n- b\n"
+        self.assertEqual(
+            list(iter_blocks(md)),
+            [
+                Block("# Title", BlockType.HEADING, 1, 1),
+                Block("Some text\nmore text", BlockType.PARAGRAPH, 3, 4),
+                Block("- a\n- b", BlockType.UNORDERED_LIST, 7, 8),
+            ],
+        )
+
+    def test_matches_markdown_to_blocks(self):
+        md = "  Block one  \n\n\n\n   \n\n> quote\n> more\n\n1. x\n2. y"
+        self.assertEqual(
+            [block.text for block in iter_blocks(md)],
+            [block for block in markdown_to_blocks(md) if block],
+        )
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = "```\ndef f():\n\n    return 1\n```\n\nafter"
+        blocks = list(iter_blocks(md))
+        self.assertEqual(len(blocks), 2)
+        self.assertEqual(blocks[0].block_type, BlockType.CODE)
+        self.assertEqual(blocks[0].text, "```\ndef f():\n\n    return 1\n```")
+        self.assertEqual((blocks[0].start_line, blocks[0].end_line), (1, 5))
+        self.assertEqual(blocks[1], Block("after", BlockType.PARAGRAPH, 7, 7))
+
+    def test_inline_code_line_does_not_open_fence(self):
+        md = "```x``` is code\n\n# Title\n\ntext"
+        self.assertEqual(
+            list(iter_blocks(md)),
+            [
+                Block("```x``` is code", BlockType.PARAGRAPH, 1, 1),
+                Block("# Title", BlockType.HEADING, 3, 3),
+                Block("text", BlockType.PARAGRAPH, 5, 5),
+            ],
+        )
+
+    def test_unclosed_fence_splits_on_blank_lines(self):
+        md = "```\ncode\n\n# Title\n\n\ntext"
+        self.assertEqual(
+            list(iter_blocks(md)),
+            [
+                Block("```\ncode", BlockType.PARAGRAPH, 1, 2),
+                Block("# Title", BlockType.HEADING, 4, 4),
+                Block("text", BlockType.PARAGRAPH, 7, 7),
+            ],
+        )
+        self.assertEqual(
+            [block.text for block in iter_blocks(md)],
+            [block for block in markdown_to_blocks(md) if block],
+        )
+
+    def test_accepts_file_lines(self):
+        blocks = list(iter_blocks(io.StringIO("# Title\n\ntext\n")))
+        self.assertEqual([block.text for block in blocks], ["# Title", "text"])
+
+    def test_empty_input(self):
+        self.assertEqual(list(iter_blocks("")), [])
+        self.assertEqual(list(iter_blocks("\n\n  \n")), [])
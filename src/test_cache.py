@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from cache import LOW_WATER, ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_then_hit(self):
+        cache = ParseCache("1", self.cache_dir)
+        key = cache.key("# Title")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<div><h1>Title</h1></div>")
+        self.assertEqual(cache.get(key), "<div><h1>Title</h1></div>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_key_depends_on_version_and_content(self):
+        cache = ParseCache("1", self.cache_dir)
+        self.assertNotEqual(cache.key("a"), cache.key("b"))
+        self.assertNotEqual(cache.key("a"), ParseCache("2", self.cache_dir).key("a"))
+
+    def test_lru_eviction(self):
+        cache = ParseCache("1", self.cache_dir, max_bytes=250)
+        keys = [cache.key(str(i)) for i in range(3)]
+        for i, key in enumerate(keys[:2]):
+            cache.put(key, "x" * 100)
+            os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+        # touch the oldest entry so the second one becomes least recently used
+        cache.get(keys[0])
+        cache.put(keys[2], "x" * 100)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertLessEqual(cache.size(), 250)
+
+    def test_overwrite_does_not_count_twice(self):
+        cache = ParseCache("1", self.cache_dir)
+        key = cache.key("a")
+        for _ in range(3):
+            cache.put(key, "x" * 100)
+        # an overcount would start evicting before the cache is full
+        self.assertEqual(cache._size, 100)
+
+    def test_eviction_leaves_room_for_later_puts(self):
+        cache = ParseCache("1", self.cache_dir, max_bytes=1000)
+        with mock.patch.object(cache, "entries", wraps=cache.entries) as entries:
+            for i in range(30):
+                cache.put(cache.key(str(i)), "x" * 100)
+        self.assertLessEqual(cache.size(), 1000)
+        # one walk to learn the size, then one per eviction, and each
+        # eviction frees room for more than one put
+        evictions = entries.call_count - 1
+        self.assertLessEqual(evictions, (30 - 10) / (1000 * (1 - LOW_WATER) / 100))
+
+    def test_worker_copy_defers_eviction_to_trim(self):
+        cache = ParseCache("1", self.cache_dir, max_bytes=250)
+        worker = cache.worker_copy()
+        with mock.patch.object(worker, "entries") as entries:
+            for i in range(5):
+                worker.put(worker.key(str(i)), "x" * 100)
+            entries.assert_not_called()
+        self.assertEqual(cache.size(), 500)
+        self.assertEqual(cache.trim(), 3)
+        self.assertEqual(cache.size(), 200)
+
+    def test_clear(self):
+        cache = ParseCache("1", self.cache_dir)
+        key = cache.key("a")
+        cache.put(key, "<p>a</p>")
+        cache.clear()
+        self.assertIsNone(cache.get(key))
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
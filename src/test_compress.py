@@ -0,0 +1,74 @@
+import gzip
+import os
+import tempfile
+import unittest
+from compress import precompress_directory, precompress_file, remove_stale_siblings
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.page = os.path.join(self.root, "blog", "index.html")
+        self.write(self.page, "<p>hello</p>\n" * 200)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+
+    def test_writes_gzip_sibling(self):
+        self.assertEqual(precompress_file(self.page), "compressed")
+        with open(self.page, "rb") as f, gzip.open(self.page + ".gz") as g:
+            self.assertEqual(g.read(), f.read())
+        self.assertEqual(os.stat(self.page + ".gz").st_mtime_ns,
+                         os.stat(self.page).st_mtime_ns)
+
+    def test_skips_up_to_date_sibling(self):
+        precompress_file(self.page)
+        self.assertEqual(precompress_file(self.page), "up to date")
+        self.write(self.page, "<p>changed</p>\n" * 200)
+        os.utime(self.page, ns=(0, 1))
+        self.assertEqual(precompress_file(self.page), "compressed")
+
+    def test_skips_files_compression_does_not_help(self):
+        small = os.path.join(self.root, "small.css")
+        noise = os.path.join(self.root, "noise.svg")
+        self.write(small, "p {}")
+        self.write(noise, os.urandom(4096))
+        self.assertEqual(precompress_file(small), "skipped")
+        self.assertEqual(precompress_file(noise), "skipped")
+        self.assertFalse(os.path.exists(noise + ".gz"))
+
+    def test_remove_stale_siblings(self):
+        precompress_file(self.page)
+        other = os.path.join(self.root, "other.html")
+        self.write(other, "<p>other</p>\n" * 200)
+        precompress_file(other)
+        # the page is regenerated by a build without --gzip
+        self.write(self.page, "<p>changed</p>\n" * 200)
+        os.utime(self.page, ns=(0, 1))
+        self.write(os.path.join(self.root, "archive.tar.gz"), b"\x1f\x8b")
+        self.assertEqual(remove_stale_siblings(self.root), [self.page + ".gz"])
+        self.assertTrue(os.path.exists(other + ".gz"))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "archive.tar.gz")))
+
+    def test_directory(self):
+        self.write(os.path.join(self.root, "image.png"), b"\x89PNG" * 200)
+        self.write(os.path.join(self.root, ".ssgen-manifest.json"), "{}" * 200)
+        self.write(os.path.join(self.root, "gone.html.gz"), b"stale")
+        counts = precompress_directory(self.root, jobs=2)
+        self.assertEqual(counts, {"compressed": 1, "up to date": 0, "skipped": 0, "removed": 1})
+        self.assertEqual(
+            sorted(name for _, _, files in os.walk(self.root) for name in files
+                   if name.endswith(".gz")),
+            ["index.html.gz"],
+        )
+        self.assertEqual(precompress_directory(self.root)["up to date"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from deps import DependencyGraph, linked_pages, referenced_assets
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.content = os.path.join(self.dir, "content")
+        self.static = os.path.join(self.dir, "static")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(os.path.join(self.static, "images"))
+        self.image = os.path.join(self.static, "images", "a.png")
+        with open(self.image, "wb") as f:
+            f.write(b"png")
+        self.post = os.path.join(self.content, "blog", "index.md")
+        with open(self.post, "w") as f:
+            f.write("# Blog")
+        self.markdown = (
+            "![a](/images/a.png) [blog](/blog) [new](/new#top) "
+            "[out](https://example.com) ![remote](https://example.com/b.png)"
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_referenced_assets(self):
+        self.assertEqual(referenced_assets(self.markdown, self.static), [self.image])
+
+    def test_links_to_static_files_are_assets(self):
+        pdf = os.path.join(self.static, "doc.pdf")
+        with open(pdf, "wb") as f:
+            f.write(b"pdf")
+        self.assertEqual(
+            referenced_assets(self.markdown + " [doc](/doc.pdf)", self.static),
+            [pdf, self.image],
+        )
+
+    def test_linked_pages(self):
+        self.assertEqual(
+            linked_pages(self.markdown, self.content),
+            [
+                self.post,
+                os.path.join(self.content, "new.md"),
+                os.path.join(self.content, "new", "index.md"),
+            ],
+        )
+
+    def test_linked_flat_page(self):
+        flat = os.path.join(self.content, "about.md")
+        with open(flat, "w") as f:
+            f.write("# About")
+        self.assertEqual(linked_pages("[about](/about)", self.content), [flat])
+
+    def test_fresh_after_record(self):
+        graph = DependencyGraph.load(self.dir)
+        self.assertEqual(graph.stale_reasons("index.md", "template.html"), [])
+        graph.record("index.md", self.markdown, "template.html", self.content, self.static)
+        self.assertEqual(graph.stale_reasons("index.md", "template.html"), [])
+
+    def test_record_from_lines_matches_text(self):
+        from_text = DependencyGraph.load(self.dir)
+        from_text.record("index.md", self.markdown, "template.html", self.content, self.static)
+        from_lines = DependencyGraph.load(self.dir)
+        lines = iter(self.markdown.replace(") ", ")\n").split("\n"))
+        from_lines.record("index.md", lines, "template.html", self.content, self.static)
+        self.assertEqual(from_lines.pages, from_text.pages)
+
+    def test_stale_on_asset_and_link_changes(self):
+        graph = DependencyGraph.load(self.dir)
+        graph.record("index.md", self.markdown, "template.html", self.content, self.static)
+        with open(self.image, "wb") as f:
+            f.write(b"bigger png")
+        new_page = os.path.join(self.content, "new", "index.md")
+        os.makedirs(os.path.dirname(new_page))
+        with open(new_page, "w") as f:
+            f.write("# New")
+        os.remove(self.post)
+        self.assertEqual(
+            graph.stale_reasons("index.md", "template.html"),
+            [
+                f"asset {self.image} changed",
+                f"linked page {self.post} removed",
+                f"linked page {new_page} added",
+            ],
+        )
+        self.assertEqual(
+            graph.stale_reasons("index.md", "other.html")[0],
+            "template is now other.html",
+        )
+
+    def test_dependents(self):
+        graph = DependencyGraph.load(self.dir)
+        graph.record("index.md", self.markdown, "template.html", self.content, self.static)
+        graph.record("other.md", "no links", "template.html", self.content, self.static)
+        self.assertEqual(graph.dependents(self.image), {"index.md"})
+        # an edited page still exists: its linkers are unaffected
+        self.assertEqual(graph.dependents(self.post), set())
+        os.remove(self.post)
+        self.assertEqual(graph.dependents(self.post), {"index.md"})
+        self.assertEqual(graph.dependents("template.html"), {"index.md", "other.md"})
+
+    def test_save_load_and_prune(self):
+        graph = DependencyGraph.load(self.dir)
+        graph.record("index.md", self.markdown, "template.html", self.content, self.static)
+        graph.record("gone.md", "", "template.html", self.content, self.static)
+        graph.prune({"index.md"})
+        graph.save()
+        loaded = DependencyGraph.load(self.dir)
+        self.assertEqual(set(loaded.pages), {"index.md"})
+        self.assertEqual(loaded.stale_reasons("index.md", "template.html"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from files import atomic_open, replace_with_copy, sync_directory
+
+
+class TestSyncDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_initial_sync_copies_everything(self):
+        copied, removed = sync_directory(self.src, self.dest)
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(removed, [])
+        with open(os.path.join(self.dest, "images", "a.png")) as f:
+            self.assertEqual(f.read(), "png")
+
+    def test_unchanged_files_are_not_copied(self):
+        sync_directory(self.src, self.dest)
+        copied, removed = sync_directory(self.src, self.dest)
+        self.assertEqual(copied, [])
+        self.assertEqual(removed, [])
+
+    def test_changed_file_is_copied(self):
+        sync_directory(self.src, self.dest)
+        self.write(os.path.join(self.src, "index.css"), "body { margin: 0 }")
+        copied, _ = sync_directory(self.src, self.dest)
+        self.assertEqual(copied, [os.path.join(self.dest, "index.css")])
+
+    def test_checksum_ignores_touched_file(self):
+        sync_directory(self.src, self.dest)
+        path = os.path.join(self.src, "index.css")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        copied, _ = sync_directory(self.src, self.dest, checksum=True)
+        self.assertEqual(copied, [])
+        copied, _ = sync_directory(self.src, self.dest)
+        self.assertEqual(copied, [])
+
+    def test_prunes_removed_files_but_keeps_generated(self):
+        sync_directory(self.src, self.dest)
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<html></html>")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        _, removed = sync_directory(self.src, self.dest, keep={page})
+        self.assertEqual(removed, [os.path.join(self.dest, "images", "a.png")])
+        self.assertTrue(os.path.exists(page))
+
+
+    def test_prune_keeps_gzip_siblings(self):
+        sync_directory(self.src, self.dest)
+        self.write(os.path.join(self.dest, "page.html"), "page")
+        for name in ("index.css", "page.html"):
+            path = os.path.join(self.dest, name)
+            self.write(path + ".gz", "gz")
+            os.utime(path + ".gz", ns=(0, os.stat(path).st_mtime_ns))
+        self.write(os.path.join(self.dest, "gone.css.gz"), "gz")
+        _, removed = sync_directory(
+            self.src, self.dest, keep={os.path.join(self.dest, "page.html")}
+        )
+        self.assertEqual(removed, [os.path.join(self.dest, "gone.css.gz")])
+
+    def test_prune_removes_outdated_gzip_sibling(self):
+        sync_directory(self.src, self.dest)
+        gz_path = os.path.join(self.dest, "index.css.gz")
+        self.write(gz_path, "gz")
+        os.utime(gz_path, ns=(0, 1))
+        _, removed = sync_directory(self.src, self.dest)
+        self.assertEqual(removed, [gz_path])
+
+
+class TestAtomicWrites(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "out", "index.html")
+        self.link = os.path.join(self.tmp.name, "linked.html")
+        with atomic_open(self.path) as f:
+            f.write("old")
+        os.link(self.path, self.link)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_atomic_open_replaces_instead_of_rewriting(self):
+        with atomic_open(self.path) as f:
+            f.write("new")
+        self.assertEqual(self.read(self.path), "new")
+        self.assertEqual(self.read(self.link), "old")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+    def test_atomic_open_failure_keeps_old_file(self):
+        with self.assertRaises(ValueError):
+            with atomic_open(self.path) as f:
+                f.write("partial")
+                raise ValueError("boom")
+        self.assertEqual(self.read(self.path), "old")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+    def test_replace_with_copy_keeps_linked_file(self):
+        src = os.path.join(self.tmp.name, "src.html")
+        with open(src, "w") as f:
+            f.write("copied")
+        replace_with_copy(src, self.path)
+        self.assertEqual(self.read(self.path), "copied")
+        self.assertEqual(self.read(self.link), "old")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from files import sync_directory
+from fingerprint import AssetManifest, fingerprinted_name
+from templates import Template
+
+
+class TestAssetManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", "body {}")
+        self.write(os.path.join("images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(os.path.join(self.static, path), "w") as f:
+            f.write(text)
+
+    def build(self):
+        assets = AssetManifest.scan(self.static, self.dest)
+        sync_directory(self.static, self.dest, rename=assets.dest_name)
+        assets.save(self.dest)
+        return assets
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("images/a.png", "0123456789abcdef"),
+                         "images/a.0123456789.png")
+        self.assertEqual(fingerprinted_name("LICENSE", "0123456789abcdef"),
+                         "LICENSE.0123456789")
+
+    def test_scan_names_by_content(self):
+        assets = self.build()
+        digest = hashlib.sha256(b"body {}").hexdigest()
+        self.assertEqual(assets.assets["index.css"], f"index.{digest[:10]}.css")
+        self.assertTrue(os.path.exists(os.path.join(self.dest, assets.assets["images/a.png"])))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertEqual(AssetManifest.load(self.dest).assets, assets.assets)
+
+    def test_unchanged_assets_keep_fingerprint(self):
+        first = self.build()
+        self.write("index.css", "body { margin: 0 }")
+        second = self.build()
+        self.assertEqual(first.assets["images/a.png"], second.assets["images/a.png"])
+        self.assertNotEqual(first.assets["index.css"], second.assets["index.css"])
+        self.assertNotEqual(first.digest, second.digest)
+        # the copy under the old fingerprint is pruned
+        self.assertEqual(
+            sorted(os.listdir(self.dest)),
+            sorted(["asset-manifest.json", "images", second.assets["index.css"]]),
+        )
+
+    def test_rewrite_only_asset_urls(self):
+        assets = AssetManifest({"index.css": "index.abc.css", "images/a.png": "images/a.def.png"})
+        html = ('<link href="/index.css"><img src="/images/a.png?v=1" alt="">'
+                '<a href="/blog/post">p</a><a href="index.css">r</a>')
+        self.assertEqual(
+            assets.rewrite(html),
+            '<link href="/index.abc.css"><img src="/images/a.def.png?v=1" alt="">'
+            '<a href="/blog/post">p</a><a href="index.css">r</a>',
+        )
+
+    def test_referenced_digest_ignores_other_assets(self):
+        html = '<link href="/index.css"><a href="/blog/post">p</a>'
+        first = AssetManifest({"index.css": "index.a.css", "images/a.png": "images/a.b.png"})
+        second = AssetManifest({"index.css": "index.a.css", "images/a.png": "images/a.c.png"})
+        third = AssetManifest({"index.css": "index.d.css", "images/a.png": "images/a.b.png"})
+        self.assertEqual(first.referenced_digest(html), second.referenced_digest(html))
+        self.assertNotEqual(first.referenced_digest(html), third.referenced_digest(html))
+
+    def test_template_rewrites_assets_before_basepath(self):
+        assets = AssetManifest({"index.css": "index.abc.css"})
+        template = Template('<link href="/index.css">{{ Content }}')
+        html = template.render_to_string({"Content": '<a href="/index.css">'}, "/site/",
+                                         assets=assets)
+        self.assertEqual(html, '<link href="/site/index.abc.css"><a href="/index.css">')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+from images import ImageSizes, read_image_size
+from textnode import TextNode, TextType
+from utils import text_node_to_html_node
+
+
+def png(width, height):
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR"
+            + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00")
+
+
+def jpeg(width, height):
+    exif = b"Exif\x00\x00" + b"\x00" * 100
+    return (b"\xff\xd8"
+            + b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif
+            + b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 1)
+            + b"\x01\x11\x00" + b"\xff\xd9")
+
+
+def webp(chunk, payload):
+    return b"RIFF" + struct.pack("<I", 30) + b"WEBP" + chunk + struct.pack("<I", 10) + payload
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        with open(path, "wb") as f:
+            f.write(data)
+        return read_image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(png(1026, 388)), (1026, 388))
+
+    def test_gif(self):
+        self.assertEqual(self.size_of(b"GIF89a" + struct.pack("<HH", 320, 200) + b"\x00" * 8),
+                         (320, 200))
+
+    def test_jpeg_skips_segments_before_frame(self):
+        self.assertEqual(self.size_of(jpeg(640, 480)), (640, 480))
+
+    def test_webp_variants(self):
+        lossy = b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 800, 600)
+        self.assertEqual(self.size_of(webp(b"VP8 ", lossy)), (800, 600))
+        bits = (800 - 1) | (600 - 1) << 14
+        self.assertEqual(self.size_of(webp(b"VP8L", b"\x2f" + struct.pack("<I", bits))),
+                         (800, 600))
+        extended = b"\x00" * 4 + (800 - 1).to_bytes(3, "little") + (600 - 1).to_bytes(3, "little")
+        self.assertEqual(self.size_of(webp(b"VP8X", extended)), (800, 600))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(self.size_of(b"not an image"))
+        self.assertIsNone(self.size_of(png(1, 1)[:18]))
+        self.assertIsNone(self.size_of(b"\xff\xd8\xff\xe1\x00"))
+
+
+class TestImageSizes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.cache_path = os.path.join(self.tmp.name, "cache", "image-sizes.json")
+        for name in ("a.png", "b.png"):
+            with open(os.path.join(self.static, "images", name), "wb") as f:
+                f.write(png(40, 30))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_local_and_remote_urls(self):
+        sizes = ImageSizes(self.static, self.cache_path)
+        self.assertEqual(sizes.size("/images/a.png?v=2"), (40, 30))
+        self.assertIsNone(sizes.size("https://example.com/a.png"))
+        self.assertIsNone(sizes.size("/images/missing.png"))
+
+    def test_header_read_once_per_hash_across_builds(self):
+        with mock.patch("images.read_image_size", wraps=read_image_size) as read:
+            sizes = ImageSizes(self.static, self.cache_path)
+            sizes.size("/images/a.png")
+            sizes.size("/images/a.png")
+            # same bytes under another name share the hash
+            sizes.size("/images/b.png")
+            sizes.save()
+            self.assertEqual(read.call_count, 1)
+            later = ImageSizes(self.static, self.cache_path)
+            self.assertEqual(later.size("/images/a.png"), (40, 30))
+            self.assertEqual(read.call_count, 1)
+
+    def test_sizes_measured_elsewhere_are_merged_and_saved(self):
+        worker = ImageSizes(self.static, self.cache_path)
+        worker.size("/images/a.png")
+        parent = ImageSizes(self.static, self.cache_path)
+        parent.merge(worker.take_measured())
+        self.assertEqual(worker.take_measured(), {"sizes": {}, "files": {}})
+        parent.save()
+        with mock.patch("images.read_image_size") as read:
+            later = ImageSizes(self.static, self.cache_path)
+            self.assertEqual(later.size("/images/a.png"), (40, 30))
+            read.assert_not_called()
+
+    def test_changed_image_is_read_again(self):
+        sizes = ImageSizes(self.static, self.cache_path)
+        self.assertEqual(sizes.size("/images/a.png"), (40, 30))
+        path = os.path.join(self.static, "images", "a.png")
+        with open(path, "wb") as f:
+            f.write(png(400, 300))
+        os.utime(path, ns=(0, 1))
+        self.assertEqual(sizes.size("/images/a.png"), (400, 300))
+
+    def test_image_node_gets_dimensions(self):
+        sizes = ImageSizes(self.static, self.cache_path)
+        with mock.patch("utils.IMAGE_SIZES", sizes):
+            node = text_node_to_html_node(TextNode("a", TextType.IMAGE, "/images/a.png"))
+        self.assertEqual(
+            node.to_html(),
+            '<img src="/images/a.png" alt="a" width="40" height="30" '
+            'loading="lazy" decoding="async"></img>',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import contextlib
+import io
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+from main import discover_pages, generate_pages, main
+from render import generate_page
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css" /><article>{{ Content }}</article>'
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+        for name in ("index.md", os.path.join("blog", "a.md"), os.path.join("blog", "b.md")):
+            with open(os.path.join(self.content, name), "w") as f:
+                f.write(f"# {name}\n\nSome **text** with a [link](/blog).\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_outputs(self, pages):
+        outputs = {}
+        for _, dest_path in pages:
+            with open(dest_path) as f:
+                outputs[dest_path] = f.read()
+        return outputs
+
+    def test_discover_pages(self):
+        dest = os.path.join(self.tmp.name, "out")
+        pages = discover_pages(self.content, dest)
+        self.assertEqual(
+            sorted(pages),
+            sorted([
+                (os.path.join(self.content, "index.md"), os.path.join(dest, "index.html")),
+                (os.path.join(self.content, "blog", "a.md"), os.path.join(dest, "blog", "a.html")),
+                (os.path.join(self.content, "blog", "b.md"), os.path.join(dest, "blog", "b.html")),
+            ]),
+        )
+
+    def test_parallel_output_matches_serial(self):
+        serial_pages = discover_pages(self.content, os.path.join(self.tmp.name, "serial"))
+        parallel_pages = discover_pages(self.content, os.path.join(self.tmp.name, "parallel"))
+        generate_pages(serial_pages, self.template, "/ssgen/", jobs=1)
+        generate_pages(parallel_pages, self.template, "/ssgen/", jobs=2)
+        self.assertEqual(
+            list(self.read_outputs(serial_pages).values()),
+            list(self.read_outputs(parallel_pages).values()),
+        )
+
+    def test_error_names_failing_source(self):
+        bad = os.path.join(self.content, "bad.md")
+        with open(bad, "w") as f:
+            f.write("no title here\n")
+        pages = discover_pages(self.content, os.path.join(self.tmp.name, "out"))
+        for jobs in (1, 2):
+            with self.assertRaises(RuntimeError) as context:
+                generate_pages(pages, self.template, "/", jobs=jobs)
+            self.assertIn(bad, str(context.exception))
+
+    def test_large_source_path_matches_small(self):
+        source = os.path.join(self.content, "big.md")
+        with open(source, "w") as f:
+            f.write("# Big\r\n\r\n![img](/a.png) and **bold**\r\n\r\n```\ncode\n\nmore\n```\n\n- a\n- b\n")
+        small = os.path.join(self.tmp.name, "small.html")
+        large = os.path.join(self.tmp.name, "large.html")
+        generate_page(source, self.template, small, "/ssgen/")
+        with mock.patch("render.LARGE_SOURCE_BYTES", 0):
+            generate_page(source, self.template, large, "/ssgen/")
+        with open(small) as f, open(large) as g:
+            self.assertEqual(f.read(), g.read())
+
+
+
+class TestBuild(unittest.TestCase):
+    """Whole builds through main(), in a temporary site."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.makedirs(os.path.join("content", "blog"))
+        os.makedirs("static")
+        self.write("template.html", TEMPLATE)
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.write(os.path.join("content", "index.md"), "# Home\n\n[about](/about)")
+        self.write(os.path.join("content", "blog", "a.md"), "# A\n\n[home](/)")
+        self.write(os.path.join("content", "blog", "b.md"), "# B")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def build(self, *args):
+        """Run a build and return the sources it regenerated, and its output."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(["/", "--no-cache", *args])
+        output = output.getvalue()
+        return set(re.findall(r"Generating page from (\S+)", output)), output
+
+    def test_incremental_build(self):
+        generated, _ = self.build()
+        self.assertEqual(len(generated), 3)
+        self.write(os.path.join("content", "blog", "a.md"), "# A\n\nEdited")
+        os.remove(os.path.join("content", "blog", "b.md"))
+        generated, _ = self.build()
+        self.assertEqual(generated, {os.path.join("content", "blog", "a.md")})
+        self.assertIn("Edited", self.read(os.path.join("docs", "blog", "a.html")))
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog", "b.html")))
+        self.assertNotIn("b.md", self.read(os.path.join("docs", ".ssgen-manifest.json")))
+        self.assertEqual(self.build()[0], set())
+
+    def test_template_and_option_changes_rebuild_every_page(self):
+        self.build()
+        self.write("template.html", "<main>{{ Content }}</main>")
+        self.assertEqual(len(self.build()[0]), 3)
+        generated, output = self.build("--minify", "--explain")
+        self.assertEqual(len(generated), 3)
+        self.assertIn("build options changed", output)
+
+    def test_new_linked_page_rebuilds_linking_page(self):
+        self.build()
+        self.write(os.path.join("content", "about.md"), "# About")
+        generated, output = self.build("--explain")
+        self.assertEqual(generated, {
+            os.path.join("content", "about.md"), os.path.join("content", "index.md"),
+        })
+        self.assertRegex(output, r"Rebuilding content/index.md: linked page \S+ added")
+
+    def test_staged_builds_keep_previous_generation(self):
+        self.build()
+        first = self.read(os.path.join("docs", "blog", "b.html"))
+        self.write(os.path.join("content", "blog", "b.md"), "# B\n\nEdited")
+        _, output = self.build()
+        self.assertIn("previous build kept at", output)
+        generations = os.listdir(".ssgen-generations")
+        self.assertEqual(generations, ["docs.1"])
+        # a build that changes nothing does not take a generation's place
+        self.build()
+        self.assertEqual(os.listdir(".ssgen-generations"), generations)
+        self.build("--rollback")
+        self.assertEqual(self.read(os.path.join("docs", "blog", "b.html")), first)
+
+    def test_keep_generations_must_be_positive(self):
+        with contextlib.redirect_stderr(io.StringIO()) as error:
+            with self.assertRaises(SystemExit):
+                self.build("--keep-generations", "0")
+        self.assertIn("must be at least 1", error.getvalue())
+        self.assertFalse(os.path.exists("docs"))
+
+
+if __name__ == "__main__":
+    unittest.main()
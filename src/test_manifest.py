@@ -0,0 +1,76 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from manifest import BuildManifest, hash_file
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.output = os.path.join(self.dir, "index.html")
+        with open(self.output, "w") as f:
+            f.write("<p>hi</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_file(self):
+        path = os.path.join(self.dir, "a.md")
+        with open(path, "w") as f:
+            f.write("# hi")
+        self.assertEqual(
+            hash_file(path),
+            hashlib.sha256(b"# hi").hexdigest(),
+        )
+
+    def test_fresh_after_record(self):
+        manifest = BuildManifest.load(self.dir)
+        self.assertFalse(manifest.is_fresh("a.md", self.output, "s", "t", "/"))
+        manifest.record("a.md", self.output, "s", "t", "/")
+        self.assertTrue(manifest.is_fresh("a.md", self.output, "s", "t", "/"))
+
+    def test_stale_on_changed_inputs(self):
+        manifest = BuildManifest.load(self.dir)
+        manifest.record("a.md", self.output, "s", "t", "/")
+        self.assertFalse(manifest.is_fresh("a.md", self.output, "s2", "t", "/"))
+        self.assertFalse(manifest.is_fresh("a.md", self.output, "s", "t2", "/"))
+        self.assertFalse(manifest.is_fresh("a.md", self.output, "s", "t", "/ssgen/"))
+
+    def test_stale_on_changed_options(self):
+        manifest = BuildManifest(os.path.join(self.dir, ".ssgen-manifest.json"))
+        manifest.record("a.md", self.output, "s", "t", "/")
+        self.assertTrue(manifest.is_fresh("a.md", self.output, "s", "t", "/", {}))
+        self.assertEqual(
+            manifest.stale_reasons("a.md", self.output, "s", "t", "/", {"minify": True}),
+            ["build options changed"],
+        )
+        manifest.record("a.md", self.output, "s", "t", "/", {"minify": True})
+        self.assertTrue(manifest.is_fresh("a.md", self.output, "s", "t", "/", {"minify": True}))
+        self.assertFalse(manifest.is_fresh("a.md", self.output, "s", "t", "/"))
+
+    def test_stale_when_output_missing(self):
+        manifest = BuildManifest.load(self.dir)
+        manifest.record("a.md", self.output, "s", "t", "/")
+        os.remove(self.output)
+        self.assertFalse(manifest.is_fresh("a.md", self.output, "s", "t", "/"))
+
+    def test_save_and_load_roundtrip(self):
+        manifest = BuildManifest.load(self.dir)
+        manifest.record("a.md", self.output, "s", "t", "/")
+        manifest.save()
+        loaded = BuildManifest.load(self.dir)
+        self.assertTrue(loaded.is_fresh("a.md", self.output, "s", "t", "/"))
+
+    def test_prune_removes_stale_outputs(self):
+        manifest = BuildManifest.load(self.dir)
+        manifest.record("a.md", self.output, "s", "t", "/")
+        removed = manifest.prune(set())
+        self.assertEqual(removed, [self.output])
+        self.assertFalse(os.path.exists(self.output))
+        self.assertEqual(manifest.entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
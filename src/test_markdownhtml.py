@@ -1,5 +1,6 @@
 import unittest
-from markdownhtml import markdown_to_html_node
+from blocktypes import BlockType
+from markdownhtml import BlockMemo, iter_block_html, markdown_to_html_node
 
 class TestMarkdownToHTML(unittest.TestCase):
     def test_paragraphs(self):
@@ -34,6 +35,14 @@ class TestMarkdownToHTML(unittest.TestCase):
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_blank_lines(self):
+        md = "```\nfirst\n\nsecond\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>first\n\nsecond\n</code></pre></div>",
+        )
+
     def test_heading(self):
         md = "# This is a heading"
         node = markdown_to_html_node(md)
@@ -108,3 +117,43 @@ code block
         self.assertIn("<p>", html)
         self.assertIn("<ul>", html)
         self.assertIn("<pre>", html)
+
+
+class TestBlockMemo(unittest.TestCase):
+    MD = "# Title\n\nA **bold** paragraph\n\n- one\n- two\n\n```\ncode\n```"
+
+    def test_iter_block_html_matches_to_html(self):
+        html = "".join(fragment for fragment, _ in iter_block_html(self.MD, BlockMemo()))
+        self.assertEqual(f"<div>{html}</div>", markdown_to_html_node(self.MD).to_html())
+
+    def test_reuses_unchanged_blocks(self):
+        memo = BlockMemo()
+        list(iter_block_html(self.MD, memo))
+        self.assertEqual((memo.hits, memo.misses), (0, 4))
+        edited = self.MD.replace("A **bold** paragraph", "An _edited_ paragraph")
+        list(iter_block_html(edited, memo))
+        self.assertEqual((memo.hits, memo.misses), (3, 5))
+
+    def test_key_includes_block_type(self):
+        memo = BlockMemo()
+        self.assertNotEqual(
+            memo.render("- a", BlockType.UNORDERED_LIST)[0],
+            memo.render("- a", BlockType.PARAGRAPH)[0],
+        )
+
+    def test_node_counts(self):
+        memo = BlockMemo()
+        self.assertEqual(memo.render("A **b**", BlockType.PARAGRAPH), ("<p>A <b>b</b></p>", 3))
+
+    def test_eviction_bounds_entries(self):
+        memo = BlockMemo(max_entries=2)
+        for text in ("a", "b", "c"):
+            memo.render(text, BlockType.PARAGRAPH)
+        self.assertEqual(len(memo), 2)
+        self.assertEqual(memo.evictions, 1)
+        memo.render("a", BlockType.PARAGRAPH)
+        self.assertEqual(memo.misses, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
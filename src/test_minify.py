@@ -0,0 +1,63 @@
+import unittest
+from minify import HTMLMinifier
+
+
+def minify(html: str) -> str:
+    minifier = HTMLMinifier()
+    return minifier.feed(html) + minifier.close()
+
+
+class TestHTMLMinifier(unittest.TestCase):
+    def test_collapses_whitespace(self):
+        self.assertEqual(
+            minify("<div>\n  <p>one   two\n three</p>\n</div>\n"),
+            "<div><p>one two three</p></div>",
+        )
+
+    def test_keeps_space_between_inline_elements(self):
+        self.assertEqual(
+            minify("<p><b>bold</b> <i>italic</i>  text</p>"),
+            "<p><b>bold</b> <i>italic</i> text</p>",
+        )
+
+    def test_pre_and_code_untouched(self):
+        html = "<pre><code>def f():\n    return  1\n</code></pre>"
+        self.assertEqual(minify("<div>\n" + html + "\n</div>"), "<div>" + html + "</div>")
+        self.assertEqual(minify("<p>run <code>a  b</code></p>"), "<p>run <code>a  b</code></p>")
+
+    def test_bare_less_than_is_text(self):
+        html = "<p>a < b <code>q  r</code></p>"
+        self.assertEqual(minify(html), html)
+        self.assertEqual(minify("<p>1 <  2</p>"), "<p>1 < 2</p>")
+        for size in (1, 2, 3, 5):
+            minifier = HTMLMinifier()
+            chunks = [minifier.feed(html[i:i + size]) for i in range(0, len(html), size)]
+            self.assertEqual("".join(chunks) + minifier.close(), html, size)
+
+    def test_removes_comments(self):
+        self.assertEqual(minify("<p>a<!-- note -->b</p>"), "<p>ab</p>")
+        self.assertEqual(minify("<!--[if IE]><p>x</p><![endif]-->"),
+                         "<!--[if IE]><p>x</p><![endif]-->")
+
+    def test_drops_optional_quotes(self):
+        self.assertEqual(
+            minify('<a href="/blog/post" title="two words" class="">x</a>'),
+            '<a href=/blog/post title="two words" class="">x</a>',
+        )
+        self.assertEqual(minify("""<img alt='say "hi"' src="a.png" />"""),
+                         """<img alt='say "hi"' src=a.png>""")
+
+    def test_chunked_input_matches_whole(self):
+        html = ('<html>\n <head><title>T</title></head>\n<body>\n<p>a <b>b</b>  c'
+                '<!-- x --></p>\n<pre>\n  keep </pre>\n<a href="/x">y</a></body></html>')
+        expected = minify(html)
+        for size in (1, 2, 3, 7, 16):
+            minifier = HTMLMinifier()
+            chunks = [minifier.feed(html[i:i + size]) for i in range(0, len(html), size)]
+            self.assertEqual("".join(chunks) + minifier.close(), expected, size)
+            self.assertEqual(minifier.bytes_in, len(html))
+            self.assertEqual(minifier.saved, len(html) - len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+from htmlnode import LeafNode, ParentNode
+from profiling import BuildProfiler, NullProfiler, PageProfile, count_nodes
+
+
+class TestProfiling(unittest.TestCase):
+    def test_count_nodes(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "b")])])
+        self.assertEqual(count_nodes(node), 4)
+
+    def test_page_profile_marks_stages(self):
+        profile = PageProfile("a.md", "a.html")
+        profile.mark("read")
+        profile.mark("parse")
+        profile.mark("parse")
+        self.assertEqual(list(profile.stages), ["read", "parse"])
+        self.assertAlmostEqual(profile.total, sum(profile.stages.values()))
+
+    def test_report_sorts_pages_slowest_first(self):
+        profiler = BuildProfiler()
+        fast = PageProfile("fast.md", "fast.html")
+        fast.stages = {"parse": 0.001}
+        slow = PageProfile("slow.md", "slow.html")
+        slow.stages = {"parse": 0.5}
+        slow.bytes_in, slow.nodes = 10, 3
+        with profiler.stage("generate_pages"):
+            profiler.add_pages([fast, slow])
+        report = profiler.report()
+        self.assertEqual([page["source"] for page in report["pages"]], ["slow.md", "fast.md"])
+        self.assertEqual(report["bytes_in"], 10)
+        self.assertEqual(report["nodes"], 3)
+        self.assertIn("generate_pages", report["stages"])
+        self.assertEqual([page.source for page in profiler.slowest(1)], ["slow.md"])
+
+    def test_write_report(self):
+        profiler = BuildProfiler()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            profiler.write(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["pages_generated"], 0)
+
+    def test_trace_events(self):
+        profiler = BuildProfiler()
+        with profiler.stage("generate_pages"):
+            page = PageProfile("a.md", "a.html")
+            page.mark("read")
+            page.mark("render")
+            worker = PageProfile("b.md", "b.html")
+            worker.mark("read")
+            worker.pid, worker.tid = os.getpid() + 1, 7
+            profiler.add_pages([page, worker])
+        events = profiler.trace_events()
+        spans = [event for event in events if event["ph"] == "X"]
+        self.assertEqual(
+            [(event["name"], event["cat"]) for event in spans],
+            [("generate_pages", "build"), ("a.md", "page"), ("read", "page"),
+             ("render", "page"), ("b.md", "page"), ("read", "page")],
+        )
+        build, page_span, read, render = spans[:4]
+        self.assertEqual((build["pid"], build["tid"]), (os.getpid(), 0))
+        self.assertEqual(page_span["tid"], page.tid)
+        self.assertEqual(page_span["ts"], read["ts"])
+        self.assertAlmostEqual(page_span["ts"] + page_span["dur"],
+                               render["ts"] + render["dur"], places=2)
+        self.assertGreaterEqual(read["ts"], build["ts"])
+        self.assertEqual((spans[4]["pid"], spans[4]["tid"]), (os.getpid() + 1, 7))
+        self.assertIn({"name": "process_name", "ph": "M", "pid": os.getpid() + 1, "tid": 0,
+                       "args": {"name": f"worker {os.getpid() + 1}"}}, events)
+
+    def test_write_trace(self):
+        profiler = BuildProfiler()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.write_trace(path)
+            with open(path) as f:
+                self.assertIn("traceEvents", json.load(f))
+
+    def test_null_profiler_is_noop(self):
+        profiler = NullProfiler()
+        with profiler.stage("anything"):
+            pass
+        profiler.add_pages([PageProfile("a.md", "a.html")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from blocktypes import BLOCK_DETECTORS, BlockType, block_to_block_type
+from htmlnode import LeafNode, ParentNode
+from markdownhtml import BLOCK_MEMO, BLOCK_RENDERERS, markdown_to_html_node, register_block_type
+from registry import RendererRegistry
+from textnode import TextNode, TextType
+from utils import INLINE_RENDERERS, text_node_to_html_node
+
+
+class TestRendererRegistry(unittest.TestCase):
+    def test_register_and_render(self):
+        registry = RendererRegistry("thing")
+        registry.register("a", lambda value: value * 2)
+
+        @registry.register("b")
+        def render_b(value):
+            return value + 1
+
+        self.assertEqual(registry.render("a", 3), 6)
+        self.assertEqual(registry.render("b", 3), 4)
+        self.assertIn("b", registry)
+        registry.unregister("b")
+        with self.assertRaisesRegex(ValueError, "invalid thing: b"):
+            registry.render("b", 3)
+
+    def test_builtins_are_registered(self):
+        self.assertEqual(set(BLOCK_RENDERERS.renderers), set(BlockType))
+        self.assertEqual(set(INLINE_RENDERERS.renderers), set(TextType))
+
+    def test_replace_inline_renderer(self):
+        original = INLINE_RENDERERS.renderers[TextType.BOLD]
+        INLINE_RENDERERS.register(TextType.BOLD, lambda node: LeafNode("strong", node.text))
+        try:
+            node = text_node_to_html_node(TextNode("hi", TextType.BOLD))
+        finally:
+            INLINE_RENDERERS.register(TextType.BOLD, original)
+        self.assertEqual(node.to_html(), "<strong>hi</strong>")
+
+
+class TestCustomBlockTypes(unittest.TestCase):
+    def tearDown(self):
+        BLOCK_DETECTORS.clear()
+        BLOCK_RENDERERS.unregister("admonition")
+        BLOCK_MEMO.clear()
+
+    def test_register_admonition(self):
+        def is_admonition(text, lines):
+            return text.startswith("> [!NOTE]")
+
+        def render_admonition(text):
+            body = " ".join(line.lstrip("> ") for line in text.split("\n")[1:])
+            return ParentNode("aside", [LeafNode(None, body)], {"class": "note"})
+
+        markdown = "> [!NOTE]\n> Read this\n\n> plain quote"
+        before = markdown_to_html_node(markdown).to_html()
+        self.assertIn("<blockquote>[!NOTE] Read this</blockquote>", before)
+        register_block_type("admonition", is_admonition, render_admonition)
+        self.assertEqual(block_to_block_type("> [!NOTE]\n> x"), "admonition")
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            '<div><aside class="note">Read this</aside>'
+            "<blockquote>plain quote</blockquote></div>",
+        )
+
+    def test_reregistering_replaces_detector(self):
+        register_block_type("admonition", lambda text, lines: False, lambda text: None)
+        register_block_type("admonition", lambda text, lines: True,
+                            lambda text: LeafNode("p", "x"))
+        self.assertEqual(len(BLOCK_DETECTORS), 1)
+        self.assertEqual(markdown_to_html_node("anything").to_html(), "<div><p>x</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from cache import ParseCache
+from main import index_pages
+from manifest import BuildManifest, hash_file
+from render import render_article
+from search import SEARCH_DIR, SearchIndexWriter, iter_terms, shard_name
+
+
+def read_index(dest_dir):
+    index_dir = os.path.join(dest_dir, SEARCH_DIR)
+    with open(os.path.join(index_dir, "meta.json")) as f:
+        meta = json.load(f)
+    shards = {}
+    for shard in meta["shards"]:
+        with open(os.path.join(index_dir, f"{shard}.json")) as f:
+            shards[shard] = json.load(f)
+    with open(os.path.join(index_dir, "pages.json")) as f:
+        pages = json.load(f)
+    return meta, shards, pages
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_terms_strips_markup(self):
+        self.assertEqual(
+            list(iter_terms(["<h1>Tom &amp; Goldberry</h1>", '<p><a href="/x">Old</a> Forest</p>'])),
+            ["tom", "goldberry", "old", "forest"],
+        )
+
+    def test_shard_names(self):
+        self.assertEqual(shard_name("tolkien"), "to")
+        self.assertEqual(shard_name("a"), "a")
+        self.assertEqual(shard_name("éowyn"), "_" + "éo".encode().hex())
+        self.assertEqual(shard_name("_"), "_5f")
+
+    def test_escaped_prefix_does_not_collide(self):
+        # "_" used to be stored in shard "5f", overwriting the shard of "5ft"
+        for max_postings in (10**6, 1):
+            dest = os.path.join(self.dest, str(max_postings))
+            writer = SearchIndexWriter(dest, max_postings)
+            writer.add_page("/", "", ["<p>5ft 7up _</p>"])
+            counts = writer.finish()
+            meta, shards, _ = read_index(dest)
+            self.assertEqual(counts["terms"], 3)
+            self.assertEqual(meta["shards"], ["5f", "7u", "_5f"])
+            self.assertEqual(shards["5f"], {"5ft": [[0, [0]]]})
+            self.assertEqual(shards["_5f"], {"_": [[0, [2]]]})
+
+    def test_postings_and_positions(self):
+        writer = SearchIndexWriter(self.dest)
+        writer.add_page("/a/", "A", ["<p>the ring the</p>"])
+        writer.add_page("/b/", "B", ["<p>ring</p>"])
+        counts = writer.finish()
+        meta, shards, pages = read_index(self.dest)
+        self.assertEqual(counts, {"pages": 2, "terms": 2, "shards": 2, "runs": 0})
+        self.assertEqual(meta["shards"], ["ri", "th"])
+        self.assertEqual(shards["th"], {"the": [[0, [0, 2]]]})
+        self.assertEqual(shards["ri"], {"ring": [[0, [1]], [1, [0]]]})
+        self.assertEqual(pages, [["/a/", "A"], ["/b/", "B"]])
+
+    def test_spilled_runs_merge_to_same_index(self):
+        texts = [f"<p>word{i % 7} common text{i} common</p>" for i in range(50)]
+        expected_dir = os.path.join(self.dest, "memory")
+        spilled_dir = os.path.join(self.dest, "spilled")
+        for dest, max_postings in ((expected_dir, 10**6), (spilled_dir, 5)):
+            writer = SearchIndexWriter(dest, max_postings)
+            for i, text in enumerate(texts):
+                writer.add_page(f"/{i}/", str(i), [text])
+            counts = writer.finish()
+        self.assertGreater(counts["runs"], 1)
+        self.assertEqual(read_index(spilled_dir), read_index(expected_dir))
+
+    def test_stale_shards_removed(self):
+        writer = SearchIndexWriter(self.dest)
+        writer.add_page("/", "", ["<p>alpha beta</p>"])
+        writer.finish()
+        writer = SearchIndexWriter(self.dest)
+        writer.add_page("/", "", ["<p>beta</p>"])
+        writer.finish()
+        self.assertEqual(sorted(os.listdir(os.path.join(self.dest, SEARCH_DIR))),
+                         ["be.json", "meta.json", "pages.json"])
+
+    def test_index_pages(self):
+        content = os.path.join(self.dest, "content")
+        os.makedirs(os.path.join(content, "blog"))
+        sources = {"index.md": "# Home\n\nWelcome **home**", "blog/post.md": "# Post\n\nHello"}
+        pages = []
+        for name, text in sources.items():
+            with open(os.path.join(content, name), "w") as f:
+                f.write(text)
+            pages.append((os.path.join(content, name),
+                          os.path.join(self.dest, "docs", name.replace(".md", ".html"))))
+        index_pages(pages, os.path.join(self.dest, "docs"), "/site/")
+        _, shards, page_list = read_index(os.path.join(self.dest, "docs"))
+        self.assertEqual(page_list, [["/site/", "Home"], ["/site/blog/post.html", "Post"]])
+        self.assertEqual(shards["ho"], {"home": [[0, [0, 2]]]})
+
+    def test_index_pages_reuses_cached_terms(self):
+        content = os.path.join(self.dest, "content")
+        docs = os.path.join(self.dest, "docs")
+        os.makedirs(content)
+        pages = []
+        for name, text in {"a.md": "# A\n\nalpha", "b.md": "# B\n\nbeta"}.items():
+            with open(os.path.join(content, name), "w") as f:
+                f.write(text)
+            pages.append((os.path.join(content, name), os.path.join(docs, name[0] + ".html")))
+        cache = ParseCache("test", os.path.join(self.dest, "cache"))
+        manifest = BuildManifest(os.path.join(docs, "manifest.json"))
+        index_pages(pages, docs, "/", cache, manifest=manifest)
+        first = read_index(docs)
+        with open(pages[1][0], "w") as f:
+            f.write("# B\n\ngamma")
+        with mock.patch("main.render_article", wraps=render_article) as render:
+            index_pages(pages, docs, "/", cache, manifest=manifest)
+        # only the edited page was rendered again
+        self.assertEqual([call.args[0] for call in render.call_args_list], ["# B\n\ngamma"])
+        _, shards, page_list = read_index(docs)
+        self.assertEqual(page_list, first[2])
+        self.assertEqual(shards["ga"], {"gamma": [[1, [1]]]})
+        self.assertNotIn("be", shards)
+        # the entry for the old version of b.md was dropped
+        entries = [name for _, _, names in os.walk(os.path.join(cache.cache_dir, SEARCH_DIR))
+                   for name in names]
+        self.assertEqual(len(entries), 2)
+
+    def test_index_pages_trusts_manifest_hash(self):
+        content = os.path.join(self.dest, "content")
+        docs = os.path.join(self.dest, "docs")
+        os.makedirs(content)
+        pages = [(os.path.join(content, "a.md"), os.path.join(docs, "a.html"))]
+        with open(pages[0][0], "w") as f:
+            f.write("# A\n\nalpha")
+        cache = ParseCache("test", os.path.join(self.dest, "cache"))
+        manifest = BuildManifest(os.path.join(docs, "manifest.json"))
+        manifest.record(pages[0][0], pages[0][1], hash_file(pages[0][0]), "t", "/")
+        index_pages(pages, docs, "/", cache, manifest=manifest)
+        with mock.patch("builtins.open", wraps=open) as opened:
+            index_pages(pages, docs, "/", cache, manifest=manifest)
+        self.assertNotIn(pages[0][0], [call.args[0] for call in opened.call_args_list])
+
+
+if __name__ == "__main__":
+    unittest.main()
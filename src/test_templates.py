@@ -0,0 +1,69 @@
+import io
+import os
+import tempfile
+import unittest
+from minify import HTMLMinifier
+from templates import Template, load_template, rewrite_basepath
+
+
+class TestTemplate(unittest.TestCase):
+    def test_parse_segments_and_slots(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(template.segments, ["<title>", "</title><article>", "</article>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render_string_and_chunks(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}")
+        html = template.render_to_string(
+            {"Title": "Hi", "Content": lambda: iter(["<p>", "x", "</p>"])}
+        )
+        self.assertEqual(html, "<h1>Hi</h1><p>x</p>")
+
+    def test_repeated_slot_calls_value_each_time(self):
+        template = Template("{{ Content }}|{{ Content }}")
+        html = template.render_to_string({"Content": lambda: iter(["a", "b"])})
+        self.assertEqual(html, "ab|ab")
+
+    def test_missing_slot_left_as_written(self):
+        template = Template("<p>{{ Unknown }}</p>")
+        self.assertEqual(template.render_to_string({}), "<p>{{ Unknown }}</p>")
+
+    def test_basepath_rewrites_only_static_segments(self):
+        template = Template('<link href="/index.css" />{{ Content }}')
+        buffer = io.StringIO()
+        template.render(buffer, {"Content": '<a href="/raw">x</a>'}, "/ssgen/")
+        self.assertEqual(
+            buffer.getvalue(), '<link href="/ssgen/index.css" /><a href="/raw">x</a>'
+        )
+
+    def test_render_with_minifier(self):
+        template = Template('<a href="/x">{{ Title }}</a>\n  <p>\n{{ Content }}\n</p>')
+        minifier = HTMLMinifier()
+        html = template.render_to_string(
+            {"Title": "Hi", "Content": lambda: iter(["a  ", " b"])}, "/site/", minifier
+        )
+        self.assertEqual(html, '<a href=/site/x>Hi</a><p>a b</p>')
+        self.assertEqual(minifier.saved, minifier.bytes_in - len(html))
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(
+            rewrite_basepath('<img src="/a.png" alt="a"><a href="/b">', "/x/"),
+            '<img src="/x/a.png" alt="a"><a href="/x/b">',
+        )
+
+    def test_load_template_is_cached_until_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("<p>{{ Content }}</p>")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+            with open(path, "w") as f:
+                f.write("<div>{{ Content }}</div>")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertEqual(load_template(path).segments, ["<div>", "</div>"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -46,7 +46,8 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(
             html_node.props,
-            {"src": "https://www.boot.dev", "alt": "This is an image"},
+            {"src": "https://www.boot.dev", "alt": "This is an image",
+             "loading": "lazy", "decoding": "async"},
         )
 
     def test_bold(self):
@@ -55,6 +56,11 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "b")
         self.assertEqual(html_node.value, "This is bold")
 
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.LINK, "https://www.boot.dev")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(repr(node), "TextNode(This is a text node, link, https://www.boot.dev)")
+
 
 if __name__ == "__main__":
     unittest.main()
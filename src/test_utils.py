@@ -1,5 +1,6 @@
 from utils import text_node_to_html_node, split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
 from textnode import TextNode, TextType
+import random
 import unittest
 
 class TestSplitNodesDelimiter(unittest.TestCase):
@@ -99,7 +100,11 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
         html_node = text_node_to_html_node(node)
         self.assertEqual(html_node.tag, "img")
         self.assertEqual(html_node.value, "")
-        self.assertEqual(html_node.props, {"src": "https://example.com/image.png", "alt": "alt text"})
+        self.assertEqual(
+            html_node.props,
+            {"src": "https://example.com/image.png", "alt": "alt text",
+             "loading": "lazy", "decoding": "async"},
+        )
 
 class TestExtractMarkdownImages(unittest.TestCase):
     def test_extract_markdown_images(self):
@@ -213,6 +218,28 @@ class TestSplitNodesLink(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_links_repeated(self):
+        node = TextNode("[a](u)[a](u) x [a](u)", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("a", TextType.LINK, "u"),
+                TextNode("a", TextType.LINK, "u"),
+                TextNode(" x ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "u"),
+            ],
+            split_nodes_link([node]),
+        )
+
+    def test_split_links_leaves_image_bang(self):
+        node = TextNode("see ![a](u)", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("see !", TextType.TEXT),
+                TextNode("a", TextType.LINK, "u"),
+            ],
+            split_nodes_link([node]),
+        )
+
 class TestTextToTextNodes(unittest.TestCase):
     def test_split_all_nodes(self):
         text = "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
@@ -288,5 +315,45 @@ class TestTextToTextNodes(unittest.TestCase):
             new_nodes
         )
 
+    def test_text_to_textnodes_empty(self):
+        self.assertListEqual([], text_to_textnodes(""))
+
+    def test_text_to_textnodes_unmatched_raises(self):
+        for text in ("**bold", "_a **b** c_", "`a_b`", "a**b`c**d`"):
+            with self.assertRaises(Exception) as context:
+                text_to_textnodes(text)
+            self.assertIn("Unmatched delimiter", str(context.exception))
+
+    def test_text_to_textnodes_ignores_inner_delimiters(self):
+        self.assertListEqual(
+            [
+                TextNode("a _b_ `c`", TextType.BOLD),
+                TextNode(" ", TextType.TEXT),
+                TextNode("d `e`", TextType.ITALIC),
+            ],
+            text_to_textnodes("**a _b_ `c`** _d `e`_"),
+        )
+
+    def test_text_to_textnodes_matches_split_passes(self):
+        """The single-pass scanner agrees with chaining the split functions"""
+        def split_passes(text):
+            nodes = [TextNode(text, TextType.TEXT)]
+            nodes = split_nodes_delimiter(nodes, "**", TextType.TEXT)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.TEXT)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.TEXT)
+            return split_nodes_link(split_nodes_image(nodes))
+
+        def outcome(func, text):
+            try:
+                return func(text)
+            except Exception as e:
+                return str(e)
+
+        pieces = ["a", " ", "*", "**", "_", "`", "[", "]", "(", ")", "!", "![x](y)", "[l](u)"]
+        rng = random.Random(0)
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(outcome(split_passes, text), outcome(text_to_textnodes, text), text)
+
 if __name__ == "__main__":
     unittest.main()
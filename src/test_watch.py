@@ -0,0 +1,129 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from watch import LiveReload, SiteWatcher, changed_paths, snapshot, watch_loop
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_changed_paths(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(changed_paths(old, new), {"b", "c", "d"})
+
+    def test_snapshot_walks_directories(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "sub"))
+            path = os.path.join(tmp, "sub", "a.md")
+            with open(path, "w") as f:
+                f.write("# a")
+            self.assertEqual(list(snapshot([tmp])), [path])
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_wait_returns_new_generation(self):
+        livereload = LiveReload()
+        livereload.notify()
+        self.assertEqual(livereload.wait(0, timeout=0), 1)
+        self.assertEqual(livereload.wait(1, timeout=0), 1)
+
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.template = os.path.join(root, "template.html")
+        self.docs = os.path.join(root, "docs")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(self.template, "<body>{{ Content }}</body>")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.watcher = SiteWatcher("/", self.content, self.static, self.template, self.docs)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_rebuilds_only_changed_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Post\n\nEdited")
+        self.assertEqual(self.watcher.rebuild(self.watcher.poll()), 1)
+        self.assertIn("Edited", self.read(os.path.join(self.docs, "blog", "post.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_template_change_rebuilds_all_pages(self):
+        self.write(self.template, "<main>{{ Content }}</main>")
+        self.assertEqual(self.watcher.rebuild(self.watcher.poll()), 2)
+
+    def test_static_change_syncs_assets(self):
+        self.write(os.path.join(self.static, "new.css"), "p {}")
+        self.assertEqual(self.watcher.rebuild(self.watcher.poll()), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "new.css")))
+
+    def test_deleted_page_removes_output(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Post\n\nEdited")
+        self.watcher.rebuild(self.watcher.poll())
+        os.remove(post)
+        self.watcher.rebuild(self.watcher.poll())
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+
+    def test_asset_change_rebuilds_dependent_pages(self):
+        index = os.path.join(self.content, "index.md")
+        self.write(os.path.join(self.static, "a.png"), "png")
+        self.write(index, "# Home\n\n![a](/a.png)")
+        self.watcher.rebuild(self.watcher.poll())
+        self.write(os.path.join(self.static, "a.png"), "bigger png")
+        self.assertEqual(self.watcher.rebuild(self.watcher.poll()), 1)
+
+    def test_new_page_rebuilds_pages_linking_to_it(self):
+        index = os.path.join(self.content, "index.md")
+        self.write(index, "# Home\n\n[about](/about)")
+        self.watcher.rebuild(self.watcher.poll())
+        self.write(os.path.join(self.content, "about.md"), "# About")
+        self.assertEqual(self.watcher.rebuild(self.watcher.poll()), 2)
+
+    def test_edited_page_does_not_rebuild_pages_linking_to_it(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Post\n\n[home](/)")
+        self.watcher.rebuild(self.watcher.poll())
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited")
+        self.assertEqual(self.watcher.rebuild(self.watcher.poll()), 1)
+
+    def test_loop_survives_failing_rebuild(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        edits = [
+            lambda: self.write(post, "# Post\n\nUnmatched **bold"),
+            lambda: self.write(post, "# Post\n\nFixed"),
+        ]
+
+        def sleep(interval):
+            if not edits:
+                raise KeyboardInterrupt
+            edits.pop(0)()
+
+        livereload = LiveReload()
+        output = io.StringIO()
+        with mock.patch("watch.time.sleep", sleep), contextlib.redirect_stdout(output):
+            with self.assertRaises(KeyboardInterrupt):
+                watch_loop(self.watcher, livereload, 0)
+        self.assertIn("Rebuild failed", output.getvalue())
+        self.assertIn("Fixed", self.read(os.path.join(self.docs, "blog", "post.html")))
+        self.assertEqual(livereload.wait(0, timeout=0), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
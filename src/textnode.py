@@ -30,6 +30,8 @@ class TextNode:
         url (str | None): URL for links and images (optional).
     """
 
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str | None = None) -> None:
         """Initialize a TextNode.
         
@@ -1,11 +1,20 @@
 import re
 from htmlnode import LeafNode
+from images import IMAGE_SIZES
+from registry import RendererRegistry
 from textnode import TextNode, TextType
 
+# renderer for each TextType, called with the TextNode
+INLINE_RENDERERS = RendererRegistry("text type")
+
+
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
     """Convert a TextNode to an HTML LeafNode.
     
-    Translates inline text formatting (bold, italic, etc.) into appropriate HTML tags.
+    Translates inline text formatting (bold, italic, etc.) into appropriate HTML tags,
+    using the renderer INLINE_RENDERERS holds for the node's TextType.
+    Images of this site get their width and height from IMAGE_SIZES, and
+    every image is marked for lazy loading and asynchronous decoding.
     
     Args:
         text_node: A TextNode with a specific TextType.
@@ -16,19 +25,43 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
     Raises:
         ValueError: If text_node has an invalid or unrecognized TextType.
     """
-    if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
-    if text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
-    if text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
-    if text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
-    if text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-    raise ValueError(f"invalid text type: {text_node.text_type}")
+    return INLINE_RENDERERS.render(text_node.text_type, text_node)
+
+
+@INLINE_RENDERERS.register(TextType.TEXT)
+def _render_text(text_node: TextNode) -> LeafNode:
+    return LeafNode(None, text_node.text)
+
+
+@INLINE_RENDERERS.register(TextType.BOLD)
+def _render_bold(text_node: TextNode) -> LeafNode:
+    return LeafNode("b", text_node.text)
+
+
+@INLINE_RENDERERS.register(TextType.ITALIC)
+def _render_italic(text_node: TextNode) -> LeafNode:
+    return LeafNode("i", text_node.text)
+
+
+@INLINE_RENDERERS.register(TextType.CODE)
+def _render_code(text_node: TextNode) -> LeafNode:
+    return LeafNode("code", text_node.text)
+
+
+@INLINE_RENDERERS.register(TextType.LINK)
+def _render_link(text_node: TextNode) -> LeafNode:
+    return LeafNode("a", text_node.text, {"href": text_node.url})
+
+
+@INLINE_RENDERERS.register(TextType.IMAGE)
+def _render_image(text_node: TextNode) -> LeafNode:
+    props = {"src": text_node.url, "alt": text_node.text}
+    size = IMAGE_SIZES.size(text_node.url)
+    if size:
+        props["width"], props["height"] = str(size[0]), str(size[1])
+    props["loading"] = "lazy"
+    props["decoding"] = "async"
+    return LeafNode("img", "", props)
 
 
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, 
@@ -73,6 +106,11 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str,
                 new_nodes.append(TextNode(part, TextType.TEXT))
     return new_nodes
 
+# Compiled once at import; both patterns capture (text, url).
+_IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_RE = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
     """Extract markdown image links from text.
     
@@ -84,11 +122,7 @@ def extract_markdown_images(text: str) -> list[tuple[str, str]]:
     Returns:
         list[tuple[str, str]]: List of (alt_text, url) tuples.
     """
-    extracted_tuples = []
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    for match in matches:
-        extracted_tuples.append((match[0], match[1]))
-    return extracted_tuples
+    return _IMAGE_RE.findall(text)
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
     """Extract markdown links from text.
@@ -101,11 +135,7 @@ def extract_markdown_links(text: str) -> list[tuple[str, str]]:
     Returns:
         list[tuple[str, str]]: List of (link_text, url) tuples.
     """
-    extracted_tuples = []
-    matches = re.findall(r"\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    for match in matches:
-        extracted_tuples.append((match[0], match[1]))
-    return extracted_tuples
+    return _LINK_RE.findall(text)
 
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
     """Split text nodes on markdown image links.
@@ -119,27 +149,7 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
     Returns:
         list[TextNode]: New list with IMAGE nodes extracted.
     """
-    new_nodes = []
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            new_nodes.append(node)
-            continue
-        parts = extract_markdown_images(node.text)
-        if not parts:
-            new_nodes.append(node)
-            continue
-        last_index = 0
-        for alt_text, url in parts:
-            start_index = node.text.find(f"![{alt_text}]({url})", last_index)
-            if start_index > last_index:
-                preceding_text = node.text[last_index:start_index]
-                new_nodes.append(TextNode(preceding_text, TextType.TEXT))
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-            last_index = start_index + len(f"![{alt_text}]({url})")
-        if last_index < len(node.text):
-            remaining_text = node.text[last_index:]
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-    return new_nodes
+    return _split_nodes_pattern(old_nodes, _IMAGE_RE, TextType.IMAGE)
 
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     """Split text nodes on markdown links.
@@ -153,44 +163,107 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     Returns:
         list[TextNode]: New list with LINK nodes extracted.
     """
+    return _split_nodes_pattern(old_nodes, _LINK_RE, TextType.LINK)
+
+def _split_nodes_pattern(old_nodes: list[TextNode], pattern: re.Pattern,
+                         text_type: TextType) -> list[TextNode]:
+    # cut each TEXT node at the spans of the pattern's matches; the text
+    # between matches comes straight from the spans, never searched again
     new_nodes = []
+    append = new_nodes.append
     for node in old_nodes:
         if node.text_type != TextType.TEXT:
-            new_nodes.append(node)
-            continue
-        parts = extract_markdown_links(node.text)
-        if not parts:
-            new_nodes.append(node)
+            append(node)
             continue
+        text = node.text
         last_index = 0
-        for link_text, url in parts:
-            start_index = node.text.find(f"[{link_text}]({url})", last_index)
+        for match in pattern.finditer(text):
+            start_index, end_index = match.span()
             if start_index > last_index:
-                preceding_text = node.text[last_index:start_index]
-                new_nodes.append(TextNode(preceding_text, TextType.TEXT))
-            new_nodes.append(TextNode(link_text, TextType.LINK, url))
-            last_index = start_index + len(f"[{link_text}]({url})")
-        if last_index < len(node.text):
-            remaining_text = node.text[last_index:]
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+                append(TextNode(text[last_index:start_index], TextType.TEXT))
+            value, url = match.groups()
+            append(TextNode(value, text_type, url))
+            last_index = end_index
+        if last_index == 0:
+            append(node)
+        elif last_index < len(text):
+            append(TextNode(text[last_index:], TextType.TEXT))
     return new_nodes
 
+# Inline delimiters in the order the original split passes applied them: a
+# span opened by one delimiter can only contain delimiters of a later pass.
+_DELIMITER_RE = re.compile(r"\*\*|[_`]")
+_DELIMITER_RANK = {"**": 0, "_": 1, "`": 2}
+_DELIMITER_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+
+
 def text_to_textnodes(text: str) -> list[TextNode]:
     """Convert raw markdown text to a list of formatted TextNodes.
     
     Parses markdown syntax and creates appropriately typed TextNodes for
     bold, italic, code, links, and images in the text.
+
+    The text is scanned once from left to right. The result is identical to
+    running split_nodes_delimiter for **, _ and ` followed by
+    split_nodes_image and split_nodes_link, including which inputs raise.
     
     Args:
         text: Raw markdown text to parse.
         
     Returns:
         list[TextNode]: List of TextNodes with proper formatting applied.
+
+    Raises:
+        Exception: If a delimiter is unmatched.
     """
-    node_list = [TextNode(text, TextType.TEXT)]
-    node_list = split_nodes_delimiter(node_list, "**", TextType.TEXT)
-    node_list = split_nodes_delimiter(node_list, "_", TextType.TEXT)
-    node_list = split_nodes_delimiter(node_list, "`", TextType.TEXT)
-    node_list = split_nodes_image(node_list)
-    node_list = split_nodes_link(node_list)
-    return node_list
\ No newline at end of file
+    nodes: list[TextNode] = []
+    open_delimiter = None
+    span_start = 0
+    text_start = 0
+    for match in _DELIMITER_RE.finditer(text):
+        delimiter = match.group()
+        if open_delimiter is None:
+            _append_text_nodes(nodes, text, text_start, match.start())
+            open_delimiter = delimiter
+            span_start = match.end()
+        elif delimiter == open_delimiter:
+            if match.start() > span_start:
+                nodes.append(TextNode(text[span_start:match.start()],
+                                      _DELIMITER_TYPES[delimiter]))
+            open_delimiter = None
+            text_start = match.end()
+        elif _DELIMITER_RANK[delimiter] < _DELIMITER_RANK[open_delimiter]:
+            # an earlier pass would have split here, leaving this span unmatched
+            raise Exception("Unmatched delimiter in text")
+    if open_delimiter is not None:
+        raise Exception("Unmatched delimiter in text")
+    _append_text_nodes(nodes, text, text_start, len(text))
+    return nodes
+
+
+def _append_text_nodes(nodes: list[TextNode], text: str, start: int, end: int) -> None:
+    # plain text between delimited spans: pull out images and links. Links
+    # are found with the "["-prefixed pattern, which the regex engine can
+    # skip to directly; a "!" just before one (and after the previous match)
+    # makes it an image, exactly where an optional-"!" pattern would match.
+    position = start
+    bracket = text.find("[", start, end)
+    if bracket == -1:
+        if start < end:
+            nodes.append(TextNode(text[start:end], TextType.TEXT))
+        return
+    append = nodes.append
+    for match in _LINK_RE.finditer(text, bracket, end):
+        match_start, match_end = match.span()
+        value, url = match.groups()
+        if match_start > position and text[match_start - 1] == "!":
+            match_start -= 1
+            text_type = TextType.IMAGE
+        else:
+            text_type = TextType.LINK
+        if match_start > position:
+            append(TextNode(text[position:match_start], TextType.TEXT))
+        append(TextNode(value, text_type, url))
+        position = match_end
+    if position < end:
+        append(TextNode(text[position:end], TextType.TEXT))
@@ -0,0 +1,291 @@
+import argparse
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from compress import remove_stale_siblings
+from deps import DependencyGraph
+from files import sync_directory
+from images import IMAGE_SIZES
+from main import build_options, discover_pages, generate_pages, main as build_site
+from manifest import BuildManifest, hash_file
+from markdownhtml import BLOCK_MEMO
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVERELOAD_PATH}")'
+    ".onmessage = () => location.reload();</script>"
+)
+
+
+def snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    """Record (mtime, size) for every file under the given files and directories.
+
+    Args:
+        paths: Files or directories to scan.
+
+    Returns:
+        dict[str, tuple[int, int]]: Stat signature keyed by file path.
+    """
+    state = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                state[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def changed_paths(old: dict[str, tuple[int, int]],
+                  new: dict[str, tuple[int, int]]) -> set[str]:
+    """Return the paths added, removed or modified between two snapshots."""
+    changed = {path for path in new if old.get(path) != new[path]}
+    changed.update(path for path in old if path not in new)
+    return changed
+
+
+class LiveReload:
+    """Broadcasts rebuild notifications to waiting browser connections.
+
+    Attributes:
+        generation (int): Incremented after every rebuild.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self._condition = threading.Condition()
+
+    def notify(self) -> None:
+        """Tell every waiting connection that the site was rebuilt."""
+        with self._condition:
+            self.generation += 1
+            self._condition.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> int:
+        """Block until a rebuild newer than seen happens or timeout expires.
+
+        Returns:
+            int: The current generation.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.generation != seen, timeout)
+            return self.generation
+
+
+class SiteWatcher:
+    """Keeps a built site up to date as its sources change.
+
+    Attributes:
+        basepath (str): URL prefix the site is served under.
+        content_dir (str): Markdown sources.
+        static_dir (str): Static assets.
+        template_path (str): Page template.
+        dest_dir (str): Build output directory.
+    """
+
+    def __init__(self, basepath: str = "/", content_dir: str = "content",
+                 static_dir: str = "static", template_path: str = "template.html",
+                 dest_dir: str = "docs") -> None:
+        self.basepath = basepath
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.state = snapshot(self.watched_paths())
+
+    def watched_paths(self) -> list[str]:
+        return [self.content_dir, self.static_dir, self.template_path]
+
+    def dest_for(self, from_path: str) -> str:
+        rel_dir, name = os.path.split(os.path.relpath(from_path, self.content_dir))
+        return os.path.join(self.dest_dir, rel_dir, name.replace(".md", ".html"))
+
+    def poll(self) -> set[str]:
+        """Return the watched paths that changed since the last poll."""
+        state = snapshot(self.watched_paths())
+        changed = changed_paths(self.state, state)
+        self.state = state
+        return changed
+
+    def rebuild(self, changed: set[str]) -> int:
+        """Regenerate only what the changed paths affect.
+
+        A template change rebuilds every page, a markdown change rebuilds
+        that page (or removes its output if the source is gone), and a static
+        change re-syncs the assets. Pages the dependency graph records as
+        embedding a changed asset or linking to an added or removed page are
+        rebuilt too.
+
+        Args:
+            changed: Paths reported by poll().
+
+        Returns:
+            int: Number of pages regenerated.
+        """
+        manifest = BuildManifest.load(self.dest_dir)
+        graph = DependencyGraph.load(self.dest_dir)
+        all_pages = discover_pages(self.content_dir, self.dest_dir)
+        if self.template_path in changed:
+            pages = all_pages
+        else:
+            sources = set()
+            for path in changed:
+                sources.update(graph.dependents(path))
+                if not path.endswith(".md"):
+                    continue
+                if not path.startswith(self.content_dir + os.sep):
+                    continue
+                if os.path.exists(path):
+                    sources.add(path)
+                else:
+                    manifest.entries.pop(path, None)
+                    graph.pages.pop(path, None)
+                    dest_path = self.dest_for(path)
+                    if os.path.exists(dest_path):
+                        os.remove(dest_path)
+            pages = [(path, self.dest_for(path)) for path in sorted(sources)
+                     if os.path.exists(path)]
+        if any(path.startswith(self.static_dir + os.sep) for path in changed):
+            keep = {dest_path for _, dest_path in all_pages} | {manifest.path, graph.path}
+            sync_directory(self.static_dir, self.dest_dir, keep)
+            # memoized blocks may embed an image whose size just changed
+            BLOCK_MEMO.clear()
+        generate_pages(pages, self.template_path, self.basepath)
+        remove_stale_siblings(self.dest_dir)
+        template_hash = hash_file(self.template_path)
+        for from_path, dest_path in pages:
+            manifest.record(from_path, dest_path, hash_file(from_path),
+                            template_hash, self.basepath, build_options())
+            with open(from_path, "r") as from_file:
+                graph.record(from_path, from_file.read(), self.template_path,
+                             self.content_dir, self.static_dir)
+        manifest.save()
+        graph.save()
+        IMAGE_SIZES.save()
+        return len(pages)
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Serves the build output, injecting the reload script into HTML pages."""
+
+    def do_GET(self) -> None:
+        if self.path == LIVERELOAD_PATH:
+            self.send_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        body = body.replace(b"</body>", LIVERELOAD_SCRIPT.encode() + b"</body>", 1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self) -> None:
+        livereload = self.server.livereload
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        seen = livereload.generation
+        try:
+            while True:
+                generation = livereload.wait(seen, timeout=15)
+                if generation != seen:
+                    seen = generation
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    # keep-alive comment; also detects closed connections
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def serve(dest_dir: str, port: int, livereload: LiveReload) -> ThreadingHTTPServer:
+    """Start the preview server on a background thread."""
+    handler = partial(LiveReloadHandler, directory=dest_dir)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    server.livereload = livereload
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def watch(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Build the site, serve docs/ and rebuild on every change."
+    )
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="URL prefix the site is served under (default: /)")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--interval", type=float, default=0.05,
+                        help="seconds between polls of the source tree")
+    args = parser.parse_args(argv)
+
+    build_site([args.basepath])
+    watcher = SiteWatcher(args.basepath)
+    livereload = LiveReload()
+    serve(watcher.dest_dir, args.port, livereload)
+    print(f"Serving {watcher.dest_dir}/ at http://localhost:{args.port}/, watching for changes")
+    try:
+        watch_loop(watcher, livereload, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def watch_loop(watcher: SiteWatcher, livereload: LiveReload, interval: float) -> None:
+    """Poll the source tree and rebuild on every change, until interrupted.
+
+    A rebuild that fails, e.g. on a half-written page, is reported and
+    retried together with the next change, so the watcher survives it.
+
+    Args:
+        watcher: The site to poll and rebuild.
+        livereload: Notified after every successful rebuild.
+        interval: Seconds between polls.
+    """
+    pending: set[str] = set()
+    while True:
+        time.sleep(interval)
+        changed = watcher.poll()
+        if not changed:
+            continue
+        changed |= pending
+        start = time.perf_counter()
+        try:
+            count = watcher.rebuild(changed)
+        except Exception as e:
+            pending = changed
+            print(f"Rebuild failed: {e}")
+            continue
+        pending = set()
+        livereload.notify()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"Rebuilt {count} page(s) in {elapsed:.1f} ms "
+            f"(block memo: {BLOCK_MEMO.hits} hits, {BLOCK_MEMO.misses} misses)"
+        )
+
+
+if __name__ == "__main__":
+    watch()